@@ -23,7 +23,7 @@ Tools for Eurostat data collections upload.
     
 """
 
-__all__ = ['settings', 'session', 'collection', 'api']#analysis:ignore
+__all__ = ['settings', 'session', 'collection', 'api', 'sync', 'listing', 'reader', 'dictionary', 'cube', 'pipeline', 'mirror', 'planner', 'metabase', 'toc', 'snapshot', 'search', 'diff', 'jsonstat', 'query', 'series']#analysis:ignore
 
 #==============================================================================
 # PROGRAM METADATA
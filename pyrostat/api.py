@@ -24,7 +24,7 @@ together with search and manipulation utilities.
     
 **Dependencies**
 
-*call*:         :mod:`settings`, :mod:`request`, :mod:`collections`
+*call*:         :mod:`settings`, :mod:`session`, :mod:`jsonstat`
 
 *require*:      <put_here_required_modules>
                 :mod:`os`, :mod:`sys`, :mod:`string`, :mod:`inspect`, :mod:`warnings`, \ 
@@ -32,7 +32,7 @@ together with search and manipulation utilities.
                 
 *optional*:     <put_here_optional_modules>
                 :mod:`numpy`, :mod:`scipy`, :mod:`matplotlib`, :mod:`pylab`,                        \
-                :mod:`pickle`, :mod:`cPickle`
+                :mod:`pickle`, :mod:`cPickle`, :mod:`orjson`, :mod:`simdjson`
 
 **See also**
 https://github.com/ropengov/eurostat
@@ -65,10 +65,10 @@ from functools import reduce
 #==============================================================================
 
 
-from . import pyroWarning, pyroError
 from . import settings
-from session import Session
-from collection import Collection
+from .settings import pyroWarning, pyroError
+from .session import Session
+from .jsonstat import loads, check_error
 
 #==============================================================================
 # CLASSES/METHODS
@@ -98,71 +98,81 @@ class Eurostat(object):
     """
       
                 
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self._session   = kwargs.pop('session', None)
+        self.url        = kwargs.pop('url', None)
+        self.fmt        = kwargs.pop('fmt', None) or settings.DEF_FMT
+        self.status     = None
+
+    #/************************************************************************/
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = Session()
+        return self._session
+
     #/************************************************************************/
     @staticmethod                                        
     def _decode_json(response):
-        json_data = json.loads(response)
-        if 'error' in json_data:
-            return json_data["error"]
+        # the raw bytes are parsed once, with the fastest JSON backend installed,
+        # and the error envelope is checked on the parsed object
+        json_data = loads(response)
+        check_error(json_data)
         return json_data
 
     #/************************************************************************/
-    def fetch(self, url=None):
-       pass
-       """Fetch data from (well formed) URL to *Eurobase* 
+    def fetch(self, url=None, fmt=None):
+        """Fetch data from (well formed) URL to *Eurobase* 
         
-            >>> resp = x.fetch_data(url)
+            >>> status, resp = x.fetch(url)
                 
         Arguments
         ---------
         url : str
             link to Eurobase web service to submit the specified query, e.g. the URL
-            output by :meth:`get_url`\ .
+            output by :meth:`get_url`\ ; default: the :data:`url` attribute.
         
         Keyword Arguments
         -----------------
-        fmt : bool 
-            set to :literal:`True`, when the output is read as a JSON response;
-            defaults to :literal:`False`\ .
+        fmt : str 
+            format of the response; when :literal:`'json'`, the response is parsed 
+            directly from its raw content (bytes); otherwise, the raw content is
+            returned; default: the :data:`fmt` attribute.
             
         Returns
         -------
-        resp : dict
-            dictionary.
+        status : int
+            status of the response.
+        resp : dict, bytes
+            parsed or raw content of the response.
             
         Errors
         ------
         * {"error":{"status":"416","label":"Too many categories have been requested. Maximum is 50."}}
         * {"error":{"status":"400","label":"Invalid value for 'wsVersion' parameter"}}
-         if url is None or url=='':
-            url=self.url
-        self.status, response = Session.get_data(url, fmt=self.fmt)
+
+        are raised as :class:`pyroError`\ .
+        """
+        url, fmt = url or self.url, fmt or self.fmt
+        if url in (None, ''):
+            raise pyroError('no URL to fetch')
         try:
-            resp = response.read()
-        except:
-            raise pyroError('error reading URL')    
+            response = self.session.get_response(url)
+        except Exception as e:
+            # error responses (e.g., 400, 416) still carry the JSON error envelope
+            response = getattr(e, 'response', None)
+            if response is None:
+                raise pyroError('error reading URL')
+        self.status = response.status_code
         if fmt == 'json':
-            resp = json.loads(resp)
-        elif fmt == 'unicode':
-            resp = resp # TODO
+            resp = self._decode_json(response.content)
+        elif self.status >= 400:
+            raise pyroError('error %s reading URL' % self.status)
+        else:
+            resp = response.content
         return self.status, resp
       
-        def __getattr__(self, attr):
-            if attr.startswith('__'):  # to avoid some bug of the pylint editor
-                try:        return object.__getattribute__(self, attr) 
-                except:     pass 
-            # try:        return object.__getattribute__(self.__call__, attr) 
-            # except:     pass 
-            # finally, what we are really interested in
-            try:        
-                return getattr(jsonstat, attr)
-            except:     
-                try:        
-                    return getattr(pyjstat, attr)
-                except:     
-                    raise pyroError('method/attribute {} not implemented'.format(attr))
-       """
-      
       
 #==============================================================================
 # MAIN METHOD AND TESTING AREA
@@ -41,9 +41,10 @@ dimensions and datasets, from `Eurostat online database <http://ec.europa.eu/eur
 import os
 import warnings
 import string
-from itertools import zip_longest
+import re
 from collections import OrderedDict
 import copy
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
@@ -62,10 +63,17 @@ try:
 except ImportError:                 
     pass
 
-from . import pyroWarning, pyroError
 from . import settings
+from .settings import pyroWarning, pyroError
 from . import session 
 # from session import Session
+from .listing import Listing
+from .metabase import MetaIndex, CompactMetabase, MetaGraph
+from .toc import TocTable, TocTree
+from .snapshot import Snapshot
+from .search import SearchIndex
+from .diff import MetaDiff
+from .query import _canonical
 
 #==============================================================================
 # CLASSES/METHODS
@@ -100,7 +108,7 @@ class __Base(object):
         `force_download` : bool
         """
         # set default values
-        self._lang          = settings.DEF_LANG
+        self._lang          = settings.LANGS[0]
         self._protocol      = settings.DEF_PROTOCOL
         #self._domain        = ''
         #self._query         = ''
@@ -295,6 +303,9 @@ class Bulk(__Base):
         `sort` : int
         `dimension` :
         `dataset` :
+        `expire` : int
+            number of seconds after which the pages of the bulk listing already 
+            loaded are loaded again; default: :data:`settings.BULK_EXPIRE`
         
         Keyword Arguments used for :mod:`session` setting
         -------------------------------------------------  
@@ -310,6 +321,8 @@ class Bulk(__Base):
         self._sort          = settings.DEF_SORT
         self._query         = settings.BULK_QUERY
         self._table         = {'dic': {}, 'data': {}}        
+        self._listing       = {'dic': Listing(), 'data': Listing()}
+        self._expire        = settings.BULK_EXPIRE
         # update
         super(Bulk, self).__init__(**kwargs)
         
@@ -328,19 +341,36 @@ class Bulk(__Base):
             raise pyroError('wrong value for SORT parameter')
         self._sort = sort
 
+    #/************************************************************************/
+    @property
+    def expire(self):
+        """Expire attribute (:data:`getter`/:data:`setter`) setting the number 
+        of seconds the pages of the bulk listing are kept in memory before being
+        loaded again; when :data:`None`, they never expire.
+        """
+        return self._expire
+    @expire.setter
+    def expire(self, expire):
+        if not (expire is None or isinstance(expire, int)):
+            raise pyroError('wrong type for EXPIRE parameter')
+        elif expire is not None and expire < 0:
+            raise pyroError('wrong value for EXPIRE parameter')
+        self._expire = expire
+
     #/************************************************************************/
     @property
     def dictionaries(self):
         """Dictionary attribute (:data:`getter`/:data:`setter`) listing all the 
         dimensions (dictionary fields) that have been loaded from the _Eurostat_ 
-        bulk download website.
+        bulk download website, i.e. those reported in the pages of the bulk 
+        listing crawled so far (see :meth:`crawl`), followed by those set.
         """
-        return self._table['dic'].keys()
+        return self.__loaded('dic')
     @dictionaries.setter
     def dictionaries(self, dictionaries):
         #if isinstance(dimensions, dict):    do nothing 
         if isinstance(dictionaries, (list,tuple)):
-            dictionaries = dict(zip_longest(list(dictionaries),None))
+            dictionaries = dict.fromkeys(dictionaries)
         elif isinstance(dictionaries, str):
             dictionaries = {dictionaries: None}
         if not isinstance(dictionaries, dict) or not all([isinstance(d,str) for d in dictionaries]):
@@ -357,20 +387,25 @@ class Bulk(__Base):
     def datasets(self):
         """Dataset attribute (:data:`getter`/:data:`setter`) storing, in a 
         dictionary, the datasets (dictionary fields) that have been loaded from
-        the *Eurostat bulk download* website in the :class:`{Collection}` instance.
+        the *Eurostat bulk download* website in the :class:`{Collection}` instance,
+        i.e. those reported in the pages of the bulk listing crawled so far (see
+        :meth:`crawl`), followed by those set.
         """
         # return [items for lists in self.__dataset.values() for items in lists]
-        return self._table['data'].keys()
+        return self.__loaded('data')
     @datasets.setter
     def datasets(self, datasets):
         # if isinstance(dataset, dict):   do nothing
         if isinstance(datasets, (list,tuple)):
-            datasets = dict(zip_longest(list(datasets),None))
+            datasets = dict.fromkeys(datasets)
         elif isinstance(datasets, str):
             datasets = {datasets: None}
         if not isinstance(datasets, dict) or not all([isinstance(d,str) for d in datasets]):
             raise pyroError('wrong type for DATASETS parameter')       
         self._table['data'] = datasets # not an update!
+    def __loaded(self, key):
+        listing = self._listing[key]
+        return list(listing) + [n for n in self._table[key] if n not in listing]
  
     #/************************************************************************/
     def _url_dynamic(self, **kwargs):
@@ -475,86 +510,249 @@ class Bulk(__Base):
             key, entity = 'dic', 'dimension'
         else: # if dataset is not None:
             key, entity = 'data', 'dataset'
-        bulk_zip = settings.BULK_ZIP[key]
-        bulk_dir = settings.BULK_DIR[key]
-        bulk_exts = settings.BULK_EXTS[key]
-        ext = kwargs.pop('ext', bulk_exts[0])
-        if not ext in bulk_exts:   
-            raise pyroError('bulk %s extension EXT not recognised' % key) 
-        if bulk_zip != '':
-            ext = '%s.%s' % (ext, bulk_zip)
+        ext = kwargs.pop('ext', None)
         try:
             resp = getattr(self, 'check_%s' % entity)(dimension or dataset)
         except: 
             pass
         else:
             if resp is False:   raise pyroError('wrong %s' % key) 
-        if dimension is not None:
-            filename = '%s/%s/%s.%s' % (bulk_dir, self.lang, dimension or dataset, ext)
-        else:
-            filename = '%s/%s.%s' % (bulk_dir, dimension or dataset, ext)
+        filename = self.build_file(key, dimension or dataset, ext=ext)
         url = self.build_url(file=filename)
         return self.session.read_url_page(self, url, **kwargs)
 
     #/************************************************************************/
-    def last_update(self, **kwargs):
-        """Retrieve the time a table (dictionary or dataset) was last updated.
+    def build_file(self, key, name, ext=None):
+        """Build the path of a bulk dictionary/dataset file, relative to the
+        root of the bulk download repository.
+        
+            >>> filename = B.build_file(key, name, ext=None)
+            
+        Arguments
+        ---------
+        key : str
+            either :literal:`'dic'` or :literal:`'data'`.
+        name : str
+            name of the dictionary or dataset.
+            
+        Keyword Arguments
+        -----------------
+        ext : str
+            extension (format) of the file; default: the first extension listed
+            in :data:`settings.BULK_EXTS` for :data:`key`; the compression extension
+            (see :data:`settings.BULK_ZIP` and :data:`settings.BULK_ZIP_FMTS`) is
+            appended.
+            
+        Returns
+        -------
+        filename : str
+            path of the form :literal:`dic/{lang}/{name}.{ext}` or :literal:`data/{name}.{ext}`.
         """
-        dimension, dataset = [kwargs.get(key) for key in ('dic','data')]
-        if dataset is None and dimension is None:
-            raise pyroError('one of the parameters DIC or DATA needs to be set')
-        elif not(dataset is None or dimension is None):
-            raise pyroError('parameters DIC or DATA are incompatible')
-        if dimension is not None:
-            df = self.load_table('dic')
-            kname, kdate = [settings.BULK_DIC_NAMES.get(key) for key in ('Name','Date')]
+        bulk_exts = settings.BULK_EXTS[key]
+        ext = ext or bulk_exts[0]
+        if not ext in bulk_exts:   
+            raise pyroError('bulk %s extension EXT not recognised' % key) 
+        ext = settings.zipped_ext(key, ext)
+        if key == 'dic':
+            return '%s/%s/%s.%s' % (settings.BULK_DIR[key], self.lang, name, ext)
         else:
-            df = self.load_table('data', alpha=dataset[0])
-            kname, kdate = [settings.BULK_DATA_NAMES.get(key) for key in ('Name','Date')]
+            return '%s/%s.%s' % (settings.BULK_DIR[key], name, ext)
+
+    #/************************************************************************/
+    @staticmethod
+    def __parse_size(size):
+        """Convert a size reported in the bulk listing, e.g. :literal:`'12 KB'`,
+        into a number of bytes; :data:`None` is returned when it cannot be parsed.
+        """
         try:
-            names = [d.split('.')[0] for d in list(df[0][kname])]
-            dates = [d.split('.')[0] for d in list(df[0][kdate])]
+            value, unit = str(size).strip().split()
+            return int(float(value) * settings.BULK_SIZE_UNITS[unit.upper()])
         except:
-            raise pyroError('impossible to read {}/{} columns of bulk table'.format(kname,kdate)) 
+            try:                return int(size)
+            except:             return None
+
+    #/************************************************************************/
+    def __read_page(self, key, alpha):
+        """Load and parse one page of the bulk listing into rows :data:`(name, 
+        size, type, date)`.
+        """
+        if key == 'dic':
+            url = self.build_url(dir=settings.BULK_DIR[key], lang=self.lang)
+        else:
+            url = self.build_url(dir=settings.BULK_DIR[key], start=alpha)        
         try:
-            ipar = names.index(dataset or dimension)
+            rows = self.session.read_listing_table(url)
+            assert rows != []
         except:
-            raise pyroError('entry {} not found in bulk table'.format(dataset or dimension)) 
-        else:
-            date = dates[ipar]
+            # fall back on the (heavier) pandas parser
+            df = self.session.read_html_table(url, skiprows=[1], header=0)
+            assert df is not None
+            # note the call to df[0] since there is one table only in the page
+            names = settings.BULK_NAMES[key]
+            rows = zip(*[df[0][names[k]] for k in ('name','size','type','date')])
+        return [(n, self.__parse_size(s), t, str(d)) for (n, s, t, d) in rows]
+
+    def read_listing(self, key, **kwargs):
+        """Retrieve the entries of the bulk listing of dictionaries or datasets.
+        
+            >>> listing = B.read_listing(key, alpha=None, ext=None, force=False)
+            
+        Arguments
+        ---------
+        key : str
+            either :literal:`'dic'` or :literal:`'data'`.
+            
+        Keyword Arguments
+        -----------------
+        alpha : str, list
+            first letter(s) of the datasets whose listing pages are loaded; ignored
+            when :data:`key` is :literal:`'dic'`; default: all letters.
+        ext : str
+            when passed, only the files with this extension (e.g., :literal:`'tsv.gz'`)
+            are retained.
+        force : bool
+            flag set to reload the pages even if they have not expired yet; 
+            default: :data:`False`.
+            
+        Returns
+        -------
+        listing : :class:`collections.OrderedDict`
+            dictionary whose keys are the names of the tables and whose values 
+            are dictionaries with :literal:`'name'` (file name), :literal:`'size'` 
+            (in bytes), :literal:`'type'` and :literal:`'date'` keys, as reported
+            in the bulk listing.
+            
+        Note
+        ----
+        The pages of the listing are loaded concurrently (with at most 
+        :data:`settings.BULK_WORKERS` connections) and stored in a :class:`Listing`
+        index: they are loaded again only once older than :data:`expire` seconds.
+        """
+        key = self.__check_key(key)
+        alphas = self.__pages(key, kwargs.get('alpha'))
+        self.crawl(key, alpha=alphas, force=kwargs.get('force', False))
+        return self._listing[key].select(pages=alphas, ext=kwargs.get('ext'))
+
+    #/************************************************************************/
+    def crawl(self, key, **kwargs):
+        """Load, concurrently, the pages of the bulk listing which are not yet
+        loaded or have expired.
+        
+            >>> listing = B.crawl(key, alpha=None, force=False)
+            
+        Arguments and keyword arguments are those of :meth:`read_listing`.
+        
+        Returns
+        -------
+        listing : :class:`Listing`
+            index of all the files loaded so far from the listing of :data:`key`.
+        """
+        key = self.__check_key(key)
+        listing = self._listing[key]
+        alphas = [a for a in self.__pages(key, kwargs.get('alpha'))
+                  if kwargs.get('force') is True or listing.expired(a, self.expire)]
+        if alphas == []:
+            return listing
+        def read_page(alpha):
+            try:
+                return self.__read_page(key, alpha)
+            except:
+                warnings.warn(pyroWarning('impossible to read html table: %s' % (alpha or key)))
+        with ThreadPoolExecutor(max_workers=min(len(alphas), settings.BULK_WORKERS)) as executor:
+            for alpha, rows in zip(alphas, executor.map(read_page, alphas)):
+                if rows is not None:
+                    listing.update(alpha, rows)
+        return listing
+
+    @staticmethod
+    def __check_key(key):
+        if not isinstance(key, str) or not key.lower() in ('dic','data'):
+            raise pyroError('keyword parameter %s not recognised' % key)
+        return key.lower()
+
+    @staticmethod
+    def __pages(key, alpha):
+        if key == 'dic':
+            return [None]
+        elif alpha is None:
+            return list(string.ascii_lowercase)
+        elif isinstance(alpha, str):
+            return [alpha]
+        return list(alpha)
+
+    #/************************************************************************/
+    def check_dataset(self, dataset):
+        """Check whether a dataset is reported in the bulk listing; only the page
+        of the listing where the dataset is expected is possibly loaded.
+        """
+        if not isinstance(dataset, str) or dataset == '':
+            raise pyroError('wrong type for DATASET parameter')
+        return dataset in self.crawl('data', alpha=dataset[0].lower())
+    def check_dimension(self, dimension):
+        """Check whether a dimension (dictionary) is reported in the bulk listing.
+        """
+        if not isinstance(dimension, str):
+            raise pyroError('wrong type for DIMENSION parameter')
+        return dimension in self.crawl('dic')
+
+    #/************************************************************************/
+    def last_updates(self, **kwargs):
+        """Retrieve the times a set of tables (dictionaries or datasets) were last
+        updated.
+        
+            >>> dates = B.last_updates(data=['aact_ali01', 'ilc_di01'])
+            
+        Keyword Arguments
+        -----------------
+        dic, data : str, list
+            name(s) of the dictionaries or datasets; only one of them can be passed.
+        ext : str
+            see :meth:`read_listing`.
+            
+        Returns
+        -------
+        dates : dict
+            dictionary whose keys are the names of the tables and whose values are
+            the dates of last update as reported in the bulk listing, or :data:`None`
+            when the table is not found in the listing.
+        """
+        dimension, dataset = [kwargs.get(key) for key in ('dic','data')]
+        if dataset is None and dimension is None:
+            raise pyroError('one of the parameters DIC or DATA needs to be set')
+        elif not(dataset is None or dimension is None):
+            raise pyroError('parameters DIC or DATA are incompatible')
+        key = 'dic' if dimension is not None else 'data'
+        names = dimension or dataset
+        if isinstance(names, str):
+            names = [names]
+        alpha = None if key == 'dic' else sorted(set([n[0].lower() for n in names]))
+        listing = self.read_listing(key, alpha=alpha, ext=kwargs.get('ext'))
+        return {n: listing[n]['date'] if n in listing else None for n in names}
+
+    def last_update(self, **kwargs):
+        """Retrieve the time a table (dictionary or dataset) was last updated.
+        """
+        dimension, dataset = [kwargs.get(key) for key in ('dic','data')]
+        name = dimension or dataset
+        if not (name is None or isinstance(name, str)):
+            raise pyroError('wrong type for DIC or DATA parameter')
+        date = self.last_updates(**kwargs).get(name)
+        if date is None:
+            raise pyroError('entry {} not found in bulk table'.format(name)) 
         return date
 
     #/************************************************************************/
     @property
     def data_in_table(self):
-        datasets = []
-        # url = self.update_url(self.url, sort=self.sort, dir=settings.BULK_DATA_DIR)
-        # kwargs = {'skiprows': [1], 'header': 0}
-        for alpha in list(string.ascii_lowercase):
-            try:
-                df = self.read_html_table('data', alpha=alpha)
-                assert df is not None
-                name = settings.BULK_NAMES['data']['name']
-            except:
-                warnings.warn(pyroWarning('impossible to read html table: %s' % alpha))
-            else:
-                # note the call to df[0] since there is one table only in the page
-                datasets += [d.split('.')[0] for d in list(df[0][name])]
-        return datasets
+        return list(self.crawl('data'))
 
     #/************************************************************************/
     @property
     def dic_in_table(self):
-        try:
-            df = self.read_html_table('dic')
-            assert df is not None
-            name = settings.BULK_NAMES['dic']['name']
-        except:
+        listing = self.crawl('dic')
+        if listing.pages == []:
             raise pyroError('impossible to read column of bulk table') 
-        else:
-            # note the call to df[0] since there is one table only in the page
-            dictionaries = [d.split('.')[0] for d in list(df[0][name])]
-        return dictionaries
+        return list(listing)
 
     def __obsolete_get_datasets(self):
         datasets = []
@@ -601,14 +799,108 @@ class Meta(__Base):
     #/************************************************************************/
     def __init__(self, **kwargs):
         """Initialisation of a :class:`Meta` instance.
+        
+        Keyword Arguments
+        -----------------
+        lazy : bool
+            flag set to start loading the metabase and the tables of contents in
+            the background as soon as the instance is created (see :meth:`load`);
+            default: :data:`False`.
+        source : str
+            local directory where the files are read from in :data:`lazy` mode;
+            default: the files are downloaded.
         """
         # set default values
         self._domain        = settings.BULK_DOMAIN
         self._sort          = settings.DEF_SORT
         self._query         = settings.BULK_QUERY
         self._metabase      = {}        
+        self._toc           = None
+        self._index         = None
+        self._graph         = None
+        self._compact       = None
+        self._toctable      = None
+        self._toclang       = None
+        self._toctree       = None
+        self._search        = None
+        self._futures       = {}
+        lazy, source        = kwargs.pop('lazy', False), kwargs.pop('source', None)
         # update
-        super(Bulk, self).__init__(**kwargs)
+        super(Meta, self).__init__(**kwargs)
+        if lazy is True:
+            self.load(source=source)
+
+    #/************************************************************************/
+    def load(self, **kwargs):
+        """Start loading the metabase (in compact form, with its indexes) and the
+        tables of contents in all languages in background threads, and return 
+        at once.
+        
+            >>> futures = M.load(source=None, langs=None)
+            
+        Keyword Arguments
+        -----------------
+        source : str
+            local directory (e.g., a mirror of the bulk repository) where the
+            files are read from; default: the files are downloaded.
+        langs : list
+            languages of the tables of contents; default: :data:`settings.LANGS`.
+            
+        Returns
+        -------
+        futures : dict
+            :class:`concurrent.futures.Future` of the :literal:`'toc'` and 
+            :literal:`'metabase'` loadings.
+            
+        Note
+        ----
+        The methods that only use the tables of contents (e.g., :meth:`getTitle`)
+        wait for them only, and not for the (larger) metabase; all the methods
+        wait for the data they need, see :meth:`wait`.
+        """
+        source = kwargs.get('source')
+        def load_metabase():
+            basefile = None
+            if source is not None:
+                basefile = '{base}.{ext}'.format(base=settings.BULK_FILES['base'], ext=settings.BULK_EXTS['base'][0])
+                if settings.BULK_ZIP['base'] != '':
+                    basefile = '{base}.{zip}'.format(base=basefile, zip=settings.BULK_ZIP['base'])
+                basefile = os.path.join(source, basefile)
+            compact = self.readCompactMetabase(source=basefile)
+            index = MetaIndex.from_compact(compact)
+            self._metabase, self._graph, self._search = {}, None, None
+            self._compact, self._index = compact, index
+            return compact
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            self._futures = {'toc': executor.submit(self.readTocTable, source=source, langs=kwargs.get('langs')),
+                             'metabase': executor.submit(load_metabase)}
+        finally:
+            executor.shutdown(wait=False)
+        return dict(self._futures)
+    def future(self, key):
+        """Future of the background loading (see :meth:`load`) of the :literal:`'toc'`
+        or the :literal:`'metabase'`; :data:`None` when it was not started.
+        """
+        if key not in ('toc', 'metabase'):
+            raise pyroError('key %s not recognised' % key)
+        return self._futures.get(key)
+    def ready(self, key):
+        """Check, without blocking, whether the :literal:`'toc'` or the :literal:`'metabase'`
+        loaded in the background is available.
+        """
+        future = self.future(key)
+        return future is None or future.done()
+    def wait(self, *keys, **kwargs):
+        """Wait for the background loading of the :literal:`'toc'` and/or the 
+        :literal:`'metabase'` (default: both); errors of the loading are raised.
+        
+            >>> M.wait('toc', timeout=None)
+        """
+        for key in keys or ('toc', 'metabase'):
+            future = self.future(key)
+            if future is not None:
+                future.result(timeout=kwargs.get('timeout'))
 
     #/************************************************************************/
     @property
@@ -616,6 +908,10 @@ class Meta(__Base):
         """Metabase attribute (:data:`getter`/:data:`setter`) storing, in a table,
         the information of _Eurostat_ bulk download metabase.
         """
+        self.wait('metabase')
+        if isinstance(self._metabase, dict) and self._compact is not None:
+            # metabase loaded in compact form: the table is only built when needed
+            self._metabase = self._compact.to_frame()
         return self._metabase
     @metabase.setter
     def metabase(self, metabase):
@@ -626,9 +922,50 @@ class Meta(__Base):
                 pass
         elif not isinstance(metabase, dfm.DataFrame):
             raise pyroError('wrong value for METABASE parameter')
+        else:
+            self._metabase = metabase
+        self._index = self._compact = self._graph = self._search = None
+ 
+    #/************************************************************************/
+    @property
+    def index(self):
+        """Index attribute (:data:`getter`) storing the inverted indexes of the
+        metabase (see :class:`metabase.MetaIndex`); the indexes are built once,
+        the first time they are used after the metabase is loaded.
+        """
+        self.wait('metabase')
+        if self._index is None:
+            if self._compact is not None:
+                self._index = MetaIndex.from_compact(self._compact)
+            elif self.metabase is None or isinstance(self.metabase, dict):
+                raise pyroError('metabase data not found - get the file from Eurobase')
+            else:
+                self._index = MetaIndex.from_frame(self.metabase)
+        return self._index
+    @property
+    def graph(self):
+        """Graph attribute (:data:`getter`) storing the sparse incidences of the
+        datasets with the dimensions and codes of the metabase (see 
+        :class:`metabase.MetaGraph`); built the first time it is used.
+        """
+        self.wait('metabase')
+        if self._graph is None:
+            if self._compact is not None:
+                self._graph = MetaGraph.from_compact(self._compact)
+            elif self.metabase is None or isinstance(self.metabase, dict):
+                raise pyroError('metabase data not found - get the file from Eurobase')
+            else:
+                self._graph = MetaGraph.from_frame(self.metabase)
+        return self._graph
  
     #/************************************************************************/
     @property
+    def toctable(self):
+        """Table of contents indexed by code (see :meth:`readTocTable`), or
+        :data:`None` when it is not loaded.
+        """
+        return self._toctable
+    @property
     def toc(self):
         """TOC attribute (:data:`getter`/:data:`setter`) storing, the table of 
         contents hosted on _Eurostat_ bulk download metabase.
@@ -647,18 +984,16 @@ class Meta(__Base):
     #/************************************************************************/
     @property
     def datasets(self):
-        if self.metabase is None:
+        if self._compact is None and self.metabase is None:
             raise pyroError('no METABASE data found') 
-        key = settings.BULK_NAMES['base']['data']
-        return self.metabase[key].unique().tolist()
+        return self.index.datasets()
 
     #/************************************************************************/
     @property
     def dictionaries(self):
-        if self.metabase is None:
+        if self._compact is None and self.metabase is None:
             raise pyroError('no METABASE data found') 
-        key = settings.BULK_NAMES['base']['dic']
-        return self.metabase[key].unique().tolist()
+        return self.index.dimensions()
     @property
     def dimensions(self):
         """Dimension attribute is nothing else that a proxy to the dictionary attribute.
@@ -703,24 +1038,21 @@ class Meta(__Base):
         else:                       
             return False
     def check_dictionary(self, dictionary):
-        return self.__check_member(dictionary, self.dictionaries)
+        return self.index.has_dimension(dictionary)
     def check_dataset(self, dataset):
-        return self.__check_member(dataset, self.datasets)
+        return self.index.has_dataset(dataset)
     def check(self, item):
         """
         See also :method:`__contains__` method...
         """
         if not isinstance(item, str):
             raise pyroError('wrong type for ITEM parameter')
-        elif not (item in self.dictionaries or item in self.datasets):
+        elif not (self.check_dataset(item) or self.check_dictionary(item)):
             raise pyroError('ITEM not recognised as either a dataset or a dictionary')            
-        return self.check_dataset(item) or self.check_dictionary(item)
+        return True
     
     #/************************************************************************/
-    @staticmethod
-    def __get_member(member, metabase, **kwargs):
-        if metabase is None:
-            raise pyroError('metabase data not found - get the file from Eurobase')
+    def __get_member(self, member, **kwargs):
         members = settings.BULK_NAMES['base'] # ('data', 'dic', 'label')
         if member not in members:
             raise pyroError('member value not recognised - '
@@ -728,6 +1060,16 @@ class Meta(__Base):
         elif set(kwargs.keys()).intersection([member]) != set(): # not empty
             raise pyroError('member value should not be passed as a keyword argument')
         grpby = list(set(kwargs.keys()).intersection(set(members)))
+        # lookups served by the indexes
+        if member == 'data' and set(grpby).issubset(['dic']):
+            return self.index.datasets(kwargs.get('dic'))
+        elif member == 'dic' and set(grpby).issubset(['data']):
+            return self.index.dimensions(kwargs.get('data'))
+        elif member == 'label' and 'dic' in grpby and set(grpby).issubset(['dic','data']):
+            return self.index.labels(kwargs.get('dic'), dataset=kwargs.get('data'))
+        metabase = self.metabase
+        if metabase is None:
+            raise pyroError('metabase data not found - get the file from Eurobase')
         if grpby != []:
             fltby = tuple([kwargs.get(k) for k in grpby]) # preserve the order
             if len(grpby) == 1:
@@ -742,9 +1084,9 @@ class Meta(__Base):
     
     #/************************************************************************/
     def getDataset(self, dataset):
-        return self.__get_member('dic', self.metabase, data=dataset)
+        return self.__get_member('dic', data=dataset)
     def getDictionary(self, dimension):
-        return self.__get_member('label', self.metabase, dic=dimension)
+        return self.__get_member('label', dic=dimension)
     def setDataset(self, dataset):
         self._dataset.update({dataset: self.getDataset(dataset)})
     def setDictionary(self, dimension):
@@ -755,18 +1097,18 @@ class Meta(__Base):
         """Retrieve all the datasets that are using a given dimension.
         """
         if dimension is None:
-            return self.__get_member('data', self.metabase)
+            return self.__get_member('data')
         else:
-            return self.__get_member('data', self.metabase, dic=dimension)
+            return self.__get_member('data', dic=dimension)
     def getAllDimensions(self, dataset):
         """Retrieve all the dimensions used to define a given dataset.
         """
-        return self.__get_member('dic', self.metabase, data=dataset)
+        return self.__get_member('dic', data=dataset)
     def getAllLabels(self, dimension, **kwargs):
         """Retrieve all the labels of a given dimension and possibly used
         by a given dataset.
         """
-        return self.__get_member('label', self.metabase, dic=dimension, **kwargs)
+        return self.__get_member('label', dic=dimension, **kwargs)
  
     #/************************************************************************/
     def checkDataset(self, dataset):
@@ -783,16 +1125,88 @@ class Meta(__Base):
             boolean answer (`True`/`False`) to the existence of the dataset `name`.
         """
         # return dataset in self.getAllDatasets(dimension)
-        return dataset in self.getAllDatasets()
+        return self.index.has_dataset(dataset)
     def checkDimensionInDataset(self, dimension, dataset):
         """Check whether some dimension is used by a given dataset.
         """
         # return dataset in self.getAllDatasets(dimension)
-        return dimension in self.getAllDimensions(dataset)
+        return self.index.has_dimension(dimension, dataset=dataset)
     def checkLabelInDimension(self, label, dimension, **kwargs):
         """Check whether some label is used by a given dimension.
         """
-        return label in self.getAllLabels(dimension, **kwargs)
+        return self.index.has_label(label, dimension, dataset=kwargs.get('data'))
+    def checkDatasets(self, datasets):
+        """Check, in one call, whether some datasets exist in Eurostat database.
+        """
+        return self.index.check(datasets)
+        
+    def findDatasets(self, *features, **kwargs):
+        """Find the datasets using all (or any) of some dimensions and codes.
+        
+            >>> datasets = M.findDatasets('geo', ('unit', 'EUR'), how='all')
+            
+        Arguments
+        ---------
+        features : str, tuple
+            names of dimensions, or :data:`(dimension, code)` tuples.
+            
+        Keyword Arguments
+        -----------------
+        how : str
+            :literal:`'all'` to retrieve the datasets using all the features, 
+            :literal:`'any'` those using any of them; default: :literal:`'all'`.
+        """
+        how = kwargs.get('how', 'all')
+        if how not in ('all', 'any'):
+            raise pyroError('wrong value for HOW parameter')
+        return self.graph.intersection(*features) if how == 'all' else self.graph.union(*features)
+    def similarDatasets(self, dataset, **kwargs):
+        """Rank the datasets by the dimensions (:literal:`by='dimension'`) or 
+        codes (:literal:`by='label'`) they share with a given dataset; see 
+        :meth:`metabase.MetaGraph.similar`.
+        
+            >>> ranking = M.similarDatasets(dataset, by='dimension', limit=10)
+        """
+        return self.graph.similar(dataset, by=kwargs.get('by', 'dimension'), limit=kwargs.get('limit', 10))
+        
+    #/************************************************************************/
+    def validateQuery(self, dataset, **filters):
+        """Validate a query, i.e. a dataset and codes selected for some of its
+        dimensions, against the metabase.
+        
+            >>> errors = M.validateQuery(dataset, **filters)
+        
+        Returns
+        -------
+        errors : :class:`collections.OrderedDict`
+            errors found in the query; empty when the query is valid; see 
+            :meth:`metabase.MetaIndex.validate`.
+        """
+        return self.index.validate(dataset, filters)
+    def validateQueries(self, queries):
+        """Validate a batch of :data:`(dataset, filters)` queries; see 
+        :meth:`validateQuery`.
+        """
+        return self.index.validate_many(queries)
+    def checkQuery(self, dataset, **filters):
+        """Check a query against the metabase (see :meth:`validateQuery`) and
+        raise an error listing all the invalid dimensions and codes at once; the
+        parameters of the query that are not dimensions (see :data:`settings.API_PARAMS`)
+        are ignored.
+        
+            >>> M.checkQuery(dataset, **filters)
+        """
+        filters = {k: v for (k, v) in filters.items() if k not in settings.API_PARAMS}
+        errors = self.validateQuery(dataset, **filters)
+        if 'dataset' in errors:
+            raise pyroError('dataset %s not found in metabase' % errors['dataset'])
+        msg = []
+        if 'dimensions' in errors:
+            msg.append('dimensions %s' % ', '.join(errors['dimensions']))
+        for (dim, codes) in errors.get('labels', {}).items():
+            msg.append('codes %s of dimension %s' % (', '.join(codes), dim))
+        if msg != []:
+            raise pyroError('invalid query - %s not found in metabase' % '; '.join(msg))
         
     #/************************************************************************/
     @property
@@ -801,7 +1215,51 @@ class Meta(__Base):
         
     #/************************************************************************/
     def setMetabase(self, **kwargs):
-        self.__metabase = self.readMetabase(**kwargs)
+        if kwargs.pop('compact', False) is True:
+            self._compact = self.readCompactMetabase(**kwargs)
+            self._metabase = {}
+        else:
+            self._compact = None
+            self._metabase = self.readMetabase(**kwargs)
+        self._index = self._graph = self._search = None
+    def readCompactMetabase(self, **kwargs):
+        """Read the metabase into integer-coded columns (see :class:`metabase.CompactMetabase`).
+        
+            >>> compact = M.readCompactMetabase(source=None, cache=None, mmap=True, force=False)
+            
+        Keyword Arguments
+        -----------------
+        source : str
+            local path of the metabase file (e.g., in a mirror of the bulk 
+            repository); default: the file is downloaded.
+        cache : str
+            directory where the columns are saved once read, and loaded from
+            afterwards.
+        mmap : bool
+            flag set to memory-map the columns loaded from :data:`cache`; 
+            default: :data:`True`.
+        force : bool
+            flag set to read the metabase file again even if it is found in
+            :data:`cache`; default: :data:`False`.
+        """
+        source, cache = kwargs.get('source'), kwargs.get('cache')
+        mmap = kwargs.get('mmap', True)
+        if cache is not None and kwargs.get('force', False) is False and CompactMetabase.exists(cache):
+            return CompactMetabase.load(cache, mmap=mmap)
+        if source is None:
+            basefile = '{base}.{ext}'.format(base=settings.BULK_FILES['base'], ext=settings.BULK_EXTS['base'][0])
+            if settings.BULK_ZIP['base'] != '':
+                basefile = '{base}.{zip}'.format(base=basefile, zip=settings.BULK_ZIP['base'])
+            try:
+                source = self.session.get_response(self.build_url(file=basefile)).content
+            except:
+                raise pyroError('impossible to download metabase file')
+        compact = CompactMetabase.parse(source)
+        if cache is not None:
+            compact.save(cache)
+            if mmap is True:
+                compact = CompactMetabase.load(cache, mmap=True)
+        return compact
     def readMetabase(self, **kwargs):
         basefile = '{base}.{ext}'.format(base=settings.BULK_FILES['base'], ext=settings.BULK_EXTS['base'])
         if settings.BULK_ZIP['base'] != '':
@@ -822,15 +1280,162 @@ class Meta(__Base):
         return metabase
 
     #/************************************************************************/
-    def search(self, regex):
-        mask = np.column_stack([self.metabase[col].str.contains(regex, na=False) \
-                                for col in self.metadata])
-        res = self.metabase.loc[mask.any(axis=1)]
-        return res
+    def loadSnapshot(self, path, **kwargs):
+        """Load the metabase, the table of contents and the indexes of the
+        metabase from a snapshot (see :class:`snapshot.Snapshot`); the snapshot 
+        is (re)built first when it does not exist or is older than its sources.
+        
+            >>> snapshot = M.loadSnapshot(path, source=None, lang=None, check=True, mmap=True)
+            
+        Arguments
+        ---------
+        path : str
+            directory of the snapshot.
+            
+        Keyword Arguments
+        -----------------
+        source : str
+            local directory (e.g., a mirror of the bulk repository) where the
+            metabase and the table of contents are read from; default: they are
+            downloaded.
+        lang : str
+            language of the table of contents; default: the first of :data:`settings.LANGS`.
+        check : bool
+            flag set to check the dates of the source files against those of the
+            snapshot; when :data:`False`, any existing snapshot is used; default:
+            :data:`True`.
+        mmap : bool
+            flag set to memory-map the snapshot; default: :data:`True`.
+        """
+        snapshot = Snapshot(path)
+        source, lang = kwargs.get('source'), kwargs.get('lang') or settings.LANGS[0]
+        dates = None
+        if kwargs.get('check', True) is not False:
+            dates = snapshot.source_dates(source=source, bulk=None if source is not None else self,
+                                          lang=lang)
+        if not snapshot.is_valid(dates):
+            files = snapshot.source_files(lang)
+            if source is not None:
+                sources = [os.path.join(source, files[k]) for k in ('metabase', 'toc')]
+            else:
+                sources = [None, self.session.get_response(self.build_url(file=files['toc'])).content]
+            compact = self.readCompactMetabase(source=sources[0])
+            snapshot.save(compact, TocTable.parse(sources[1], lang=lang), dates)
+        self._compact, self._toctable, self._index = snapshot.load(mmap=kwargs.get('mmap', True))
+        self._toclang, self._metabase, self._graph, self._search = lang, {}, None, None
+        return snapshot
+
+    #/************************************************************************/
+    def diff(self, new):
+        """Compare the metabase and tables of contents of this (old) instance with
+        those of another (new) instance; see :class:`diff.MetaDiff`.
+        
+            >>> D = M.diff(new)
+        """
+        if not isinstance(new, Meta):
+            raise pyroError('wrong type for NEW parameter')
+        return MetaDiff.from_meta(self, new)
+
+    #/************************************************************************/
+    @property
+    def searchIndex(self):
+        """Search index (:data:`getter`) of the datasets, dimensions and codes of
+        the metabase and of the titles of the table of contents (see 
+        :class:`search.SearchIndex`); it is built the first time it is used.
+        """
+        if self._search is None:
+            self.wait()
+            tocs = {} if self._toctable is None else {self._toclang or settings.LANGS[0]: self._toctable}
+            self._search = SearchIndex.build(self.index, tocs=tocs)
+        return self._search
+    def search(self, regex, **kwargs):
+        """Search the metabase for the rows whose dataset, dimension or code
+        contains a regular expression.
+        
+            >>> res = M.search(regex, case=True, flags=0)
+            
+        Arguments
+        ---------
+        regex : str
+            regular expression searched (see :meth:`pandas.Series.str.contains`).
+            
+        Keyword Arguments
+        -----------------
+        case : bool
+            flag set to search case-sensitively; default: :data:`True`.
+        flags : int
+            flags of the :mod:`re` module; default: 0.
+            
+        Returns
+        -------
+        res : :class:`pandas.DataFrame`
+            rows of the metabase matching the expression.
+            
+        Note
+        ----
+        When the metabase is loaded in compact form, the expression is matched
+        against the distinct values of every column only. See :meth:`searchMetadata`
+        for the indexed (and ranked) search of the metabase and of the table of
+        contents.
+        """
+        flags = kwargs.get('flags', 0)
+        if kwargs.get('case', True) is False:
+            flags |= re.IGNORECASE
+        try:
+            pattern = re.compile(regex, flags)
+        except re.error:
+            raise pyroError('wrong regular expression %s' % regex)
+        self.wait('metabase')
+        if isinstance(self._metabase, dict) and self._compact is not None:
+            compact = self._compact
+            mask = np.zeros(len(compact), dtype=bool)
+            for key in compact.KEYS:
+                matched = np.fromiter((pattern.search(str(v)) is not None for v in compact.tables[key]),
+                                      dtype=bool, count=len(compact.tables[key]))
+                if matched.any():
+                    mask |= matched[np.asarray(compact.columns[key])]
+        else:
+            mask = np.column_stack([self.metabase[col].astype(str).str.contains(pattern, na=False)
+                                    for col in self.metabase.columns]).any(axis=1)
+        return self.metabase.loc[mask]
+    def searchMetadata(self, query, **kwargs):
+        """Search the metadata through the search index (see :data:`searchIndex`).
+        
+            >>> results = M.searchMetadata(query, mode='regex', kind=None, limit=None)
+            
+        Arguments
+        ---------
+        query : str
+            regular expression, substring or keywords searched.
+            
+        Keyword Arguments
+        -----------------
+        mode : str
+            any of :literal:`'regex'`, :literal:`'substring'` or :literal:`'keyword'`
+            (ranked results); default: :literal:`'regex'`.
+        kind : str
+            kind of results: :literal:`'dataset'`, :literal:`'dimension'` or 
+            :literal:`'label'`; default: all.
+        limit : int
+            maximum number of results.
+            
+        Returns
+        -------
+        results : list
+            list of dictionaries with :literal:`'kind'`, :literal:`'key'` and
+            :literal:`'score'` keys; see :meth:`search.SearchIndex.search`.
+            
+        Note
+        ----
+        Unlike :meth:`search`, the matching is case- and accent-insensitive, and
+        the titles of the table of contents are searched as well.
+        """
+        mode = kwargs.pop('mode', 'regex')
+        return self.searchIndex.search(query, mode=mode, **kwargs)
         
     #/************************************************************************/
     def setTOC(self, **kwargs):
-        self.__toc = self.readToc(**kwargs)
+        self._toc = self.readToc(**kwargs)
     def readToc(self, **kwargs):
         """
         Example: http://ec.europa.eu/eurostat/estat-navtree-portlet-prod/BulkDownloadListing?sort=1&file=table_of_contents.xml
@@ -846,7 +1451,11 @@ class Meta(__Base):
             if lang not in settings.LANGS:   
                 raise pyroError('language LANG not recognised') 
         if ext == 'xml':
-            tocfile = '{toc}.xml'.format(toc=settings.BULK_FILES['toc'])
+            # the XML table of contents is parsed into a tree and flattened
+            try:
+                return self.readTocTree(**kwargs).to_frame(lang=lang)
+            except:
+                return None
         else:
             tocfile = '{toc}_{lang}.{ext}'.format(toc=settings.BULK_FILES['toc'], lang=lang, ext=ext)
         if settings.BULK_ZIP['toc'] != '':
@@ -854,17 +1463,79 @@ class Meta(__Base):
         url = self.update_url(self.url, sort=self.sort, file=tocfile)
         kwargs.update({'header': 0})
         try:
-            if ext == 'xml':
-                toc = self.session.read_html_table(url, **kwargs)                
-                toc = toc[0]
-            else:
-                toc = self.session.read_url_table(url, **kwargs)
+            toc = self.session.read_url_table(url, **kwargs)
         except:
             toc = None
         else:
             toc.drop(toc.columns[-1], axis=1, inplace=True) # toc.columns[-1] is 'values'
             toc.applymap(lambda x: x.strip())
         return toc
+    def readTocTable(self, **kwargs):
+        """Read the tables of contents in several languages into a single table
+        indexed by code (see :class:`toc.TocTable`), used by :meth:`getTitle`,
+        :meth:`getPeriod` and :meth:`search` for all the languages.
+        
+            >>> T = M.readTocTable(langs=None, source=None)
+            
+        Keyword Arguments
+        -----------------
+        langs : list
+            languages of the tables of contents; default: :data:`settings.LANGS`.
+        source : str
+            local directory (e.g., a mirror of the bulk repository) where the
+            tables of contents are read from; default: they are downloaded.
+        """
+        langs = kwargs.get('langs') or settings.LANGS
+        if isinstance(langs, str):
+            langs = [langs]
+        if not set(langs).issubset(settings.LANGS):
+            raise pyroError('language LANG not recognised') 
+        sources = OrderedDict()
+        for lang in langs:
+            tocfile = '{toc}_{lang}.{ext}'.format(toc=settings.BULK_FILES['toc'], lang=lang, 
+                                                  ext=settings.BULK_EXTS['toc'][0])
+            if settings.BULK_ZIP['toc'] != '':
+                tocfile = '{toc}.{zip}'.format(toc=tocfile, zip=settings.BULK_ZIP['toc'])
+            if kwargs.get('source') is not None:
+                sources[lang] = os.path.join(kwargs.get('source'), tocfile)
+                continue
+            try:
+                sources[lang] = self.session.get_response(self.build_url(file=tocfile)).content
+            except:
+                raise pyroError('impossible to download table of contents file')
+        self._toctable, self._toclang = TocTable.parse_many(sources), langs[0]
+        self._search = None
+        return self._toctable
+    def readTocTree(self, **kwargs):
+        """Read the hierarchy of the XML table of contents (see :class:`toc.TocTree`).
+        
+            >>> tree = M.readTocTree(source=None)
+            
+        Keyword Arguments
+        -----------------
+        source : str
+            local path of the XML table of contents (e.g., in a mirror of the bulk 
+            repository); default: the file is downloaded.
+        """
+        source = kwargs.get('source')
+        if source is None:
+            tocfile = '{toc}.xml'.format(toc=settings.BULK_FILES['toc'])
+            if settings.BULK_ZIP['toc'] != '':
+                tocfile = '{toc}.{zip}'.format(toc=tocfile, zip=settings.BULK_ZIP['toc'])
+            try:
+                source = self.session.get_response(self.build_url(file=tocfile)).content
+            except:
+                raise pyroError('impossible to download table of contents file')
+        self._toctree = TocTree.parse(source)
+        return self._toctree
+    @property
+    def tocTree(self):
+        """Tree attribute (:data:`getter`) storing the hierarchy of the table 
+        of contents; the XML file is read the first time it is used.
+        """
+        if self._toctree is None:
+            self.readTocTree()
+        return self._toctree
          
     #/************************************************************************/
     @staticmethod
@@ -878,12 +1549,18 @@ class Meta(__Base):
         
     #/************************************************************************/
     def getTitle(self, dataset, **kwargs):
+        self.wait('toc')
+        if self._toctable is not None:
+            return self._toctable.title(dataset, lang=kwargs.get('lang'))
         res = self.__get_content(dataset, self.toc, **kwargs)
         ind = res.index.tolist()
         return res['title'][ind[0]].lstrip().rstrip()
         
     #/************************************************************************/
     def getPeriod(self, dataset, **kwargs):
+        self.wait('toc')
+        if self._toctable is not None:
+            return self._toctable.period(dataset)
         res = self.__get_content(dataset, self.toc, **kwargs)
         ind = res.index.tolist()
         start = res['data start'][ind[0]]
@@ -912,11 +1589,12 @@ http://ec.europa.eu/eurostat/wdds/ rest/data/v2.1/ json/en/ nama_gdp_c?precision
         self._url = None
         self._status = None
         self._force_check = False
+        self._meta = None
         # check whether any argument is passed
         if kwargs == {}:
             return
         # update
-        attrs = ('domain','dataset','filters','fmt','lang','vers','force_check') 
+        attrs = ('domain','dataset','filters','fmt','lang','vers','force_check','meta') 
         for attr in list(set(attrs).intersection(kwargs.keys())):
             try:
                 setattr(self, '{}'.format(attr), kwargs.pop(attr))
@@ -945,6 +1623,9 @@ http://ec.europa.eu/eurostat/wdds/ rest/data/v2.1/ json/en/ nama_gdp_c?precision
             #    pass
         if kwargs != {}: # possible filters arguments passed without the 'filters' keyword
             params['filters'].update(kwargs)
+        if self._force_check is True:
+            # invalid queries are rejected before any request is sent
+            self.check(dataset=params['dataset'], filters=params['filters'])
         url = self.getUrl(self, **params)
         status, resp = self.fetch(url=url)
         return status, resp
@@ -1089,6 +1770,71 @@ http://ec.europa.eu/eurostat/wdds/ rest/data/v2.1/ json/en/ nama_gdp_c?precision
     def filters(self, d):        
         self._filters.update(d)
 
+    #/************************************************************************/
+    @property
+    def meta(self):
+        """Meta attribute (:data:`getter`/:data:`setter`) storing the :class:`Meta`
+        instance whose metabase is used to validate the queries.
+        """
+        return self._meta
+    @meta.setter
+    def meta(self, meta):
+        if not(meta is None or isinstance(meta, Meta)):
+            raise pyroError('wrong type for META parameter')
+        self._meta = meta
+    @property
+    def force_check(self):
+        return self._force_check
+    @force_check.setter
+    def force_check(self, force_check):
+        if not isinstance(force_check, bool):
+            raise pyroError('wrong type for FORCE_CHECK parameter')
+        self._force_check = force_check
+
+    #/************************************************************************/
+    def validate(self, dataset=None, filters=None, meta=None):
+        """Validate a query against the metabase, in one pass over all the 
+        dimensions and codes of the filters.
+        
+            >>> errors = x.validate(dataset=None, filters=None, meta=None)
+            
+        Keyword Arguments
+        -----------------
+        dataset : str
+            name of the dataset; default: the dataset of the instance.
+        filters : dict
+            codes selected for some dimensions; the parameters of the query that
+            are not dimensions (see :data:`settings.API_PARAMS`) are ignored; 
+            default: the filters of the instance.
+        meta : :class:`Meta`
+            instance whose metabase is used; default: the :data:`meta` attribute.
+            
+        Returns
+        -------
+        errors : :class:`collections.OrderedDict`
+            errors found in the query (see :meth:`Meta.validateQuery`); empty when
+            the query is valid.
+        """
+        meta = meta or self._meta
+        if meta is None:
+            raise pyroError('metabase data not found - set the META parameter')
+        dataset = dataset or self._dataset
+        filters = filters if filters is not None else (self._filters or {})
+        filters = {k: v for (k, v) in filters.items() if k not in settings.API_PARAMS}
+        return meta.validateQuery(dataset, **filters)
+    def check(self, dataset=None, filters=None, meta=None):
+        """Check a query against the metabase (see :meth:`validate`) and raise
+        an error listing all the invalid dimensions and codes at once; see
+        :meth:`Meta.checkQuery`.
+        
+            >>> x.check(dataset=None, filters=None, meta=None)
+        """
+        meta = meta or self._meta
+        if meta is None:
+            raise pyroError('metabase data not found - set the META parameter')
+        filters = filters if filters is not None else (self._filters or {})
+        meta.checkQuery(dataset or self._dataset, **filters)
+
     #/************************************************************************/
     @staticmethod
     def _get_status(status):
@@ -1168,6 +1914,9 @@ http://ec.europa.eu/eurostat/wdds/ rest/data/v2.1/ json/en/ nama_gdp_c?precision
     
         Example: 
             http://ec.europa.eu/eurostat/wdds/rest/data/v2.1/json/en/ilc_li03?precision=1&indic_il=LI_R_MD60&time=2015
+
+        The filters are canonicalised (dimensions sorted by name, codes sorted and
+        deduplicated), so that equivalent queries share the same URL.
         """
         if kwargs == {}:
             return None
@@ -1180,7 +1929,8 @@ http://ec.europa.eu/eurostat/wdds/ rest/data/v2.1/ json/en/ nama_gdp_c?precision
         kwargs.update({'path': "v{vers}/{fmt}/{lang}".format(vers=vers,fmt=fmt,lang=lang)}) 
         if 'precision' not in kwargs:   
             kwargs.update({'precision': 1})
-        url = Session.build_url(**kwargs)
+        kwargs.update(_canonical(kwargs.pop('filters', None) or {}))
+        url = session.Session.build_url(**kwargs)
         return url
     def setURL(self, **kwargs):
         [kwargs.update({attr: kwargs.get(attr) or getattr(self, '_{attr}'.format(attr=attr))})
@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. cube.py
+
+N-dimensional storage of datasets, in memory or memory-mapped on disk.
+
+**Description**
+
+A :class:`Cube` stores the observations of a dataset in a dense array with one
+axis per dimension, together with the codes of every dimension: selecting by
+codes only requires a dictionary lookup per code. Cubes of parts of a dataset
+(e.g., the responses of several queries) are merged with :meth:`Cube.merge`.
+
+A :class:`CubeStore` lays cubes out on disk as raw arrays (with the codes stored
+alongside in JSON): cubes are opened with :class:`numpy.memmap`, so that several
+processes share the same pages of memory instead of holding their own copy.
+
+**Usage**
+
+    >>> from cube import Cube, CubeStore
+    >>> cube = Cube.from_columns(reader.read_tsv('aact_ali01.tsv.gz'))
+    >>> store = CubeStore('/data/eurostat/cubes')
+    >>> store.save('aact_ali01', cube)
+    >>> cube = store.open('aact_ali01') # in any process
+    >>> sub = cube.loc(geo=['AT', 'BE'], time='2019')
+
+**Dependencies**
+
+*call*:         :mod:`settings`
+
+*require*:      :mod:`os`, :mod:`shutil`, :mod:`json`, :mod:`collections`, :mod:`numpy`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 13:46:30 2026
+
+__all__         = ['Cube', 'CubeStore']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import shutil
+from collections import OrderedDict
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+import numpy as np
+
+from .settings import pyroError
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class Cube(object):
+    """N-dimensional array of the observations of a dataset.
+
+        >>> cube = Cube(dims, codes, values, flags=None, flagcodes=None)
+
+    Arguments
+    ---------
+    dims : list
+        names of the dimensions, i.e. of the axes of :data:`values`.
+    codes : dict
+        codes of every dimension, in the order of the corresponding axis.
+    values : :class:`numpy.ndarray`
+        array of values, with :data:`numpy.nan` for missing observations.
+
+    Keyword Arguments
+    -----------------
+    flags : :class:`numpy.ndarray`
+        integer array of flags, with the same shape as :data:`values` and indexing
+        :data:`flagcodes`.
+    flagcodes : list
+        table of flags; the first flag is the empty string.
+    """
+
+    #/************************************************************************/
+    def __init__(self, dims, codes, values, flags=None, flagcodes=None):
+        self.dims       = list(dims)
+        self.codes      = OrderedDict([(d, [str(c) for c in codes[d]]) for d in self.dims])
+        self.values     = values
+        self.flags      = flags
+        self.flagcodes  = list(flagcodes or [''])
+        self._index     = {}
+        if tuple(values.shape) != self.shape:
+            raise pyroError('shape of VALUES inconsistent with the codes')
+        elif flags is not None and tuple(flags.shape) != self.shape:
+            raise pyroError('shape of FLAGS inconsistent with the codes')
+
+    #/************************************************************************/
+    @property
+    def shape(self):
+        return tuple([len(self.codes[d]) for d in self.dims])
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+    def __repr__(self):
+        return "<{} instance at {}: dimensions {}, shape {}>".format(self.__class__.__name__, id(self),
+                self.dims, self.shape)
+
+    #/************************************************************************/
+    def index(self, dim):
+        """Dictionary mapping the codes of a dimension to their position along
+        the corresponding axis.
+        """
+        if dim not in self.dims:
+            raise pyroError('dimension %s not found' % dim)
+        elif dim not in self._index:
+            self._index[dim] = {c: i for (i, c) in enumerate(self.codes[dim])}
+        return self._index[dim]
+
+    def positions(self, dim, codes):
+        """Positions of some codes of a dimension along its axis.
+        """
+        index = self.index(dim)
+        try:
+            return [index[c] for c in codes]
+        except KeyError as e:
+            raise pyroError('code %s not found in dimension %s' % (e.args[0], dim))
+
+    #/************************************************************************/
+    def loc(self, **kwargs):
+        """Select a sub-cube by codes.
+
+            >>> sub = cube.loc(geo=['AT', 'BE'], time='2019')
+
+        Keyword Arguments
+        -----------------
+        kwargs : dict
+            codes selected for the dimensions passed as keys: a single code
+            drops the dimension from the output, a list keeps it; dimensions
+            not passed are fully selected.
+
+        Returns
+        -------
+        sub : :class:`Cube`, float
+            the selected sub-cube, or value when all dimensions are set to a
+            single code.
+        """
+        unknown = set(kwargs.keys()) - set(self.dims)
+        if unknown != set():
+            raise pyroError('dimensions not found: %s' % list(unknown))
+        keys, dims, codes = [], [], OrderedDict()
+        for d in self.dims:
+            sel = kwargs.get(d)
+            if sel is None:
+                keys.append(slice(None))
+                dims.append(d)
+                codes[d] = self.codes[d]
+            elif isinstance(sel, str):
+                keys.append(self.positions(d, [sel])[0])
+            else:
+                sel = list(sel)
+                pos = self.positions(d, sel)
+                # contiguous selections are sliced, i.e. viewed without copy
+                if pos != [] and pos == list(range(pos[0], pos[0] + len(pos))):
+                    keys.append(slice(pos[0], pos[0] + len(pos)))
+                else:
+                    keys.append(np.asarray(pos, dtype=np.intp))
+                dims.append(d)
+                codes[d] = sel
+        values = self.__take(self.values, keys)
+        if dims == []:
+            return float(values)
+        flags = None if self.flags is None else self.__take(self.flags, keys)
+        return self.__class__(dims, codes, values, flags=flags, flagcodes=self.flagcodes)
+
+    @staticmethod
+    def __take(array, keys):
+        # index one axis at a time so that lists of positions are not broadcast
+        # against each other
+        ndim, out = 0, array
+        for key in keys:
+            out = out[(slice(None),) * ndim + (key,)]
+            if not isinstance(key, (int, np.integer)):
+                ndim += 1
+        return out
+
+    def get(self, **kwargs):
+        """Retrieve the value of a single observation.
+        """
+        if set(kwargs.keys()) != set(self.dims):
+            raise pyroError('all dimensions need to be set')
+        return self.loc(**kwargs)
+
+    #/************************************************************************/
+    @classmethod
+    def merge(cls, cubes):
+        """Merge cubes with the same dimensions into one cube whose codes are the
+        union of the codes of the cubes (in order of appearance).
+
+            >>> cube = Cube.merge(cubes)
+
+        Note
+        ----
+        Cubes are written in turn: where cubes overlap, the observations of the
+        last cubes (values or flags) overwrite those of the first ones, while
+        their missing observations are ignored.
+        """
+        cubes = list(cubes)
+        if cubes == []:
+            raise pyroError('no cube to merge')
+        dims = cubes[0].dims
+        if any([c.dims != dims for c in cubes[1:]]):
+            raise pyroError('cubes with different dimensions')
+        codes = OrderedDict([(d, list(OrderedDict.fromkeys([x for c in cubes for x in c.codes[d]])))
+                             for d in dims])
+        flagcodes = list(OrderedDict.fromkeys([''] + [f for c in cubes for f in c.flagcodes]))
+        shape = tuple([len(codes[d]) for d in dims])
+        values = np.full(shape, np.nan, dtype=np.result_type(*[c.values.dtype for c in cubes]))
+        flags = np.zeros(shape, dtype=np.int16)
+        index = OrderedDict([(d, {x: i for (i, x) in enumerate(codes[d])}) for d in dims])
+        lookup = {f: i for (i, f) in enumerate(flagcodes)}
+        for cube in cubes:
+            key = np.ix_(*[np.asarray([index[d][x] for x in cube.codes[d]], dtype=np.intp) for d in dims])
+            cflags = np.zeros(cube.shape, dtype=np.int16) if cube.flags is None             \
+                else np.asarray([lookup[f] for f in cube.flagcodes], dtype=np.int16)[cube.flags]
+            mask = ~np.isnan(cube.values) | (cflags != 0)
+            block, fblock = values[key], flags[key]
+            block[mask], fblock[mask] = cube.values[mask], cflags[mask]
+            values[key], flags[key] = block, fblock
+        return cls(dims, codes, values, flags=flags, flagcodes=flagcodes)
+
+    @classmethod
+    def from_columns(cls, table, dtype=np.float64):
+        """Build a (dense) cube from a :class:`reader.Columns` table.
+        """
+        shape = tuple([len(table.codes[d]) for d in table.dims])
+        values = np.full(shape, np.nan, dtype=dtype)
+        flags = np.zeros(shape, dtype=np.int16)
+        key = tuple([table.indices[d] for d in table.dims])
+        values[key] = table.values
+        flags[key] = table.flags
+        return cls(table.dims, table.codes, values, flags=flags, flagcodes=table.flagcodes)
+
+
+#%%
+class CubeStore(object):
+    """Directory of cubes stored as memory-mappable arrays.
+
+        >>> store = CubeStore(root)
+
+    Every cube is stored in a folder :literal:`{root}/{name}` with the raw arrays
+    of values (:literal:`values.dat`) and flags (:literal:`flags.dat`), and a
+    :literal:`index.json` file with the dimensions, codes, shape and type of the
+    arrays.
+
+    A new version of a cube is written in a temporary folder; the former version
+    is then renamed aside, and only removed once the new one is renamed in place.
+    """
+
+    INDEX   = 'index.json'
+    VALUES  = 'values.dat'
+    FLAGS   = 'flags.dat'
+    TMP     = '.tmp'
+    OLD     = '.old'
+
+    #/************************************************************************/
+    def __init__(self, root):
+        if not isinstance(root, str):
+            raise pyroError('wrong type for ROOT parameter')
+        self._root = root
+        self._cubes = {}
+
+    #/************************************************************************/
+    @property
+    def root(self):
+        return self._root
+    def path(self, name):
+        return os.path.join(self._root, name)
+    def __contains__(self, name):
+        return os.path.exists(os.path.join(self.path(name), self.INDEX))
+    @property
+    def names(self):
+        if not os.path.exists(self._root):
+            return []
+        return sorted([n for n in os.listdir(self._root)
+                       if not n.endswith((self.TMP, self.OLD)) and n in self])
+
+    #/************************************************************************/
+    def save(self, name, cube):
+        """Store a cube under a given name, replacing any former version.
+
+            >>> store.save(name, cube)
+        """
+        path = self.path(name)
+        tmp, old = '%s%s' % (path, self.TMP), '%s%s' % (path, self.OLD)
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+        index = {'dims': cube.dims, 'codes': cube.codes, 'shape': list(cube.shape),
+                 'dtype': np.dtype(cube.values.dtype).str, 'flagcodes': cube.flagcodes,
+                 'flags': None if cube.flags is None else np.dtype(cube.flags.dtype).str}
+        for (fname, array) in ((self.VALUES, cube.values), (self.FLAGS, cube.flags)):
+            if array is None or array.size == 0:
+                continue
+            out = np.memmap(os.path.join(tmp, fname), dtype=array.dtype, mode='w+', shape=array.shape)
+            out[...] = array
+            out.flush()
+            del out
+        with open(os.path.join(tmp, self.INDEX), 'w') as f:
+            json.dump(index, f)
+        self._cubes.pop(name, None)
+        # the former version is renamed aside (and restored on failure) instead
+        # of being removed before the new one is in place
+        if os.path.exists(old):
+            shutil.rmtree(old)
+        if os.path.exists(path):
+            os.rename(path, old)
+        try:
+            os.rename(tmp, path)
+        except:
+            if os.path.exists(old):
+                os.rename(old, path)
+            raise pyroError('impossible to store cube %s' % name)
+        shutil.rmtree(old, ignore_errors=True)
+
+    #/************************************************************************/
+    def open(self, name, mode='r'):
+        """Open a stored cube; its arrays are memory-mapped, i.e. not loaded in
+        memory: only the pages actually accessed are read from disk.
+
+            >>> cube = store.open(name, mode='r')
+
+        Keyword Arguments
+        -----------------
+        mode : str
+            mode of :class:`numpy.memmap`: :literal:`'r'` (read-only), :literal:`'r+'`
+            (read and write) or :literal:`'c'` (copy-on-write); default: :literal:`'r'`.
+        """
+        if mode not in ('r', 'r+', 'c'):
+            raise pyroError('wrong value for MODE parameter')
+        elif mode == 'r' and name in self._cubes:
+            return self._cubes[name]
+        elif name not in self:
+            raise pyroError('cube %s not found in store' % name)
+        path = self.path(name)
+        with open(os.path.join(path, self.INDEX), 'r') as f:
+            index = json.load(f)
+        shape = tuple(index['shape'])
+        def memmap(fname, dtype):
+            if dtype is None:
+                return None
+            elif int(np.prod(shape)) == 0:
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(os.path.join(path, fname), dtype=np.dtype(dtype), mode=mode, shape=shape)
+        cube = Cube(index['dims'], index['codes'], memmap(self.VALUES, index['dtype']),
+                    flags=memmap(self.FLAGS, index['flags']), flagcodes=index['flagcodes'])
+        if mode == 'r':
+            self._cubes[name] = cube
+        return cube
+
+    #/************************************************************************/
+    def remove(self, name):
+        self._cubes.pop(name, None)
+        if name in self:
+            shutil.rmtree(self.path(name))
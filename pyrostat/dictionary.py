@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. dictionary.py
+
+Code lists (dictionaries) of the bulk download service, loaded into compact
+code→label tables.
+
+**Description**
+
+Every dimension of Eurostat datasets comes with a dictionary :literal:`dic/{lang}/{dim}.dic`
+listing its codes and their labels (the list of dimensions itself is stored in
+:literal:`dimlist.dic`). Dictionaries are loaded into :class:`CodeList` instances,
+i.e. sorted arrays of codes and labels, which translate whole arrays of codes
+at once; they are persisted in binary :mod:`numpy` format so that other processes
+load them without parsing the text files again.
+
+**Usage**
+
+    >>> from dictionary import Dictionary
+    >>> D = Dictionary(lang='en', cache='/data/eurostat/dic')
+    >>> labels = D['geo'].translate(['AT', 'BE'])
+    >>> labels = D.translate(table, 'geo') # table: reader.Columns
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`collection`
+
+*require*:      :mod:`os`, :mod:`sys`, :mod:`io`, :mod:`gzip`, :mod:`numpy`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 13:10:22 2026
+
+__all__         = ['CodeList', 'Dictionary']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os, sys
+import io
+import gzip
+
+import numpy as np
+
+from . import settings
+from .settings import pyroError
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class CodeList(object):
+    """Code list of a dimension, i.e. table of codes and labels.
+
+        >>> C = CodeList(name, codes, labels, lang='en')
+
+    Codes are stored sorted, so that arrays of codes are translated by binary
+    search, and interned, so that the labels returned share their memory.
+    """
+
+    #/************************************************************************/
+    def __init__(self, name, codes, labels, lang=None):
+        if len(codes) != len(labels):
+            raise pyroError('codes and labels of different lengths')
+        codes = np.asarray([str(c) for c in codes], dtype=str)
+        order = np.argsort(codes, kind='stable')
+        self.name   = name
+        self.lang   = lang
+        self.codes  = codes[order]
+        self.labels = np.asarray([sys.intern(str(l)) for l in labels], dtype=object)[order]
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.codes)
+    def __contains__(self, code):
+        i = np.searchsorted(self.codes, code)
+        return i < len(self.codes) and self.codes[i] == code
+    def __getitem__(self, code):
+        return self.translate([code], strict=True)[0]
+    def __repr__(self):
+        return "<{} instance at {}: {} ({}), {} codes>".format(self.__class__.__name__, id(self),
+                self.name, self.lang, len(self))
+
+    #/************************************************************************/
+    def lookup(self, codes):
+        """Positions of an array of codes in the code list; :data:`-1` for the
+        codes which are not found.
+        """
+        codes = np.asarray(codes, dtype=str)
+        if len(self.codes) == 0:
+            return np.full(codes.shape, -1, dtype=np.int64)
+        pos = np.searchsorted(self.codes, codes)
+        pos[pos >= len(self.codes)] = 0
+        pos[self.codes[pos] != codes] = -1
+        return pos
+
+    def translate(self, codes, **kwargs):
+        """Translate an array of codes into their labels.
+
+            >>> labels = C.translate(codes, default=None, strict=False)
+
+        Arguments
+        ---------
+        codes : array-like
+            codes to translate.
+
+        Keyword Arguments
+        -----------------
+        default :
+            label of the codes not found in the code list; default: the code itself.
+        strict : bool
+            flag set to raise an error when a code is not found; default: :data:`False`.
+
+        Returns
+        -------
+        labels : :class:`numpy.ndarray`
+            array of labels, with the same shape as :data:`codes`.
+        """
+        codes = np.asarray(codes, dtype=str)
+        pos = self.lookup(codes)
+        missing = pos < 0
+        if missing.any():
+            if kwargs.get('strict', False) is True:
+                raise pyroError('codes not found in %s: %s' % (self.name, np.unique(codes[missing]).tolist()))
+            labels = np.empty(codes.shape, dtype=object)
+            labels[~missing] = self.labels.take(pos[~missing])
+            default = kwargs.get('default')
+            labels[missing] = codes[missing] if default is None else default
+            return labels
+        return self.labels.take(pos)
+
+    def translate_indices(self, table, indices, **kwargs):
+        """Translate an integer-coded column, i.e. indices into a (small) table of
+        codes: the table is translated once, then the column in a single take.
+
+            >>> labels = C.translate_indices(table, indices, **kwargs)
+        """
+        return self.translate(table, **kwargs).take(np.asarray(indices))
+
+    #/************************************************************************/
+    def save(self, path):
+        """Save the code list in binary (:literal:`.npz`) format.
+        """
+        dirname = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        with open(path, 'wb') as f:
+            np.savez(f, codes=self.codes, labels=self.labels.astype(str),
+                     meta=np.asarray([self.name or '', self.lang or ''], dtype=str))
+    @classmethod
+    def load(cls, path):
+        """Load a code list saved with :meth:`save`.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            name, lang = data['meta'].tolist()
+            inst = cls.__new__(cls)
+            inst.name, inst.lang = name or None, lang or None
+            # codes were already sorted when saved
+            inst.codes = data['codes']
+            inst.labels = np.asarray([sys.intern(l) for l in data['labels'].tolist()], dtype=object)
+        return inst
+
+    #/************************************************************************/
+    @classmethod
+    def parse(cls, content, name=None, lang=None):
+        """Parse the (possibly gzipped) content of a :literal:`.dic` file, i.e.
+        lines :literal:`code<TAB>label`.
+        """
+        if isinstance(content, bytes):
+            if content[:2] == b'\x1f\x8b':
+                content = gzip.decompress(content)
+            content = content.decode('utf-8', 'replace')
+        codes, labels = [], []
+        for line in io.StringIO(content):
+            line = line.rstrip('\r\n')
+            if line.strip() == '':
+                continue
+            code, _, label = line.partition('\t')
+            codes.append(code.strip())
+            labels.append(label.strip())
+        return cls(name, codes, labels, lang=lang)
+
+
+#%%
+class Dictionary(object):
+    """Collection of the code lists of the bulk download service in a given
+    language.
+
+        >>> D = Dictionary(lang='en', source=None, cache=None, bulk=None)
+
+    Keyword Arguments
+    -----------------
+    lang : str
+        language of the labels; default: the first of :data:`settings.LANGS`.
+    source : str
+        local directory storing a copy of the :literal:`dic/` folder of the bulk
+        repository (e.g., kept up to date with :class:`sync.Sync`); when the
+        :literal:`.dic` file of a dimension is not found there, it is downloaded.
+    cache : str
+        directory where the code lists are persisted in binary format; when
+        :data:`None`, they are only kept in memory.
+    bulk : :class:`collection.Bulk`
+        instance used to download the dictionaries; default: a new instance.
+    """
+
+    DIMLIST = settings.BULK_LIST['dic']
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self._lang      = kwargs.pop('lang', None) or settings.LANGS[0]
+        if self._lang not in settings.LANGS:
+            raise pyroError('language LANG not recognised')
+        self._source    = kwargs.pop('source', None)
+        self._cache     = kwargs.pop('cache', None)
+        self._bulk      = kwargs.pop('bulk', None)
+        self._lists     = {}
+
+    #/************************************************************************/
+    @property
+    def lang(self):
+        return self._lang
+    @property
+    def bulk(self):
+        if self._bulk is None:
+            from . import collection
+            self._bulk = collection.Bulk(lang=self.lang)
+        return self._bulk
+
+    #/************************************************************************/
+    def __cached(self, name):
+        if self._cache is None:
+            return None
+        return os.path.join(self._cache, self.lang, '%s.npz' % name)
+
+    def __read(self, name):
+        if self._source is not None:
+            for ext in ('dic', 'dic.gz'):
+                path = os.path.join(self._source, self.lang, '%s.%s' % (name, ext))
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        return f.read()
+        bulk = self.bulk
+        return bulk.session.get_response(bulk.build_url(file=bulk.build_file('dic', name))).content
+
+    #/************************************************************************/
+    def load(self, name, force=False):
+        """Load the code list of a dimension, from memory, from its binary copy
+        in the cache or from the :literal:`.dic` file (in this order).
+
+            >>> codelist = D.load(name, force=False)
+        """
+        if force is False and name in self._lists:
+            return self._lists[name]
+        cached = self.__cached(name)
+        if force is False and cached is not None and os.path.exists(cached):
+            codelist = CodeList.load(cached)
+        else:
+            try:
+                content = self.__read(name)
+            except:
+                raise pyroError('impossible to load dictionary %s' % name)
+            codelist = CodeList.parse(content, name=name, lang=self.lang)
+            if cached is not None:
+                codelist.save(cached)
+        self._lists[name] = codelist
+        return codelist
+
+    def __getitem__(self, name):
+        return self.load(name)
+    def __contains__(self, name):
+        return name in self.dimensions
+
+    #/************************************************************************/
+    @property
+    def dimensions(self):
+        """Code list of the dimensions, as stored in :literal:`dimlist.dic`.
+        """
+        return self.load(self.DIMLIST)
+
+    #/************************************************************************/
+    def translate(self, table, dim, **kwargs):
+        """Translate a column of a :class:`reader.Columns` table into labels.
+
+            >>> labels = D.translate(table, dim, default=None, strict=False)
+        """
+        if dim == settings.BULK_TIME or dim not in table.dims:
+            raise pyroError('dimension %s cannot be translated' % dim)
+        return self.load(dim).translate_indices(table.codes[dim], table.indices[dim], **kwargs)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. diff.py
+
+Differences between two versions of the bulk metabase and table of contents.
+
+**Description**
+
+After every update of Eurostat database, a :class:`MetaDiff` compares the old
+and new versions of the metadata and reports:
+
+* the datasets added to, removed from, or changed in the metabase,
+* the dimensions added to or removed from every dataset,
+* the codes added to or removed from every dimension of every dataset,
+* the entries of the table of contents whose dates (last update, last structure
+  change, first and last periods) changed,
+
+so that the caches built upon the datasets can be invalidated selectively (see
+:meth:`MetaDiff.affected`).
+
+The metabases are compared on their integer-coded columns (see :class:`metabase.CompactMetabase`):
+the codes of both versions are mapped onto shared tables, every row is packed
+into a single integer key, and the differences are computed with sorted set
+operations on the keys.
+
+**Usage**
+
+    >>> from diff import MetaDiff
+    >>> D = MetaDiff(old_compact, new_compact, old_toc=old_toc, new_toc=new_toc)
+    >>> D.datasets['added']
+    ['ei_bsco_m']
+    >>> D.labels[('aact_ali01', 'time')]
+    OrderedDict([('added', ['2020']), ('removed', [])])
+    >>> D.affected()
+    ['aact_ali01', 'ei_bsco_m', ...]
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`metabase`
+
+*require*:      :mod:`collections`, :mod:`numpy`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 20:41:13 2026
+
+__all__         = ['MetaDiff']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+from collections import OrderedDict
+
+import numpy as np
+
+from .settings import pyroError
+from .metabase import CompactMetabase, _unique
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class MetaDiff(object):
+    """Differences between two versions of the metabase and of the table of contents.
+
+        >>> D = MetaDiff(old, new, old_toc=None, new_toc=None)
+
+    Arguments
+    ---------
+    old, new : :class:`metabase.CompactMetabase`
+        old and new versions of the metabase.
+
+    Keyword Arguments
+    -----------------
+    old_toc, new_toc : :class:`toc.TocTable`
+        old and new versions of the table of contents; when any is :data:`None`,
+        the tables of contents are not compared.
+
+    Attributes
+    ----------
+    datasets : :class:`collections.OrderedDict`
+        lists of the :literal:`'added'`, :literal:`'removed'` and :literal:`'changed'`
+        datasets of the metabase.
+    dimensions : dict
+        dimensions :literal:`'added'` and :literal:`'removed'` for the datasets
+        present in both versions.
+    labels : dict
+        codes :literal:`'added'` and :literal:`'removed'` for the dimensions of
+        the datasets present in both versions, indexed by :data:`(dataset, dimension)`.
+    toc : :class:`collections.OrderedDict`
+        entries :literal:`'added'` and :literal:`'removed'` of the table of
+        contents, and dates :literal:`'changed'` (a dictionary of :data:`(old, new)`
+        tuples per field, indexed by code).
+    """
+
+    FIELDS  = ('last_update', 'last_change', 'start', 'end')
+
+    #/************************************************************************/
+    def __init__(self, old, new, old_toc=None, new_toc=None):
+        if not all([isinstance(m, CompactMetabase) for m in (old, new)]):
+            raise pyroError('wrong type for OLD/NEW parameters')
+        self.datasets   = OrderedDict()
+        self.dimensions = OrderedDict()
+        self.labels     = OrderedDict()
+        self.toc        = OrderedDict()
+        self._compare_metabases(old, new)
+        if old_toc is not None and new_toc is not None:
+            self._compare_tocs(old_toc, new_toc)
+
+    @classmethod
+    def from_meta(cls, old, new):
+        """Compare the metadata loaded in two :class:`collection.Meta` instances.
+        """
+        def compact(meta):
+            meta.wait()
+            return meta._compact if meta._compact is not None else CompactMetabase.from_frame(meta.metabase)
+        return cls(compact(old), compact(new), old_toc=old._toctable, new_toc=new._toctable)
+
+    #/************************************************************************/
+    def __repr__(self):
+        return "<{} instance at {}: {} datasets added, {} removed, {} changed>".format(
+                self.__class__.__name__, id(self),
+                *[len(self.datasets[k]) for k in ('added', 'removed', 'changed')])
+    def __bool__(self):
+        return any([self.datasets[k] != [] for k in self.datasets])                 \
+            or any([self.toc[k] not in ([], {}) for k in self.toc])
+
+    #/************************************************************************/
+    def _compare_metabases(self, old, new):
+        # shared tables of codes of both versions
+        tables = OrderedDict([(k, {}) for k in CompactMetabase.KEYS])
+        def encode(compact):
+            return [np.array([tables[k].setdefault(v, len(tables[k])) for v in compact.tables[k]],
+                             dtype=np.int64)[np.asarray(compact.columns[k], dtype=np.int64)]
+                    for k in CompactMetabase.KEYS]
+        columns = [encode(old), encode(new)]
+        decode = OrderedDict([(k, list(t)) for (k, t) in tables.items()])
+        nk, nl = len(decode['dic']), len(decode['label'])
+        # keys of the datasets, of the (dataset, dimension) and (dataset, dimension, label) rows
+        keys = [[_unique(data), _unique(data * nk + dic), _unique((data * nk + dic) * nl + label)]
+                for (data, dic, label) in columns]
+        (odata, opairs, orows), (ndata, npairs, nrows) = keys
+        datasets = [decode['data'][i] for i in np.setdiff1d(ndata, odata, assume_unique=True)],   \
+            [decode['data'][i] for i in np.setdiff1d(odata, ndata, assume_unique=True)]
+        common = np.intersect1d(odata, ndata, assume_unique=True)
+        changed = set()
+        # dimensions added/removed in the datasets of both versions
+        for (key, pairs, others) in (('added', npairs, opairs), ('removed', opairs, npairs)):
+            diff = np.setdiff1d(pairs, others, assume_unique=True)
+            diff = diff[np.isin(diff // nk, common, assume_unique=False)]
+            for (d, k) in zip((diff // nk).tolist(), (diff % nk).tolist()):
+                entry = self.dimensions.setdefault(decode['data'][d],
+                                                   OrderedDict([('added', []), ('removed', [])]))
+                entry[key].append(decode['dic'][k])
+                changed.add(d)
+        # codes added/removed in the dimensions of both versions
+        both = np.intersect1d(opairs, npairs, assume_unique=True)
+        labels = np.asarray(decode['label'], dtype=object)
+        for (key, rows, others) in (('added', nrows, orows), ('removed', orows, nrows)):
+            diff = np.setdiff1d(rows, others, assume_unique=True)
+            pairs = diff // nl
+            keep = np.isin(pairs, both)
+            diff, pairs = diff[keep], pairs[keep]
+            # the keys are sorted: the codes of every pair are contiguous
+            starts = np.flatnonzero(np.append(True, pairs[1:] != pairs[:-1])) if len(pairs) else pairs
+            codes = labels[diff % nl].tolist()
+            for (p, start, end) in zip(pairs[starts].tolist(), starts.tolist(),
+                                       np.append(starts[1:], len(pairs)).tolist()):
+                entry = self.labels.setdefault((decode['data'][p // nk], decode['dic'][p % nk]),
+                                               OrderedDict([('added', []), ('removed', [])]))
+                entry[key].extend(codes[start:end])
+                changed.add(p // nk)
+        self.datasets['added'], self.datasets['removed'] = datasets
+        self.datasets['changed'] = [decode['data'][d] for d in sorted(changed)]
+
+    def _compare_tocs(self, old, new):
+        ocodes, ncodes = set(old.codes), set(new.codes)
+        self.toc['added'] = [c for c in new.codes if c not in ocodes]
+        self.toc['removed'] = [c for c in old.codes if c not in ncodes]
+        codes = [c for c in new.codes if c in ocodes]
+        orows = np.array([old.row(c) for c in codes], dtype=np.int64)
+        nrows = np.array([new.row(c) for c in codes], dtype=np.int64)
+        changed = OrderedDict()
+        for field in self.FIELDS:
+            ovalues = np.asarray(old.columns[field].tolist(), dtype=object)[orows]
+            nvalues = np.asarray(new.columns[field].tolist(), dtype=object)[nrows]
+            for i in np.flatnonzero(ovalues != nvalues).tolist():
+                changed.setdefault(codes[i], OrderedDict())[field] = (ovalues[i], nvalues[i])
+        self.toc['changed'] = OrderedDict([(c, changed[c]) for c in codes if c in changed])
+
+    #/************************************************************************/
+    def affected(self):
+        """Datasets whose cached data or metadata should be invalidated: datasets
+        added, removed or changed in the metabase, and entries of the table of
+        contents added, removed or whose dates changed.
+
+            >>> datasets = D.affected()
+        """
+        affected = set()
+        for key in ('added', 'removed', 'changed'):
+            affected.update(self.datasets.get(key, []))
+            affected.update(self.toc.get(key, []))
+        return sorted(affected)
+
+    def summary(self):
+        """Count the differences.
+        """
+        summary = OrderedDict([('datasets_%s' % k, len(v)) for (k, v) in self.datasets.items()])
+        summary['dimensions_added'] = sum([len(v['added']) for v in self.dimensions.values()])
+        summary['dimensions_removed'] = sum([len(v['removed']) for v in self.dimensions.values()])
+        summary['labels_added'] = sum([len(v['added']) for v in self.labels.values()])
+        summary['labels_removed'] = sum([len(v['removed']) for v in self.labels.values()])
+        summary.update([('toc_%s' % k, len(v)) for (k, v) in self.toc.items()])
+        return summary
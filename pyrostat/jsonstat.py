@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. jsonstat.py
+
+Vectorised decoding of the JSON-stat responses of the REST service.
+
+**Description**
+
+The REST service returns the datasets in JSON-stat format: the dimensions
+(:literal:`id`, :literal:`size`), the categories of every dimension
+(:literal:`dimension[dim]['category']['index']` and :literal:`['label']`), and
+the observations (:literal:`value`) and their flags (:literal:`status`), given
+as dictionaries keyed by the position of the observation in the flattened
+(row-major) cube of all the categories.
+
+A :class:`JsonStat` decodes a response into numpy arrays: the sorted flat
+positions of the observations, their values and their flags (integer-coded,
+in a parallel array). The keys of the dictionaries are converted at once, with
+no Python loop over the observations. The decoded response is then converted
+into a dense :class:`cube.Cube`, or into a sparse :class:`reader.Columns` table
+whose integer columns index the codes of every dimension.
+
+The responses are parsed directly from the raw bytes of their content, i.e. with
+no text decoding, by the fastest JSON backend installed: :mod:`orjson`, then
+:mod:`simdjson`, then the standard :mod:`json` module (see :func:`loads`); the
+error envelopes of the responses are raised by :func:`check_error`.
+
+**Usage**
+
+    >>> from jsonstat import JsonStat
+    >>> J = JsonStat.decode(response.content)
+    >>> J.dims
+    ['unit', 'geo', 'time']
+    >>> cube = J.to_cube()
+    >>> table = J.to_columns()
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`reader`, :mod:`cube`
+
+*require*:      :mod:`json`, :mod:`collections`, :mod:`numpy`
+
+*optional*:     :mod:`orjson`, :mod:`simdjson`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 21:17:40 2026
+
+__all__         = ['JsonStat', 'loads', 'check_error']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+from collections import OrderedDict
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+try:
+    import orjson
+except ImportError:
+    ORJSON_INSTALLED = False
+else:
+    ORJSON_INSTALLED = True
+
+try:
+    import simdjson
+except ImportError:
+    SIMDJSON_INSTALLED = False
+else:
+    SIMDJSON_INSTALLED = True
+
+import numpy as np
+
+from .settings import pyroError
+from .reader import Columns
+from .cube import Cube
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+def loads(content):
+    """Parse a JSON content (preferably bytes, parsed as they are) with the fastest
+    backend installed.
+
+        >>> payload = loads(response.content)
+    """
+    try:
+        if ORJSON_INSTALLED:
+            return orjson.loads(content)
+        elif SIMDJSON_INSTALLED:
+            return simdjson.loads(bytes(content) if isinstance(content, memoryview) else content)
+        return json.loads(bytes(content) if isinstance(content, memoryview) else content)
+    except ValueError:
+        raise pyroError('wrong JSON response')
+
+def check_error(payload):
+    """Raise the error reported in the envelope of an error response, e.g.
+    :literal:`{"error":{"status":"416","label":"Too many categories have been requested."}}`;
+    other payloads are ignored.
+
+        >>> check_error(payload)
+    """
+    if not isinstance(payload, dict) or 'error' not in payload:
+        return
+    error = payload['error']
+    if isinstance(error, dict):
+        raise pyroError('error %s: %s' % (error.get('status'), error.get('label')))
+    raise pyroError('error: %s' % error)
+
+def _positions(keys, n):
+    # flat positions given as the (string) keys of a JSON object: the keys are
+    # joined and parsed at once
+    keys = list(keys)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    positions = np.fromstring(','.join(keys), dtype=np.int64, sep=',')
+    if len(positions) != n:
+        raise pyroError('wrong keys of JSON-stat VALUE/STATUS')
+    return positions
+
+
+class JsonStat(object):
+    """Decoded JSON-stat response.
+
+        >>> J = JsonStat(dims, codes, positions, values, flags, flagcodes, labels=None, info=None)
+
+    Arguments
+    ---------
+    dims : list
+        names of the dimensions.
+    codes : dict
+        codes of the categories of every dimension, in the order of their index.
+    positions : :class:`numpy.ndarray`
+        sorted flat positions (in the row-major cube of all the categories) of
+        the observations.
+    values : :class:`numpy.ndarray`
+        values of the observations (:data:`numpy.nan` when an observation has
+        a flag, but no value).
+    flags : :class:`numpy.ndarray`
+        integer flags of the observations, indexing :data:`flagcodes`.
+    flagcodes : list
+        table of flags; the first flag is the empty string.
+
+    Keyword Arguments
+    -----------------
+    labels : dict
+        labels of the categories of every dimension.
+    info : dict
+        other (scalar) fields of the response, e.g. :literal:`'label'` or
+        :literal:`'updated'`.
+    """
+
+    #/************************************************************************/
+    def __init__(self, dims, codes, positions, values, flags, flagcodes, labels=None, info=None):
+        self.dims       = list(dims)
+        self.codes      = OrderedDict([(d, list(codes[d])) for d in self.dims])
+        self.positions  = positions
+        self.values     = values
+        self.flags      = flags
+        self.flagcodes  = list(flagcodes)
+        self.labels     = labels or OrderedDict()
+        self.info       = info or OrderedDict()
+        if len(positions) != len(values) or len(flags) != len(values):
+            raise pyroError('columns of different lengths')
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.values)
+    def __repr__(self):
+        return "<{} instance at {}: {} observations, dimensions {}, shape {}>".format(
+                self.__class__.__name__, id(self), len(self), self.dims, self.shape)
+    @property
+    def shape(self):
+        return tuple([len(self.codes[d]) for d in self.dims])
+    @property
+    def density(self):
+        size = int(np.prod(self.shape))
+        return len(self) / size if size > 0 else 0.
+
+    #/************************************************************************/
+    @classmethod
+    def decode(cls, payload):
+        """Decode a JSON-stat response.
+
+            >>> J = JsonStat.decode(payload)
+
+        Arguments
+        ---------
+        payload : bytes, str, dict
+            content of the response (preferably the raw bytes), or response already
+            parsed.
+
+        Note
+        ----
+        Error responses of the service (e.g., :literal:`{"error":{"status":"416","label":"Too many categories..."}}`)
+        raise a :class:`pyroError`.
+        """
+        if isinstance(payload, (str, bytes, bytearray, memoryview)):
+            payload = loads(payload)
+        if not isinstance(payload, dict):
+            raise pyroError('wrong type for PAYLOAD parameter')
+        check_error(payload)
+        dimension = payload.get('dimension', {})
+        # JSON-stat 2.0 (top level) or 1.0 (dimension level) identifiers and sizes
+        dims = payload.get('id') or dimension.get('id')
+        sizes = payload.get('size') or dimension.get('size')
+        if dims is None or sizes is None:
+            raise pyroError('wrong JSON-stat response - dimensions not found')
+        codes, labels = OrderedDict(), OrderedDict()
+        for (dim, size) in zip(dims, sizes):
+            category = dimension[dim].get('category', {})
+            index = category.get('index')
+            if index is None:
+                index = list(category.get('label', {}).keys())
+            if isinstance(index, dict):
+                ordered = [None] * len(index)
+                for (code, pos) in index.items():
+                    ordered[pos] = code
+                index = ordered
+            if len(index) != size:
+                raise pyroError('wrong JSON-stat response - size of dimension %s' % dim)
+            codes[dim] = index
+            label = category.get('label', {})
+            labels[dim] = [label.get(c, c) for c in index]
+        size = int(np.prod(sizes)) if sizes != [] else 1
+        # observations
+        value = payload.get('value', {})
+        if isinstance(value, dict):
+            vpos = _positions(value.keys(), len(value))
+            try:
+                vals = np.fromiter(value.values(), dtype=np.float64, count=len(value))
+            except TypeError: # null values
+                vals = np.array(list(value.values()), dtype=np.float64)
+        else:
+            vals = np.array(value, dtype=np.float64)
+            vpos = np.flatnonzero(~np.isnan(vals))
+            vals = vals[vpos]
+        # flags
+        status = payload.get('status', {})
+        if isinstance(status, str):
+            status = {str(p): status for p in vpos.tolist()}
+        elif isinstance(status, list):
+            status = {str(p): s for (p, s) in enumerate(status) if s not in (None, '')}
+        flagcodes = {'': 0}
+        spos = _positions(status.keys(), len(status))
+        sflags = np.fromiter((flagcodes.setdefault(s, len(flagcodes)) for s in status.values()),
+                             dtype=np.int16, count=len(status))
+        # union of the positions with a value or a flag, sorted
+        if len(spos) == 0 or np.isin(spos, vpos).all():
+            order = np.argsort(vpos, kind='stable')
+            positions, values = vpos[order], vals[order]
+        else:
+            positions = np.union1d(vpos, spos)
+            values = np.full(len(positions), np.nan, dtype=np.float64)
+            values[np.searchsorted(positions, vpos)] = vals
+        if positions.size > 0 and (positions[0] < 0 or positions[-1] >= size):
+            raise pyroError('wrong JSON-stat response - positions out of range')
+        flags = np.zeros(len(positions), dtype=np.int16)
+        flags[np.searchsorted(positions, spos)] = sflags
+        info = OrderedDict([(k, v) for (k, v) in payload.items()
+                            if k not in ('id', 'size', 'dimension', 'value', 'status')
+                            and not isinstance(v, (dict, list))])
+        return cls(dims, codes, positions, values, flags, list(flagcodes), labels=labels, info=info)
+
+    #/************************************************************************/
+    def coordinates(self):
+        """Positions of the observations along every dimension, i.e. integer
+        columns indexing the codes of the dimensions.
+
+            >>> indices = J.coordinates()
+        """
+        if self.dims == []:
+            return OrderedDict()
+        indices = np.unravel_index(self.positions, self.shape)
+        return OrderedDict([(d, i.astype(np.int32)) for (d, i) in zip(self.dims, indices)])
+
+    def to_columns(self):
+        """Convert the observations into a (sparse) :class:`reader.Columns` table.
+        """
+        return Columns(self.dims, self.codes, self.coordinates(), self.values, self.flags, self.flagcodes)
+
+    def dense(self, dtype=np.float64):
+        """Scatter the observations into dense arrays of values (:data:`numpy.nan`
+        when missing) and flags, of shape :data:`shape`.
+
+            >>> values, flags = J.dense(dtype=np.float64)
+        """
+        values = np.full(self.shape, np.nan, dtype=dtype)
+        flags = np.zeros(self.shape, dtype=np.int16)
+        values.reshape(-1)[self.positions] = self.values
+        flags.reshape(-1)[self.positions] = self.flags
+        return values, flags
+
+    def to_cube(self, dtype=np.float64):
+        """Convert the observations into a dense :class:`cube.Cube`.
+        """
+        values, flags = self.dense(dtype=dtype)
+        return Cube(self.dims, self.codes, values, flags=flags, flagcodes=self.flagcodes)
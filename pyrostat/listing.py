@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. listing.py
+
+Parser and index of the files reported in the bulk download listing.
+
+**Description**
+
+The pages of the `BulkDownloadListing` service (one per first letter for datasets,
+one per language for dictionaries) report the name, size, type and date of every
+file. Once parsed, these pages are stored in a single :class:`Listing` index with
+a time of expiry, so that membership and last update lookups are answered in
+constant time without loading the pages again.
+
+The pages are parsed by :func:`parse_listing`, a lightweight event-driven parser
+which only looks for the :literal:`filelist` table and extracts its rows directly,
+without building the whole document tree: :mod:`lxml` pull parser is used when 
+available, :class:`ListingParser` (based on :mod:`html.parser`) otherwise.
+
+**Usage**
+
+    >>> from listing import Listing, parse_listing
+    >>> rows = parse_listing(html)
+    >>> L = Listing()
+    >>> L.update('a', [('aact_ali01.tsv.gz', 2048, 'tsv', '05/02/2019 23:00:00')])
+    >>> 'aact_ali01' in L
+        True
+
+**Dependencies**
+
+*require*:      :mod:`time`, :mod:`codecs`, :mod:`collections`, :mod:`html.parser`
+
+*optional*:     :mod:`lxml`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 11:02:47 2026
+
+__all__         = ['ListingParser', 'parse_listing', 'Listing']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import time
+import codecs
+from collections import OrderedDict
+from html.parser import HTMLParser
+
+try:                                
+    from lxml import etree
+except ImportError:                 
+    LXML_INSTALLED = False
+else:
+    LXML_INSTALLED = True
+
+from . import settings
+from .settings import pyroError
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class ListingParser(HTMLParser):
+    """Event-driven parser of the pages of the bulk listing.
+
+        >>> parser = ListingParser(attrs={'class': 'filelist'})
+        >>> parser.feed(chunk) # as many times as needed
+        >>> parser.close()
+        >>> rows = parser.rows
+
+    Keyword Arguments
+    -----------------
+    attrs : dict
+        attributes identifying the table of files in the page; default: 
+        :literal:`{'class': 'filelist'}`; when no such table is found, the first
+        table of the page is used.
+    ncols : int
+        number of columns retained from every row, i.e. name, size, type and 
+        date; default: 4.
+
+    Note
+    ----
+    Since the parser does not build any document tree, the page can be fed in
+    chunks as it is downloaded; rows whose first cell is empty or which contain
+    the headers of the table are ignored.
+    """
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self._attrs     = kwargs.pop('attrs', None) or {'class': 'filelist'}
+        self._ncols     = kwargs.pop('ncols', 4)
+        self._rows      = []    # rows of the table identified by attrs
+        self._first     = None  # rows of the first table, used if none matches
+        self._depth     = 0     # depth of tables nested in the current table
+        self._match     = False # whether the current table matches attrs
+        self._row       = None
+        self._cell      = None
+
+    #/************************************************************************/
+    @property
+    def rows(self):
+        return self._rows if self._rows != [] or self._first is None else self._first
+
+    #/************************************************************************/
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            if self._depth == 0:
+                attrs = dict(attrs)
+                self._match = all([v in (attrs.get(k) or '').split() for (k, v) in self._attrs.items()])
+            self._depth += 1
+        elif self._depth != 1:
+            return
+        elif tag == 'tr':
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = [] if tag == 'td' else None
+
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            self._depth = max(0, self._depth - 1)
+            if self._depth == 0:
+                self._match = False
+        elif self._depth != 1:
+            return
+        elif tag in ('td', 'th') and self._row is not None:
+            if self._cell is not None:
+                self._row.append(''.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self.__add_row(self._row)
+            self._row, self._cell = None, None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    #/************************************************************************/
+    def __add_row(self, row):
+        row = _filter_row(row, self._ncols)
+        if row is None:
+            return
+        elif self._match:
+            self._rows.append(row)
+        elif self._rows == []:
+            if self._first is None:
+                self._first = []
+            self._first.append(row)
+
+
+#/****************************************************************************/
+_HEADERS = set([v for names in settings.BULK_NAMES.values() for v in names.values()])
+
+def _filter_row(row, ncols):
+    """Discard the empty, parent directory and header rows of the table; pad or
+    truncate the other ones to :data:`ncols` cells.
+    """
+    if row == [] or row[0] in ('', '..') or row[0] in _HEADERS:
+        return None
+    return tuple((row + [''] * ncols)[:ncols])
+
+def _lxml_rows(chunks, attrs, ncols, encoding):
+    """Parse the chunks of a page with :mod:`lxml` pull parser, keeping in memory
+    only the row being processed.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag='tr', encoding=encoding)
+    rows, first, ftable = [], [], None
+    def read_events():
+        nonlocal ftable
+        for _, tr in parser.read_events():
+            table = tr.getparent()
+            if table is not None and table.tag != 'table':  # tbody/thead
+                table = table.getparent()
+            # note: the cells of the listing contain at most one level of tags,
+            # e.g. <td><a href=...>name</a></td>
+            row = _filter_row([((td.text or '') + ''.join([(c.text or '') + (c.tail or '') for c in td])).strip()
+                               for td in tr.iterchildren('td')], ncols)
+            tr.clear()
+            if row is None or table is None:
+                continue
+            elif all([v in (table.get(k) or '').split() for (k, v) in attrs.items()]):
+                rows.append(row)
+            elif rows == [] and (ftable is None or ftable is table):
+                ftable = table
+                first.append(row)
+    for chunk in chunks:
+        parser.feed(chunk)
+        read_events()
+    parser.close()
+    read_events()
+    return rows or first
+
+def parse_listing(html, **kwargs):
+    """Parse a page of the bulk listing.
+
+        >>> rows = parse_listing(html, attrs={'class': 'filelist'})
+
+    Arguments
+    ---------
+    html : str, bytes, iterable
+        content of the page, or iterable over chunks of it (e.g., as returned by
+        :meth:`requests.Response.iter_content`).
+
+    Keyword Arguments
+    -----------------
+    attrs, ncols :
+        see :class:`ListingParser`.
+    encoding : str
+        encoding used to decode :data:`bytes` content; default: :literal:`'utf-8'`.
+    parser : str
+        either :literal:`'lxml'` or :literal:`'html.parser'`; default: 
+        :literal:`'lxml'` when the module is available.
+
+    Returns
+    -------
+    rows : list
+        rows :data:`(name, size, type, date)` of the table of files, as strings.
+    """
+    encoding = kwargs.pop('encoding', None) or 'utf-8'
+    parser = kwargs.pop('parser', None) or ('lxml' if LXML_INSTALLED else 'html.parser')
+    if parser not in ('lxml', 'html.parser'):
+        raise pyroError('unknown listing parser')
+    elif parser == 'lxml' and not LXML_INSTALLED:
+        raise pyroError('listing parser not supported in the absence of module lxml')
+    if isinstance(html, (str, bytes)):
+        html = [html]
+    if parser == 'lxml':
+        try:
+            return _lxml_rows(html, kwargs.get('attrs') or {'class': 'filelist'}, 
+                              kwargs.get('ncols', 4), encoding)
+        except:
+            raise pyroError('impossible to parse listing page')
+    # chunks of bytes may split multibyte characters: decode them incrementally
+    decoder = codecs.getincrementaldecoder(encoding)('replace')
+    parser = ListingParser(**kwargs)
+    try:
+        for chunk in html:
+            parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+    except:
+        raise pyroError('impossible to parse listing page')
+    return parser.rows
+
+
+#%%
+class Listing(object):
+    """Index of the files reported in the pages of the bulk listing.
+
+        >>> L = Listing()
+
+    Files are indexed by their name (e.g., :literal:`'aact_ali01.tsv.gz'`) and by
+    the code of the table they store (e.g., :literal:`'aact_ali01'`); for every
+    page loaded, the time of loading is kept so that it can be reloaded once
+    expired.
+    """
+
+    FIELDS = ('name', 'size', 'type', 'date')
+
+    #/************************************************************************/
+    def __init__(self):
+        self._files     = {}    # file name -> (size, type, date)
+        self._codes     = {}    # table code -> [file names]
+        self._pages     = {}    # page -> (time of loading, [file names])
+
+    #/************************************************************************/
+    @staticmethod
+    def code(name):
+        """Code of the table stored in a file, i.e. its name without extension.
+        """
+        return name.split('.')[0]
+
+    #/************************************************************************/
+    def update(self, page, rows):
+        """Load (or reload) all the entries of a given page of the listing.
+
+            >>> L.update(page, rows)
+
+        Arguments
+        ---------
+        page : str
+            key of the page, e.g. the first letter of the datasets it lists.
+        rows : iterable
+            rows :data:`(name, size, type, date)` of the page.
+        """
+        self.remove(page)
+        names = []
+        for (name, size, typ, date) in rows:
+            name = str(name)
+            if name not in self._files:
+                self._codes.setdefault(self.code(name), []).append(name)
+            self._files[name] = (size, typ, date)
+            names.append(name)
+        self._pages[page] = (time.time(), names)
+
+    def remove(self, page):
+        """Remove all the entries of a given page of the listing.
+        """
+        _, names = self._pages.pop(page, (None, []))
+        for name in names:
+            self._files.pop(name, None)
+            code = self.code(name)
+            files = self._codes.get(code, [])
+            if name in files:
+                files.remove(name)
+            if files == []:
+                self._codes.pop(code, None)
+
+    #/************************************************************************/
+    def expired(self, page, expire_after=None):
+        """Check whether a page needs to be (re)loaded, i.e. it has never been
+        loaded or it was loaded more than :data:`expire_after` seconds ago; when
+        :data:`expire_after` is :data:`None`, pages never expire.
+        """
+        if page not in self._pages:
+            return True
+        elif expire_after is None:
+            return False
+        return time.time() - self._pages[page][0] >= expire_after
+    @property
+    def pages(self):
+        return list(self._pages.keys())
+
+    #/************************************************************************/
+    def __contains__(self, code):
+        return code in self._codes
+    def __len__(self):
+        return len(self._codes)
+    def __iter__(self):
+        return iter(self._codes)
+    def __getitem__(self, code):
+        row = self.get(code)
+        if row is None:
+            raise KeyError(code)
+        return row
+
+    #/************************************************************************/
+    def files(self, code):
+        """List the files storing a given table, in the order of the listing.
+        """
+        return list(self._codes.get(code, []))
+    def entry(self, name):
+        """Retrieve the entry of a given file as a dictionary with keys
+        :literal:`'name'`, :literal:`'size'`, :literal:`'type'` and :literal:`'date'`.
+        """
+        if name not in self._files:
+            return None
+        return dict(zip(self.FIELDS, (name,) + self._files[name]))
+    def get(self, code, ext=None):
+        """Retrieve the entry of the first file storing a given table, possibly
+        with a given extension (e.g., :literal:`'tsv.gz'`).
+        """
+        for name in self._codes.get(code, []):
+            if ext is None or name.endswith('.%s' % ext):
+                return self.entry(name)
+        return None
+
+    #/************************************************************************/
+    def select(self, pages=None, ext=None):
+        """Select the entries of the index loaded from some pages of the listing.
+
+            >>> entries = L.select(pages=None, ext=None)
+
+        Keyword Arguments
+        -----------------
+        pages : list
+            keys of the pages to select entries from; default: all loaded pages.
+        ext : str
+            when passed, only the files with this extension are selected.
+
+        Returns
+        -------
+        entries : :class:`collections.OrderedDict`
+            dictionary whose keys are table codes and values are the entries of
+            the first file storing them (see :meth:`get`).
+        """
+        if pages is None:
+            pages = self.pages
+        elif not isinstance(pages, (list, tuple)):
+            raise pyroError('wrong type for PAGES parameter')
+        entries = OrderedDict()
+        for page in pages:
+            for name in self._pages.get(page, (None, []))[1]:
+                if ext is not None and not name.endswith('.%s' % ext):
+                    continue
+                code = self.code(name)
+                if code not in entries:
+                    entries[code] = self.entry(name)
+        return entries
@@ -0,0 +1,631 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. metabase.py
+
+Indexes of the bulk metabase, i.e. of the dimensions and codes used by every
+dataset.
+
+**Description**
+
+The metabase (:literal:`metabase.txt.gz`) lists, for every dataset, the dimensions
+it uses and, for every dimension, the codes (labels) actually used. A :class:`MetaIndex`
+is built in a single pass over the metabase and stores the inverted indexes:
+
+* dataset → dimensions,
+* dimension → datasets,
+* (dataset, dimension) → labels,
+
+so that all the lookups of :class:`collection.Meta` are dictionary lookups,
+instead of grouping the whole metabase every time.
+
+A :class:`CompactMetabase` stores the metabase itself as three integer-coded
+columns indexing shared tables of codes, read straight from the (compressed)
+file: a few bytes per row instead of three Python strings. The columns can be
+saved on disk and memory-mapped, so that several workers share them.
+
+A :class:`MetaGraph` stores the sparse incidence matrices of the datasets with
+the dimensions and with the (dimension, code) pairs, to answer set queries over
+any combination of dimensions and codes: datasets using all or any of them, and
+datasets most similar to a given one.
+
+**Usage**
+
+    >>> from metabase import MetaIndex
+    >>> index = MetaIndex.from_frame(metabase)
+    >>> index.dimensions('aact_ali01')
+    ['itm_newa', 'unit', 'geo', 'time']
+    >>> index.validate('aact_ali01', {'geo': ['AT', 'XX']})
+    OrderedDict([('labels', {'geo': ['XX']})])
+    >>> compact = CompactMetabase.parse('metabase.txt.gz')
+    >>> compact.save('/data/eurostat/metabase')
+    >>> compact = CompactMetabase.load('/data/eurostat/metabase', mmap=True)
+    >>> index = MetaIndex.from_compact(compact)
+    >>> graph = MetaGraph.from_compact(compact)
+    >>> graph.intersection('geo', ('unit', 'EUR'))
+
+**Dependencies**
+
+*call*:         :mod:`settings`
+
+*require*:      :mod:`os`, :mod:`array`, :mod:`collections`, :mod:`numpy`
+
+*optional*:     :mod:`pandas`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 16:04:55 2026
+
+__all__         = ['MetaIndex', 'CompactMetabase', 'MetaGraph']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import array
+from collections import OrderedDict
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    PANDAS_INSTALLED = False
+else:
+    PANDAS_INSTALLED = True
+
+from . import settings
+from .settings import pyroError
+from .reader import _open
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class MetaIndex(object):
+    """Inverted indexes of the bulk metabase.
+
+        >>> index = MetaIndex(datasets, dimensions, labels)
+
+    Arguments
+    ---------
+    datasets, dimensions, labels : iterable
+        columns of the metabase, i.e. for every row, the dataset, the dimension
+        and the label.
+    """
+
+    #/************************************************************************/
+    def __init__(self, datasets, dimensions, labels):
+        # (dataset, dimension) -> labels, stored as ordered sets (dictionaries)
+        # so that both the order of the metabase and O(1) membership are kept
+        index, pdata, pdim, current = {}, None, None, None
+        for (data, dim, label) in zip(datasets, dimensions, labels):
+            # rows of the same dataset and dimension are contiguous in the metabase
+            if dim != pdim or data != pdata:
+                pdata, pdim = data, dim
+                current = index.setdefault((data, dim), {})
+            current[label] = None
+        self._labels    = index
+        self._dims      = OrderedDict()
+        self._datasets  = OrderedDict()
+        for (data, dim) in index.keys():
+            self._dims.setdefault(data, []).append(dim)
+            self._datasets.setdefault(dim, []).append(data)
+        self._all       = {} # dimension -> labels, over all datasets
+
+    @classmethod
+    def from_frame(cls, metabase):
+        """Build the indexes from the metabase loaded into a table with columns
+        named as in :data:`settings.BULK_NAMES['base']`.
+        """
+        try:
+            columns = [metabase[settings.BULK_NAMES['base'][k]] for k in ('data', 'dic', 'label')]
+            columns = [c.tolist() if hasattr(c, 'tolist') else c for c in columns]
+        except:
+            raise pyroError('wrong value for METABASE parameter')
+        return cls(*columns)
+
+    @classmethod
+    def from_compact(cls, compact):
+        """Build the indexes from a :class:`CompactMetabase`: the rows are
+        grouped by dataset and dimension on the integer columns.
+        """
+        data, dic, label = [compact.columns[k] for k in CompactMetabase.KEYS]
+        tdata, tdic, tlabel = [np.asarray(compact.tables[k], dtype=object) for k in CompactMetabase.KEYS]
+        n = len(data)
+        inst = cls([], [], [])
+        if n == 0:
+            return inst
+        # start of every run of rows with the same dataset and dimension
+        change = np.ones(n, dtype=bool)
+        change[1:] = (data[1:] != data[:-1]) | (dic[1:] != dic[:-1])
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], n)
+        for (start, end) in zip(starts.tolist(), ends.tolist()):
+            key = (tdata[data[start]], tdic[dic[start]])
+            labels = inst._labels.setdefault(key, {})
+            labels.update(dict.fromkeys(tlabel[label[start:end]].tolist()))
+        for (d, k) in inst._labels.keys():
+            inst._dims.setdefault(d, []).append(k)
+            inst._datasets.setdefault(k, []).append(d)
+        return inst
+
+    #/************************************************************************/
+    def __len__(self):
+        return sum([len(l) for l in self._labels.values()])
+    def __repr__(self):
+        return "<{} instance at {}: {} datasets, {} dimensions>".format(self.__class__.__name__,
+                id(self), len(self._dims), len(self._datasets))
+
+    #/************************************************************************/
+    def has_dataset(self, dataset):
+        return dataset in self._dims
+    def has_dimension(self, dimension, dataset=None):
+        if dataset is None:
+            return dimension in self._datasets
+        return self._labelset(dataset, dimension) is not None
+    def has_label(self, label, dimension, dataset=None):
+        if dataset is None:
+            return label in self._all_labels(dimension)
+        return label in (self._labelset(dataset, dimension) or ())
+
+    #/************************************************************************/
+    def datasets(self, dimension=None):
+        """Datasets using a given dimension, or all datasets when :data:`dimension`
+        is :data:`None`.
+        """
+        if dimension is None:
+            return list(self._dims.keys())
+        return list(self._datasets.get(dimension, []))
+    def dimensions(self, dataset=None):
+        """Dimensions used by a given dataset, or all dimensions when :data:`dataset`
+        is :data:`None`.
+        """
+        if dataset is None:
+            return list(self._datasets.keys())
+        return list(self._dims.get(dataset, []))
+    def labels(self, dimension, dataset=None):
+        """Labels of a given dimension, possibly restricted to those used by a
+        given dataset.
+        """
+        if dataset is None:
+            return list(self._all_labels(dimension))
+        return list(self._labelset(dataset, dimension) or ())
+
+    def _labelset(self, dataset, dimension):
+        # labels of a dimension in a dataset, as an ordered set; None when the
+        # dataset does not use the dimension
+        return self._labels.get((dataset, dimension))
+    def _all_labels(self, dimension):
+        if dimension not in self._all:
+            labels = {}
+            for data in self.datasets(dimension):
+                labels.update(self._labelset(data, dimension))
+            self._all[dimension] = labels
+        return self._all[dimension]
+
+    #/************************************************************************/
+    def check(self, datasets):
+        """Check, in one call, whether some datasets exist in the metabase.
+
+            >>> flags = index.check(datasets)
+        """
+        if isinstance(datasets, str):
+            datasets = [datasets]
+        return [self.has_dataset(d) for d in datasets]
+
+    def validate(self, dataset, filters=None):
+        """Validate a query, i.e. a dataset and codes selected for some of its
+        dimensions, against the metabase.
+
+            >>> errors = index.validate(dataset, filters=None)
+
+        Arguments
+        ---------
+        dataset : str
+            name of the dataset.
+
+        Keyword Arguments
+        -----------------
+        filters : dict
+            codes (a string or a list of strings) selected for some dimensions.
+
+        Returns
+        -------
+        errors : :class:`collections.OrderedDict`
+            errors found, with keys :literal:`'dataset'` (the dataset is not in
+            the metabase), :literal:`'dimensions'` (list of dimensions not used
+            by the dataset) and :literal:`'labels'` (dictionary of the codes not
+            used by the dataset, per dimension); empty when the query is valid.
+        """
+        errors = OrderedDict()
+        if not self.has_dataset(dataset):
+            errors['dataset'] = dataset
+            return errors
+        filters = filters or {}
+        dims = [d for d in filters if self._labelset(dataset, d) is None]
+        if dims != []:
+            errors['dimensions'] = dims
+        labels = {}
+        for (dim, codes) in filters.items():
+            if dim in dims:
+                continue
+            elif isinstance(codes, str):
+                codes = [codes]
+            used = self._labelset(dataset, dim)
+            unknown = [c for c in codes if c not in used]
+            if unknown != []:
+                labels[dim] = unknown
+        if labels != {}:
+            errors['labels'] = labels
+        return errors
+
+    def validate_many(self, queries):
+        """Validate a batch of queries.
+
+            >>> errors = index.validate_many(queries)
+
+        Arguments
+        ---------
+        queries : list
+            list of :data:`(dataset, filters)` tuples (see :meth:`validate`).
+
+        Returns
+        -------
+        errors : list
+            errors of every query (see :meth:`validate`), in the same order.
+        """
+        return [self.validate(dataset, filters) for (dataset, filters) in queries]
+
+
+#%%
+class CompactMetabase(object):
+    """Metabase stored as integer-coded columns.
+
+        >>> compact = CompactMetabase(tables, columns)
+
+    Arguments
+    ---------
+    tables : dict
+        tables of codes of the :literal:`'data'`, :literal:`'dic'` and :literal:`'label'`
+        columns; labels are shared by all dimensions.
+    columns : dict
+        integer arrays indexing the tables, one row per row of the metabase.
+    """
+
+    KEYS    = ('data', 'dic', 'label')
+    TABLES  = 'tables.json'
+
+    #/************************************************************************/
+    def __init__(self, tables, columns):
+        self.tables     = OrderedDict([(k, list(tables[k])) for k in self.KEYS])
+        self.columns    = OrderedDict([(k, columns[k]) for k in self.KEYS])
+        if len(set([len(c) for c in self.columns.values()])) > 1:
+            raise pyroError('columns of different lengths')
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.columns['data'])
+    def __repr__(self):
+        return "<{} instance at {}: {} rows, {} datasets, {} dimensions, {} labels>".format(
+                self.__class__.__name__, id(self), len(self),
+                *[len(self.tables[k]) for k in self.KEYS])
+    @property
+    def nbytes(self):
+        return sum([c.nbytes for c in self.columns.values()])
+
+    #/************************************************************************/
+    @classmethod
+    def parse(cls, source, chunk=2**24):
+        """Read the (possibly gzipped) metabase, given as a path, bytes or a file
+        object, into integer-coded columns.
+
+            >>> compact = CompactMetabase.parse(source, chunk=2**24)
+
+        Note
+        ----
+        The file is decompressed and read in blocks of :data:`chunk` bytes: the
+        fields of a whole block are split at once and encoded with one dictionary
+        lookup each, with no intermediate table of strings; labels are decoded
+        once per distinct label.
+        """
+        stream = _open(source)
+        tables = OrderedDict([(k, {}) for k in cls.KEYS])
+        columns = OrderedDict([(k, array.array('i')) for k in cls.KEYS])
+        rest = b''
+        try:
+            while True:
+                block = stream.read(chunk)
+                eof = block == b''
+                block = rest + block
+                if not eof:
+                    # keep the last (incomplete) line for the next block
+                    cut = block.rfind(b'\n') + 1
+                    block, rest = block[:cut], block[cut:]
+                block = block.replace(b'\r', b'').strip(b'\n')
+                if block != b'':
+                    fields = block.replace(b'\t', b'\n').split(b'\n')
+                    if len(fields) % 3 != 0:
+                        # blank or malformed lines: split the block line by line
+                        fields = [f for line in block.split(b'\n')
+                                  for f in (line.split(b'\t', 2) if line.count(b'\t') >= 2 else [])]
+                    for (i, k) in enumerate(cls.KEYS):
+                        table = tables[k]
+                        columns[k].extend([table.setdefault(f, len(table)) for f in fields[i::3]])
+                if eof:
+                    break
+        finally:
+            stream.close()
+        tables = {k: [c.decode('utf-8', 'replace') for c in t.keys()]
+                  for (k, t) in tables.items()}
+        columns = {k: np.frombuffer(c, dtype=np.int32) if len(c) > 0 else np.zeros(0, dtype=np.int32)
+                   for (k, c) in columns.items()}
+        return cls(tables, columns)
+
+    #/************************************************************************/
+    def save(self, path):
+        """Save the metabase in a directory: one :literal:`.npy` file per column,
+        and the tables of codes in JSON.
+        """
+        if not os.path.exists(path):
+            os.makedirs(path)
+        for (k, column) in self.columns.items():
+            np.save(os.path.join(path, '%s.npy' % k), np.ascontiguousarray(column))
+        tmp = os.path.join(path, '%s.tmp' % self.TABLES)
+        with open(tmp, 'w') as f:
+            json.dump(self.tables, f)
+        # the tables are written last: their presence marks a complete copy
+        os.replace(tmp, os.path.join(path, self.TABLES))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a metabase saved with :meth:`save`; the columns are memory-mapped
+        (read-only) unless :data:`mmap` is :data:`False`.
+        """
+        try:
+            with open(os.path.join(path, cls.TABLES), 'r') as f:
+                tables = json.load(f)
+            columns = {k: np.load(os.path.join(path, '%s.npy' % k), mmap_mode='r' if mmap else None)
+                       for k in cls.KEYS}
+        except:
+            raise pyroError('impossible to load metabase from %s' % path)
+        return cls(tables, columns)
+
+    @classmethod
+    def from_frame(cls, metabase):
+        """Encode the metabase loaded into a table with columns named as in
+        :data:`settings.BULK_NAMES['base']`.
+        """
+        tables, columns = OrderedDict(), OrderedDict()
+        try:
+            for k in cls.KEYS:
+                values, table = metabase[settings.BULK_NAMES['base'][k]].tolist(), {}
+                columns[k] = np.fromiter((table.setdefault(v, len(table)) for v in values),
+                                         dtype=np.int32, count=len(values))
+                tables[k] = list(table)
+        except:
+            raise pyroError('wrong value for METABASE parameter')
+        return cls(tables, columns)
+
+    @classmethod
+    def exists(cls, path):
+        return os.path.exists(os.path.join(path, cls.TABLES))
+
+    #/************************************************************************/
+    def column(self, key):
+        """Decode a column into an array of codes.
+        """
+        if key not in self.KEYS:
+            raise pyroError('column %s not recognised' % key)
+        return np.asarray(self.tables[key], dtype=object).take(self.columns[key])
+
+    def to_frame(self):
+        """Convert the metabase into a :class:`pandas.DataFrame` of categorical
+        columns, named as in :data:`settings.BULK_NAMES['base']`, sharing the
+        integer codes.
+        """
+        if PANDAS_INSTALLED is False:
+            raise pyroError('pandas package required')
+        names = settings.BULK_NAMES['base']
+        return pd.DataFrame(OrderedDict([(names[k], pd.Categorical.from_codes(np.asarray(self.columns[k]),
+                                                                               categories=self.tables[k]))
+                                         for k in self.KEYS]))
+
+
+#%%
+def _csr(rows, cols, n):
+    # compressed rows of a (sorted or not) list of (row, col) pairs
+    order = np.argsort(rows, kind='stable')
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=ptr[1:])
+    return ptr, cols[order].astype(np.int32)
+
+def _unique(keys):
+    # sorted distinct keys (sort-based, faster than hashing on large integer keys)
+    keys = np.sort(keys)
+    mask = np.ones(len(keys), dtype=bool)
+    mask[1:] = keys[1:] != keys[:-1]
+    return keys[mask]
+
+def _gather(ptr, idx, rows):
+    # concatenated content of some rows of a compressed matrix, with no loop
+    rows = np.asarray(rows, dtype=np.int64)
+    starts, lens = ptr[rows], ptr[rows + 1] - ptr[rows]
+    if len(rows) == 0 or lens.sum() == 0:
+        return np.zeros(0, dtype=idx.dtype)
+    offsets = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+    return idx[offsets]
+
+
+class MetaGraph(object):
+    """Sparse incidence matrices of the datasets and their dimensions and codes.
+
+        >>> graph = MetaGraph.from_compact(compact)
+
+    The metabase is seen as a bipartite graph between the datasets and the
+    dimensions (:literal:`'dimension'` relation), and between the datasets and
+    the pairs (dimension, code) (:literal:`'label'` relation). Every relation is
+    stored twice, as compressed sparse rows (dataset → features) and columns
+    (feature → datasets), so that set queries over any number of features are
+    computed with a few vectorised operations.
+
+    Note
+    ----
+    Features are given as names of dimensions (e.g., :literal:`'geo'`) or as
+    tuples :data:`(dimension, code)` (e.g., :literal:`('geo', 'AT')`).
+    """
+
+    RELATIONS   = ('dimension', 'label')
+
+    #/************************************************************************/
+    def __init__(self, datasets, dimensions, labels, incidences, pairs):
+        self._datasets  = list(datasets)
+        self._dimensions= list(dimensions)
+        self._labels    = list(labels)
+        self._codes     = OrderedDict([(k, {v: i for (i, v) in enumerate(t)})
+                                       for (k, t) in (('data', self._datasets), ('dic', self._dimensions),
+                                                      ('label', self._labels))])
+        # incidences: relation -> (row_ptr, row_idx, col_ptr, col_idx)
+        self._incidences= incidences
+        # sorted keys dimension * nlabels + code of the pairs
+        self._pairs     = pairs
+
+    @classmethod
+    def from_compact(cls, compact):
+        """Build the incidence matrices from a :class:`CompactMetabase`.
+        """
+        data, dic, label = [np.asarray(compact.columns[k], dtype=np.int64) for k in CompactMetabase.KEYS]
+        nd, nk, nl = [len(compact.tables[k]) for k in CompactMetabase.KEYS]
+        pairs, pinv = np.unique(dic * nl + label, return_inverse=True)
+        np_ = len(pairs)
+        incidences = {}
+        for (rel, keys, ncols) in (('dimension', _unique(data * nk + dic), nk),
+                                   ('label', _unique(data * np_ + pinv.reshape(-1)), np_)):
+            rows, cols = keys // ncols, keys % ncols
+            incidences[rel] = _csr(rows, cols, nd) + _csr(cols, rows, ncols)
+        return cls(compact.tables['data'], compact.tables['dic'], compact.tables['label'],
+                   incidences, pairs)
+
+    @classmethod
+    def from_frame(cls, metabase):
+        """Build the incidence matrices from the metabase loaded into a table with
+        columns named as in :data:`settings.BULK_NAMES['base']`.
+        """
+        return cls.from_compact(CompactMetabase.from_frame(metabase))
+
+    #/************************************************************************/
+    def __repr__(self):
+        return "<{} instance at {}: {} datasets, {} dimensions, {} codes>".format(self.__class__.__name__,
+                id(self), len(self._datasets), len(self._dimensions), len(self._pairs))
+    @property
+    def nbytes(self):
+        return self._pairs.nbytes + sum([sum([a.nbytes for a in inc]) for inc in self._incidences.values()])
+
+    #/************************************************************************/
+    def _relation(self, by):
+        if by not in self.RELATIONS:
+            raise pyroError('relation BY not recognised')
+        return self._incidences[by]
+    def _feature(self, feature):
+        # relation and position of a feature; position is -1 when not found
+        if isinstance(feature, str):
+            return 'dimension', self._codes['dic'].get(feature, -1)
+        try:
+            dim, label = feature
+        except:
+            raise pyroError('wrong type for FEATURE parameter')
+        dim, label = self._codes['dic'].get(dim), self._codes['label'].get(label)
+        if dim is None or label is None:
+            return 'label', -1
+        key = dim * len(self._labels) + label
+        pos = int(np.searchsorted(self._pairs, key))
+        return 'label', pos if pos < len(self._pairs) and self._pairs[pos] == key else -1
+    def _features(self, positions, by):
+        if by == 'dimension':
+            return [self._dimensions[p] for p in positions]
+        nl = len(self._labels)
+        return [(self._dimensions[k // nl], self._labels[k % nl]) for k in self._pairs[positions].tolist()]
+    def _dataset(self, dataset):
+        try:
+            return self._codes['data'][dataset]
+        except KeyError:
+            raise pyroError('dataset %s not found in metabase' % dataset)
+
+    def _counts(self, features):
+        # number of features (among those given) used by every dataset
+        counts = np.zeros(len(self._datasets), dtype=np.int64)
+        for by in self.RELATIONS:
+            positions = [p for (r, p) in map(self._feature, features) if r == by and p >= 0]
+            if positions != []:
+                _, _, ptr, idx = self._relation(by)
+                counts += np.bincount(_gather(ptr, idx, positions), minlength=len(self._datasets))
+        return counts
+
+    #/************************************************************************/
+    def intersection(self, *features):
+        """Datasets using all the given features.
+
+            >>> datasets = graph.intersection('geo', ('unit', 'EUR'))
+        """
+        if features == ():
+            return []
+        counts = self._counts(set(features))
+        return [self._datasets[i] for i in np.flatnonzero(counts == len(set(features)))]
+    def union(self, *features):
+        """Datasets using any of the given features.
+        """
+        return [self._datasets[i] for i in np.flatnonzero(self._counts(set(features)) > 0)]
+    def features(self, dataset, by='dimension'):
+        """Features (dimensions or pairs (dimension, code)) used by a dataset.
+        """
+        ptr, idx, _, _ = self._relation(by)
+        i = self._dataset(dataset)
+        return self._features(idx[ptr[i]:ptr[i + 1]], by)
+    def common(self, datasets, by='dimension'):
+        """Features shared by all the given datasets.
+
+            >>> dims = graph.common(['aact_ali01', 'aact_ali02'])
+        """
+        ptr, idx, col_ptr, _ = self._relation(by)
+        rows = sorted(set([self._dataset(d) for d in datasets]))
+        if rows == []:
+            return []
+        counts = np.bincount(_gather(ptr, idx, rows), minlength=len(col_ptr) - 1)
+        return self._features(np.flatnonzero(counts == len(rows)), by)
+
+    #/************************************************************************/
+    def similar(self, dataset, by='dimension', limit=10):
+        """Rank the datasets by similarity with a given dataset, measured by the
+        Jaccard index of their sets of features.
+
+            >>> ranking = graph.similar(dataset, by='dimension', limit=10)
+
+        Returns
+        -------
+        ranking : :class:`collections.OrderedDict`
+            the most similar datasets (sharing at least one feature), at most
+            :data:`limit`, with their similarity.
+        """
+        row_ptr, row_idx, col_ptr, col_idx = self._relation(by)
+        i = self._dataset(dataset)
+        shared = np.bincount(_gather(col_ptr, col_idx, row_idx[row_ptr[i]:row_ptr[i + 1]]),
+                             minlength=len(self._datasets))
+        sizes = np.diff(row_ptr)
+        union = sizes[i] + sizes - shared
+        score = np.where(union > 0, shared / np.maximum(union, 1), 0.)
+        score[i] = 0.
+        candidates = np.flatnonzero(score > 0)
+        order = candidates[np.argsort(-score[candidates], kind='stable')]
+        if limit is not None:
+            order = order[:limit]
+        return OrderedDict([(self._datasets[j], float(score[j])) for j in order.tolist()])
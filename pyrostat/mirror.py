@@ -0,0 +1,500 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. mirror.py
+
+Full local mirror of the bulk download repository, kept up to date with delta
+updates.
+
+**Description**
+
+A :class:`Mirror` replicates the whole bulk repository in a local directory, using
+the same tree structure: the datasets (:literal:`data/`), the dictionaries of all
+languages (:literal:`dic/{lang}/`), the metabase and the tables of contents. A
+manifest records the date, size and SHA-256 hash of every file mirrored, so that
+every update only downloads the files whose date changed in the bulk listing (or,
+for the datasets, in the table of contents).
+
+Files are downloaded concurrently and written to :literal:`.part` files first,
+next to a :literal:`.part.date` file recording the version downloaded: an
+interrupted update is resumed where it stopped, using HTTP range requests for
+the files partially downloaded.
+
+**Usage**
+
+    >>> from mirror import Mirror
+    >>> M = Mirror('/data/eurostat', langs=['en'], fmts=['tsv'])
+    >>> report = M.update()
+    >>> corrupted = M.verify()
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`collection`, :mod:`sync`
+
+*require*:      :mod:`os`, :mod:`io`, :mod:`csv`, :mod:`hashlib`, :mod:`threading`,
+                :mod:`concurrent.futures`, :mod:`collections`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 15:02:17 2026
+
+__all__         = ['Mirror']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import io
+import csv
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import settings
+from .settings import pyroWarning, pyroError
+from . import collection
+from .sync import Manifest
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class Mirror(object):
+    """Local mirror of the bulk download repository.
+
+        >>> M = Mirror(root, bulk=None, langs=None, fmts=None, workers=None,
+                       manifest=None)
+
+    Arguments
+    ---------
+    root : str
+        local directory of the mirror.
+
+    Keyword Arguments
+    -----------------
+    bulk : :class:`collection.Bulk`
+        instance used to query the bulk listing and download the files; default:
+        a new instance.
+    langs : list
+        languages of the dictionaries and tables of contents mirrored; default:
+        :data:`settings.LANGS`.
+    fmts : list
+        formats of the datasets mirrored; default: :data:`settings.BULK_EXTS['data']`.
+    workers : int
+        number of concurrent downloads; default: :data:`settings.BULK_WORKERS`.
+    manifest : str
+        path of the manifest file; default: :data:`settings.BULK_MIRROR` in
+        :data:`root`.
+
+    Note
+    ----
+    The manifest stores, for every file (identified by its path relative to
+    :data:`root`), the fields :literal:`'date'` (date reported by the bulk listing,
+    or :literal:`Last-Modified` header for the metabase and the tables of contents),
+    :literal:`'toc'` (date of last update of the dataset in the table of contents),
+    :literal:`'size'` (as reported), :literal:`'bytes'` (as downloaded) and
+    :literal:`'sha256'`.
+    """
+
+    CHUNK   = 2**20 # size of the chunks written on disk
+    SAVE    = 100   # number of files downloaded between two saves of the manifest
+
+    #/************************************************************************/
+    def __init__(self, root, **kwargs):
+        if not isinstance(root, str):
+            raise pyroError('wrong type for ROOT parameter')
+        self._root      = root
+        self._bulk      = kwargs.pop('bulk', None) or collection.Bulk()
+        self._langs     = list(kwargs.pop('langs', None) or settings.LANGS)
+        if not set(self._langs).issubset(settings.LANGS):
+            raise pyroError('languages LANGS not recognised')
+        self._fmts      = list(kwargs.pop('fmts', None) or settings.BULK_EXTS['data'])
+        if not set(self._fmts).issubset(settings.BULK_EXTS['data']):
+            raise pyroError('bulk data formats FMTS not recognised')
+        self._workers   = kwargs.pop('workers', None) or settings.BULK_WORKERS
+        self._manifest  = Manifest(kwargs.pop('manifest', None)     \
+                                   or os.path.join(root, settings.BULK_MIRROR))
+        self._bulks     = {}
+        self._lock      = threading.Lock()
+
+    #/************************************************************************/
+    @property
+    def root(self):
+        return self._root
+    @property
+    def bulk(self):
+        return self._bulk
+    @property
+    def manifest(self):
+        return self._manifest
+    def path(self, filename):
+        return os.path.join(self._root, *filename.split('/'))
+
+    #/************************************************************************/
+    def __lang_bulk(self, lang):
+        # the listing of the dictionaries depends on the language of the instance
+        if self.bulk.lang == lang:
+            return self.bulk
+        elif lang not in self._bulks:
+            self._bulks[lang] = collection.Bulk(lang=lang)
+        return self._bulks[lang]
+
+    @staticmethod
+    def __zipped(key, ext):
+        return settings.zipped_ext(key, ext)
+
+    #/************************************************************************/
+    def __head(self, filename):
+        """Retrieve the date and size of a file from the headers of the server.
+        """
+        try:
+            response = self.bulk.session.session.head(self.bulk.build_url(file=filename),
+                                                      allow_redirects=True)
+            response.raise_for_status()
+        except:
+            warnings.warn(pyroWarning('impossible to check bulk file %s' % filename))
+            return None, None
+        size = response.headers.get('Content-Length')
+        return response.headers.get('Last-Modified'), (int(size) if size else None)
+
+    def remote_files(self, key, toc=None):
+        """List the files of the bulk repository of a given type, together with
+        their dates and sizes.
+
+            >>> files = M.remote_files(key, toc=None)
+
+        Arguments
+        ---------
+        key : str
+            any key of :data:`settings.BULK_DIR`, i.e. :literal:`'data'`, :literal:`'dic'`,
+            :literal:`'base'` or :literal:`'toc'`.
+
+        Keyword Arguments
+        -----------------
+        toc : dict
+            dates of last update of the datasets, as reported in the table of
+            contents (see :meth:`toc_dates`); only used when :data:`key` is
+            :literal:`'data'`.
+
+        Returns
+        -------
+        files : :class:`collections.OrderedDict`
+            dictionary whose keys are the paths of the files relative to the root
+            of the repository, and whose values are dictionaries with :literal:`'date'`,
+            :literal:`'size'` and :literal:`'toc'` keys.
+        """
+        files = OrderedDict()
+        if key == 'data':
+            for fmt in self._fmts:
+                listing = self.bulk.read_listing(key, ext=self.__zipped(key, fmt))
+                for (name, entry) in listing.items():
+                    files['%s/%s' % (settings.BULK_DIR[key], entry['name'])] =       \
+                        {'date': entry['date'], 'size': entry['size'],
+                         'toc': None if toc is None else toc.get(name)}
+        elif key == 'dic':
+            ext = self.__zipped(key, settings.BULK_EXTS[key][0])
+            for lang in self._langs:
+                listing = self.__lang_bulk(lang).read_listing(key, ext=ext)
+                for entry in listing.values():
+                    files['%s/%s/%s' % (settings.BULK_DIR[key], lang, entry['name'])] =   \
+                        {'date': entry['date'], 'size': entry['size'], 'toc': None}
+        elif key == 'base':
+            filenames = ['%s.%s' % (settings.BULK_FILES[key], self.__zipped(key, ext))
+                         for ext in settings.BULK_EXTS[key]]
+        elif key == 'toc':
+            filenames = []
+            for ext in settings.BULK_EXTS[key]:
+                if ext == 'xml':
+                    filenames.append('%s.%s' % (settings.BULK_FILES[key], self.__zipped(key, ext)))
+                else:
+                    filenames.extend(['%s_%s.%s' % (settings.BULK_FILES[key], lang, self.__zipped(key, ext))
+                                      for lang in self._langs])
+        else:
+            raise pyroError('keyword parameter %s not recognised' % key)
+        if key in ('base', 'toc'):
+            with ThreadPoolExecutor(max_workers=min(len(filenames), self._workers)) as executor:
+                for filename, (date, size) in zip(filenames, executor.map(self.__head, filenames)):
+                    if date is not None or size is not None:
+                        files[filename] = {'date': date, 'size': size, 'toc': None}
+        return files
+
+    def toc_dates(self):
+        """Read the dates of last update of the datasets from the (local) table
+        of contents of the mirror.
+
+            >>> dates = M.toc_dates()
+        """
+        ext = [e for e in settings.BULK_EXTS['toc'] if e != 'xml'][0]
+        filename = '%s_%s.%s' % (settings.BULK_FILES['toc'], self._langs[0], self.__zipped('toc', ext))
+        path = self.path(filename)
+        if not os.path.exists(path):
+            return None
+        kcode, kdate = [settings.BULK_NAMES['toc'][k] for k in ('code', 'last_update')]
+        dates = {}
+        with io.open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            rows = csv.reader(f, delimiter='\t')
+            try:
+                header = [h.strip() for h in next(rows)]
+                icode, idate = header.index(kcode), header.index(kdate)
+            except:
+                warnings.warn(pyroWarning('table of contents %s not recognised' % filename))
+                return None
+            for row in rows:
+                if len(row) > max(icode, idate) and row[idate].strip() != '':
+                    dates[row[icode].strip()] = row[idate].strip()
+        return dates
+
+    #/************************************************************************/
+    def changes(self, key, toc=None, force=False):
+        """Compare the files of the bulk repository with those of the mirror.
+
+            >>> changed, unchanged, removed, files = M.changes(key, toc=None, force=False)
+
+        Arguments
+        ---------
+        key, toc :
+            see :meth:`remote_files`.
+
+        Keyword Arguments
+        -----------------
+        force : bool
+            flag set to consider all the files as changed; default: :data:`False`.
+
+        Returns
+        -------
+        changed, unchanged : list
+            paths of the files which need to be (or not) downloaded again.
+        removed : list
+            paths of the mirrored files which are no longer in the repository.
+        files : :class:`collections.OrderedDict`
+            output of :meth:`remote_files`.
+        """
+        files = self.remote_files(key, toc=toc)
+        changed, unchanged = [], []
+        for (filename, remote) in files.items():
+            entry = self.manifest.get(key, filename)
+            if force is False and entry is not None and entry.get('sha256') is not None     \
+                    and entry.get('date') == remote['date']                                 \
+                    and (remote['toc'] is None or entry.get('toc') == remote['toc'])        \
+                    and os.path.exists(self.path(filename)):
+                unchanged.append(filename)
+            else:
+                changed.append(filename)
+        removed = [f for f in self.manifest.entries[key] if f not in files]
+        return changed, unchanged, removed, files
+
+    #/************************************************************************/
+    def download(self, filename, date=None):
+        """Download a file of the repository into the mirror, resuming a former
+        partial download of the same version of the file when possible.
+
+            >>> nbytes, sha256, resumed = M.download(filename, date=None)
+
+        Arguments
+        ---------
+        filename : str
+            path of the file relative to the root of the repository.
+
+        Keyword Arguments
+        -----------------
+        date : str
+            date of the version of the file to download; a partial download is
+            only resumed when it was started for the same date.
+
+        Returns
+        -------
+        nbytes : int
+            size of the file.
+        sha256 : str
+            hexadecimal SHA-256 digest of the file.
+        resumed : int
+            number of bytes that were not downloaded again.
+        """
+        path = self.path(filename)
+        part, stamp = '%s.part' % path, '%s.part.date' % path
+        dirname = os.path.dirname(path)
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        digest, offset = hashlib.sha256(), 0
+        if date is not None and os.path.exists(part) and self.__stamp(stamp) == date:
+            with open(part, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.CHUNK), b''):
+                    digest.update(chunk)
+                    offset += len(chunk)
+        else:
+            # the version downloaded is recorded next to the partial download,
+            # so that it can be resumed by another run
+            with open(stamp, 'w') as f:
+                f.write(date or '')
+        url = self.bulk.build_url(file=filename)
+        headers = {'Range': 'bytes=%d-' % offset} if offset > 0 else {}
+        response = self.bulk.session.session.get(url, headers=headers, stream=True)
+        if offset > 0 and response.status_code == 416:
+            # range not satisfiable: the partial download may be complete already
+            response.close()
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            if total == str(offset):
+                self.__complete(part, stamp, path)
+                return offset, digest.hexdigest(), offset
+            digest, offset = hashlib.sha256(), 0
+            response = self.bulk.session.session.get(url, headers={}, stream=True)
+        try:
+            response.raise_for_status()
+            if offset > 0 and response.status_code != 206:
+                # range not supported: start again
+                digest, offset = hashlib.sha256(), 0
+            expected = response.headers.get('Content-Length')
+            nbytes = 0
+            with open(part, 'ab' if offset > 0 else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.CHUNK):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    nbytes += len(chunk)
+        finally:
+            response.close()
+        if expected is not None and nbytes != int(expected):
+            raise pyroError('incomplete download of bulk file %s' % filename)
+        self.__complete(part, stamp, path)
+        return offset + nbytes, digest.hexdigest(), offset
+
+    @staticmethod
+    def __stamp(stamp):
+        try:
+            with open(stamp, 'r') as f:
+                return f.read() or None
+        except:
+            return None
+
+    @staticmethod
+    def __complete(part, stamp, path):
+        os.replace(part, path)
+        if os.path.exists(stamp):
+            os.remove(stamp)
+
+    #/************************************************************************/
+    def update(self, **kwargs):
+        """Update the mirror: download all the files that changed in the bulk
+        repository since the last update.
+
+            >>> report = M.update(keys=None, force=False, prune=False)
+
+        Keyword Arguments
+        -----------------
+        keys : list
+            types of files to update, among the keys of :data:`settings.BULK_DIR`;
+            default: all of them.
+        force : bool
+            flag set to download all the files again; default: :data:`False`.
+        prune : bool
+            flag set to delete the mirrored files which are no longer in the
+            repository; default: :data:`False`.
+
+        Returns
+        -------
+        report : :class:`collections.OrderedDict`
+            report of the update, with fields: :literal:`'checked'`, :literal:`'updated'`,
+            :literal:`'unchanged'`, :literal:`'removed'` and :literal:`'failed'`
+            (number of files), :literal:`'bytes_downloaded'`, :literal:`'bytes_resumed'`
+            (bytes of partial downloads that were not downloaded again) and
+            :literal:`'bytes_saved'` (bytes of the unchanged files).
+
+        Note
+        ----
+        The metabase and the tables of contents are updated first, since the dates
+        of the datasets in the table of contents are used to detect the datasets
+        that changed.
+        """
+        keys = kwargs.get('keys') or ['base', 'toc', 'dic', 'data']
+        if isinstance(keys, str):
+            keys = [keys]
+        if not set(keys).issubset(settings.BULK_DIR):
+            raise pyroError('wrong value for KEYS parameter')
+        force, prune = kwargs.get('force', False), kwargs.get('prune', False)
+        report = OrderedDict([('checked', 0), ('updated', 0), ('unchanged', 0), ('removed', 0),
+                              ('failed', 0), ('bytes_downloaded', 0), ('bytes_resumed', 0),
+                              ('bytes_saved', 0)])
+        # ensure the order: metadata files first
+        for key in [k for k in ('base', 'toc', 'dic', 'data') if k in keys]:
+            toc = self.toc_dates() if key == 'data' else None
+            changed, unchanged, removed, files = self.changes(key, toc=toc, force=force)
+            report['checked'] += len(files)
+            report['unchanged'] += len(unchanged)
+            for filename in unchanged:
+                entry = self.manifest.get(key, filename)
+                report['bytes_saved'] += entry.get('bytes') or 0
+            self.__run(key, changed, files, report)
+            if prune is True:
+                for filename in removed:
+                    if os.path.exists(self.path(filename)):
+                        os.remove(self.path(filename))
+                    self.manifest.remove(key, filename)
+                    report['removed'] += 1
+            self.manifest.save()
+        return report
+
+    def __run(self, key, filenames, files, report):
+        if filenames == []:
+            return
+        def fetch(filename):
+            remote = files[filename]
+            try:
+                nbytes, sha256, resumed = self.download(filename, date=remote['date'])
+            except:
+                warnings.warn(pyroWarning('impossible to download bulk file %s' % filename))
+                with self._lock:
+                    report['failed'] += 1
+                return
+            with self._lock:
+                self.manifest.set(key, filename, date=remote['date'], toc=remote['toc'],
+                                  size=remote['size'], bytes=nbytes, sha256=sha256)
+                report['updated'] += 1
+                report['bytes_downloaded'] += nbytes - resumed
+                report['bytes_resumed'] += resumed
+                # saved in batches (and at the end of the update), not after every file
+                if report['updated'] % self.SAVE == 0:
+                    self.manifest.save()
+        with ThreadPoolExecutor(max_workers=min(len(filenames), self._workers)) as executor:
+            list(executor.map(fetch, filenames))
+
+    #/************************************************************************/
+    def verify(self, keys=None):
+        """Check the mirrored files against the hashes stored in the manifest.
+
+            >>> corrupted = M.verify(keys=None)
+
+        Returns
+        -------
+        corrupted : list
+            paths of the files which are missing or whose hash does not match
+            the manifest; they are removed from the manifest, so that they are
+            downloaded again by the next :meth:`update`.
+        """
+        keys = keys or list(settings.BULK_DIR.keys())
+        if isinstance(keys, str):
+            keys = [keys]
+        corrupted = []
+        for key in keys:
+            for (filename, entry) in list(self.manifest.entries[key].items()):
+                path = self.path(filename)
+                digest = hashlib.sha256()
+                try:
+                    with open(path, 'rb') as f:
+                        for chunk in iter(lambda: f.read(self.CHUNK), b''):
+                            digest.update(chunk)
+                except:
+                    ok = False
+                else:
+                    ok = digest.hexdigest() == entry.get('sha256')
+                if not ok:
+                    corrupted.append(filename)
+                    self.manifest.remove(key, filename)
+        if corrupted != []:
+            self.manifest.save()
+        return corrupted
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. pipeline.py
+
+Pipelined download and parsing of bulk datasets.
+
+**Description**
+
+Reading a list of bulk datasets one after the other leaves the network idle
+while the files are decompressed and parsed, and the CPU idle while they are
+downloaded. A :class:`Pipeline` runs these operations as separate stages connected
+by bounded queues:
+
+* download: several threads fetch the (compressed) files,
+* decompression: a thread decompresses the files (:mod:`zlib` releases the GIL),
+* parsing: a pool of processes parses the files (see :func:`reader.read`),
+
+so that the total time approaches the longest of the stages instead of their sum,
+while the bounded queues cap the number of files held in memory.
+
+**Usage**
+
+    >>> from pipeline import Pipeline
+    >>> P = Pipeline(fmt='tsv')
+    >>> for name, table in P.run(['aact_ali01', 'ilc_di01']):
+    ...     process(name, table)
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`collection`, :mod:`reader`
+
+*require*:      :mod:`os`, :mod:`time`, :mod:`gzip`, :mod:`queue`, :mod:`threading`,
+                :mod:`concurrent.futures`, :mod:`collections`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 14:20:51 2026
+
+__all__         = ['Pipeline']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import time
+import gzip
+import queue
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from . import settings
+from .settings import pyroWarning, pyroError
+from . import reader
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+_DONE = None # end of stage marker
+
+def _parse(content, fmt, kwargs):
+    """Parsing stage; defined at module level so that it can be run in a pool
+    of processes.
+    """
+    start = time.time()
+    return reader.read(content, fmt=fmt, **kwargs), time.time() - start
+
+
+#%%
+class Pipeline(object):
+    """Pipelined download, decompression and parsing of bulk datasets.
+
+        >>> P = Pipeline(bulk=None, source=None, fmt='tsv', workers=None, processes=None,
+                         maxsize=None)
+
+    Keyword Arguments
+    -----------------
+    bulk : :class:`collection.Bulk`
+        instance used to download the datasets; default: a new instance.
+    source : str
+        local directory storing a copy of the bulk repository (e.g., maintained
+        by :class:`sync.Sync`) where the datasets are read from instead of being
+        downloaded.
+    fmt : str
+        format of the datasets, any of :data:`settings.BULK_EXTS['data']`;
+        default: :literal:`'tsv'`.
+    workers : int
+        number of downloading threads; default: :data:`settings.BULK_WORKERS`.
+    processes : int
+        number of parsing processes; when 0, datasets are parsed in the calling
+        process; default: the number of CPUs.
+    maxsize : int
+        maximum number of files waiting in every queue between two stages;
+        default: twice the number of parsing processes.
+    kwargs :
+        other keyword arguments are passed to :func:`reader.read`.
+    """
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self._bulk      = kwargs.pop('bulk', None)
+        self._source    = kwargs.pop('source', None)
+        self._fmt       = kwargs.pop('fmt', None) or settings.BULK_EXTS['data'][0]
+        if self._fmt not in settings.BULK_EXTS['data']:
+            raise pyroError('bulk data format FMT not recognised')
+        self._workers   = kwargs.pop('workers', None) or settings.BULK_WORKERS
+        self._processes = kwargs.pop('processes', None)
+        if self._processes is None:
+            self._processes = os.cpu_count() or 1
+        self._maxsize   = kwargs.pop('maxsize', None) or 2 * max(1, self._processes)
+        self._kwargs    = kwargs
+        self.timings    = OrderedDict()
+        self.errors     = OrderedDict()
+
+    #/************************************************************************/
+    @property
+    def bulk(self):
+        if self._bulk is None:
+            from . import collection
+            self._bulk = collection.Bulk()
+        return self._bulk
+
+    #/************************************************************************/
+    def fetch(self, name):
+        """Fetch the (compressed) content of a dataset.
+        """
+        filename = self.bulk.build_file('data', name, ext=self._fmt)
+        if self._source is not None:
+            with open(os.path.join(self._source, filename), 'rb') as f:
+                return f.read()
+        return self.bulk.session.get_response(self.bulk.build_url(file=filename)).content
+
+    #/************************************************************************/
+    def run(self, datasets):
+        """Download and parse a list of datasets; datasets are yielded as soon as
+        they are parsed, i.e. not necessarily in the order of the list.
+
+            >>> for name, table in P.run(datasets):
+            ...     process(name, table)
+
+        Arguments
+        ---------
+        datasets : list
+            names of the datasets.
+
+        Returns
+        -------
+        name, table : str, :class:`reader.Columns`
+            name and content of the datasets; the datasets which cannot be read
+            are reported in :data:`errors`, and the cumulated time spent in every
+            stage in :data:`timings`.
+        """
+        names = list(datasets)
+        self.errors = OrderedDict()
+        self.timings = OrderedDict([('download', 0.), ('decompress', 0.), ('parse', 0.), ('wall', 0.)])
+        start = time.time()
+        if names == []:
+            return
+        todo, stop = queue.Queue(), threading.Event()
+        for name in names:
+            todo.put(name)
+        downloaded = queue.Queue(maxsize=self._maxsize)
+        decompressed = queue.Queue(maxsize=self._maxsize)
+        lock = threading.Lock()
+        nworkers = min(self._workers, len(names))
+
+        def put(q, item):
+            # do not block forever when the consumer stopped iterating
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def download():
+            while not stop.is_set():
+                try:
+                    name = todo.get_nowait()
+                except queue.Empty:
+                    break
+                t = time.time()
+                try:
+                    item = (name, self.fetch(name), None)
+                except Exception as e:
+                    item = (name, None, e)
+                with lock:
+                    self.timings['download'] += time.time() - t
+                put(downloaded, item)
+            put(downloaded, _DONE)
+
+        def decompress():
+            ndone = 0
+            while ndone < nworkers and not stop.is_set():
+                try:
+                    item = downloaded.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    ndone += 1
+                    continue
+                name, content, error = item
+                t = time.time()
+                if error is None and content[:2] == b'\x1f\x8b':
+                    try:
+                        content = gzip.decompress(content)
+                    except Exception as e:
+                        content, error = None, e
+                self.timings['decompress'] += time.time() - t
+                put(decompressed, (name, content, error))
+            put(decompressed, _DONE)
+
+        threads = [threading.Thread(target=download, daemon=True) for _ in range(nworkers)]
+        threads.append(threading.Thread(target=decompress, daemon=True))
+        [t.start() for t in threads]
+        pool = ProcessPoolExecutor(max_workers=self._processes) if self._processes > 0 else None
+        pending = {}
+        def collect(futures):
+            for future in futures:
+                name = pending.pop(future)
+                try:
+                    table, duration = future.result()
+                except Exception as e:
+                    self.__error(name, e)
+                else:
+                    self.timings['parse'] += duration
+                    yield name, table
+        try:
+            while True:
+                item = decompressed.get()
+                if item is _DONE:
+                    break
+                name, content, error = item
+                if error is not None:
+                    self.__error(name, error)
+                    continue
+                elif pool is None:
+                    try:
+                        table, duration = _parse(content, self._fmt, self._kwargs)
+                    except Exception as e:
+                        self.__error(name, e)
+                    else:
+                        self.timings['parse'] += duration
+                        yield name, table
+                    continue
+                pending[pool.submit(_parse, content, self._fmt, self._kwargs)] = name
+                # bound the number of files waiting for a parsing process
+                if len(pending) >= self._maxsize:
+                    done, _ = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+                    for res in collect(done):
+                        yield res
+            while pending != {}:
+                done, _ = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+                for res in collect(done):
+                    yield res
+        finally:
+            stop.set()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            self.timings['wall'] = time.time() - start
+
+    def read(self, datasets):
+        """Download and parse a list of datasets at once; see :meth:`run`.
+
+            >>> tables = P.read(datasets)
+
+        Returns
+        -------
+        tables : :class:`collections.OrderedDict`
+            tables of the datasets successfully read, in the order of the list.
+        """
+        names = list(datasets)
+        tables = dict(self.run(names))
+        return OrderedDict([(n, tables[n]) for n in names if n in tables])
+
+    #/************************************************************************/
+    def __error(self, name, error):
+        warnings.warn(pyroWarning('impossible to read dataset %s: %s' % (name, error)))
+        self.errors[name] = error
@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. planner.py
+
+Size estimates and memory planning for the loading of bulk datasets.
+
+**Description**
+
+Before downloading a dataset, its size can be estimated from the bulk listing
+(compressed size of the file) and from the metabase (number of codes of every
+dimension, hence number of cells of the dataset). A :class:`Planner` derives from
+them the memory footprint of the dataset in the different output formats of this
+package:
+
+* :literal:`'text'`: decompressed content of the file,
+* :literal:`'columns'`: :class:`reader.Columns` table (observations only),
+* :literal:`'frame'`: :class:`pandas.DataFrame` returned by :meth:`reader.Columns.to_frame`,
+* :literal:`'cube'`: dense :class:`cube.Cube` (all cells, observed or not),
+
+and recommends a loading mode that fits in a given memory budget.
+
+A query (a dataset and codes selected for some of its dimensions) can also be
+served by the REST service, in as many requests as needed to comply with the
+limit of categories (see :meth:`query.Query.split`). :meth:`Planner.route`
+estimates the requests, bytes transferred, cells and time of both routes, bulk
+download and REST queries, and picks the cheaper one; :meth:`Planner.explain`
+reports the estimates, and :meth:`Planner.load` loads the query through the
+chosen route.
+
+**Usage**
+
+    >>> from planner import Planner
+    >>> P = Planner(meta=meta, budget=2**30)
+    >>> plan = P.plan(['aact_ali01', 'ilc_di01'], filters={'geo': ['AT', 'BE']})
+    >>> plan['ilc_di01']['mode']
+    'chunked'
+    >>> print(P.explain('nama_10_gdp', filters={'geo': ['AT', 'BE'], 'unit': 'CP_MEUR'}))
+    >>> cube = P.load('nama_10_gdp', filters={'geo': ['AT', 'BE'], 'unit': 'CP_MEUR'})
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`collection`, :mod:`query`, :mod:`pipeline`, :mod:`reader`,
+                :mod:`cube`
+
+*require*:      :mod:`math`, :mod:`collections`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 15:31:48 2026
+
+__all__         = ['Planner']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import math
+import warnings
+from collections import OrderedDict
+
+from . import settings
+from .settings import pyroWarning, pyroError
+from .query import Query, Fetcher
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class Planner(object):
+    """Estimate the size of bulk datasets and plan how to load them.
+
+        >>> P = Planner(bulk=None, meta=None, budget=None, fmt='tsv')
+
+    Keyword Arguments
+    -----------------
+    bulk : :class:`collection.Bulk`
+        instance used to query the bulk listing; default: a new instance.
+    meta : :class:`collection.Meta`
+        instance whose metabase is loaded, used to retrieve the codes of the
+        dimensions of the datasets; when :data:`None`, the number of cells of
+        the datasets is not estimated.
+    budget : int
+        memory budget (in bytes); default: :data:`settings.BULK_MEMORY`.
+    fmt : str
+        format of the datasets, any of :data:`settings.BULK_EXTS['data']`;
+        default: :literal:`'tsv'`.
+
+    Note
+    ----
+    The estimates are upper bounds, except the number of observations, which is
+    derived from the compressed size of the file with the (average) compression
+    :data:`RATIO` and number of characters per observation :data:`CHARS` of the
+    bulk files.
+    """
+
+    RATIO       = {'tsv': 8, 'sdmx': 20}   # compression ratio
+    CHARS       = {'tsv': 10, 'sdmx': 45}  # characters per observation
+    VALUE       = 8                        # bytes per value (float64)
+    FLAG        = 2                        # bytes per flag (int16)
+    INDEX       = 4                        # bytes per code of a dimension (int32)
+    CATEGORY    = 2                        # bytes per code of a categorical column
+    MODES       = ('memory', 'columns', 'chunked')
+    ROUTES      = ('bulk', 'rest')
+    LATENCY     = 0.5                      # seconds per request
+    BANDWIDTH   = 2**22                    # bytes per second downloaded
+    PARSE       = 2**25                    # bytes of bulk text parsed per second
+    JSON        = 32                       # bytes per cell of a REST response
+    DECODE      = 2**20                    # cells of REST responses decoded per second
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self._bulk      = kwargs.pop('bulk', None)
+        self._meta      = kwargs.pop('meta', None)
+        self._budget    = kwargs.pop('budget', None) or settings.BULK_MEMORY
+        if not isinstance(self._budget, int) or self._budget <= 0:
+            raise pyroError('wrong value for BUDGET parameter')
+        self._fmt       = kwargs.pop('fmt', None) or settings.BULK_EXTS['data'][0]
+        if self._fmt not in settings.BULK_EXTS['data']:
+            raise pyroError('bulk data format FMT not recognised')
+
+    #/************************************************************************/
+    @property
+    def bulk(self):
+        if self._bulk is None:
+            from . import collection
+            self._bulk = collection.Bulk()
+        return self._bulk
+    @property
+    def meta(self):
+        return self._meta
+    @property
+    def budget(self):
+        return self._budget
+
+    #/************************************************************************/
+    def sizes(self, datasets, fmt=None):
+        """Retrieve the compressed sizes of the files of some datasets from the
+        bulk listing; only the pages of the listing where the datasets are
+        expected are loaded.
+
+            >>> sizes = P.sizes(datasets, fmt=None)
+        """
+        fmt = fmt or self._fmt
+        ext = settings.zipped_ext('data', fmt)
+        alphas = sorted(set([d[0].lower() for d in datasets]))
+        listing = self.bulk.read_listing('data', alpha=alphas, ext=ext)
+        return {d: listing[d]['size'] if d in listing else None for d in datasets}
+
+    def cardinalities(self, dataset, filters=None):
+        """Retrieve the number of codes of every dimension of a dataset, possibly
+        restricted by filters.
+
+            >>> dims = P.cardinalities(dataset, filters=None)
+
+        Returns
+        -------
+        dims : :class:`collections.OrderedDict`
+            dictionary whose keys are the dimensions and values are tuples
+            :data:`(ncodes, nselected)`: number of codes of the dimension in the
+            dataset and number of those selected by the filters; :data:`None`
+            when the metabase is not available.
+        """
+        if self._meta is None:
+            return None
+        filters = filters or {}
+        dims = OrderedDict()
+        for dim in self._meta.getAllDimensions(dataset):
+            labels = self._meta.getAllLabels(dim, data=dataset)
+            sel = filters.get(dim)
+            if sel is None:
+                dims[dim] = (len(labels), len(labels))
+                continue
+            elif isinstance(sel, str):
+                sel = [sel]
+            dims[dim] = (len(labels), len(set(sel).intersection(labels)))
+        return dims
+
+    #/************************************************************************/
+    def estimate(self, dataset, filters=None, fmt=None, size=None):
+        """Estimate the size of a dataset and the memory footprint of its loading.
+
+            >>> est = P.estimate(dataset, filters=None, fmt=None)
+
+        Arguments
+        ---------
+        dataset : str
+            name of the dataset.
+
+        Keyword Arguments
+        -----------------
+        filters : dict
+            codes selected for some dimensions, e.g. :literal:`{'geo': ['AT', 'BE']}`;
+            note that the whole file is downloaded and parsed anyway.
+        fmt : str
+            format of the dataset; default: the format of the instance.
+        size : int
+            compressed size of the file; default: retrieved from the bulk listing.
+
+        Returns
+        -------
+        est : :class:`collections.OrderedDict`
+            estimate with fields: :literal:`'compressed'` and :literal:`'expanded'`
+            (bytes of the file), :literal:`'dims'` (see :meth:`cardinalities`),
+            :literal:`'cells'` (number of cells of the selection),
+            :literal:`'observations'` (estimated number of observations selected),
+            :literal:`'footprint'` (bytes in memory for every output format),
+            :literal:`'mode'` and :literal:`'batch'` (see :meth:`recommend`).
+        """
+        fmt = fmt or self._fmt
+        if fmt not in settings.BULK_EXTS['data']:
+            raise pyroError('bulk data format FMT not recognised')
+        if size is None:
+            size = self.sizes([dataset], fmt=fmt)[dataset]
+        dims = self.cardinalities(dataset, filters=filters)
+        expanded = None if size is None else size * self.RATIO[fmt]
+        cells = total = None
+        if dims is not None:
+            cells, total = 1, 1
+            for (ncodes, nselected) in dims.values():
+                cells, total = cells * nselected, total * ncodes
+        observations = None if expanded is None else expanded // self.CHARS[fmt]
+        if observations is not None and cells is not None:
+            # observations are assumed to be evenly spread over the cells
+            observations = min(cells, observations * cells // max(1, total))
+        elif observations is None:
+            observations = cells
+        ndims = None if dims is None else len(dims)
+        if ndims is None and observations is not None:
+            ndims = 4 # typical number of dimensions of the datasets
+        footprint = OrderedDict([
+            ('text', expanded),
+            ('columns', None if observations is None else
+                observations * (ndims * self.INDEX + self.VALUE + self.FLAG)),
+            ('frame', None if observations is None else
+                observations * (ndims * self.CATEGORY + self.VALUE + self.CATEGORY)),
+            ('cube', None if cells is None else cells * (self.VALUE + self.FLAG))])
+        est = OrderedDict([('dataset', dataset), ('fmt', fmt),
+                           ('compressed', size), ('expanded', expanded),
+                           ('dims', dims), ('cells', cells), ('observations', observations),
+                           ('footprint', footprint)])
+        est['mode'], est['batch'] = self.recommend(est)
+        return est
+
+    #/************************************************************************/
+    def recommend(self, est, budget=None):
+        """Recommend a loading mode for a dataset.
+
+            >>> mode, batch = P.recommend(est, budget=None)
+
+        Arguments
+        ---------
+        est : dict
+            estimate returned by :meth:`estimate`.
+
+        Keyword Arguments
+        -----------------
+        budget : int
+            memory budget; default: the budget of the instance.
+
+        Returns
+        -------
+        mode : str
+            any of :data:`MODES`: :literal:`'memory'` when the dataset can be
+            read at once and stored as a dense cube, :literal:`'columns'` when it
+            can be read at once but should be kept as columns (the dense cube
+            would not fit, e.g. for sparse datasets), :literal:`'chunked'` when
+            it should be read in batches (see :func:`reader.iter_tsv`) or stored
+            in a :class:`cube.CubeStore`.
+        batch : int
+            number of observations per batch in :literal:`'chunked'` mode, so
+            that a batch uses a tenth of the budget; :data:`None` otherwise.
+        """
+        budget = budget or self._budget
+        footprint = est['footprint']
+        # the decompressed content and the table are both held while parsing
+        text = footprint['text'] or 0
+        if footprint['columns'] is None:
+            warnings.warn(pyroWarning('size of dataset %s unknown' % est['dataset']))
+            return 'chunked', settings.BULK_BATCH
+        elif footprint['cube'] is not None and text + footprint['columns'] + footprint['cube'] <= budget:
+            return 'memory', None
+        elif text + footprint['columns'] <= budget:
+            return 'columns', None
+        ndims = len(est['dims']) if est['dims'] is not None else 4
+        row = ndims * self.INDEX + self.VALUE + self.FLAG + self.CHARS[est['fmt']]
+        return 'chunked', max(1, budget // 10 // row)
+
+    #/************************************************************************/
+    def plan(self, datasets, filters=None, fmt=None):
+        """Estimate a set of datasets at once (the bulk listing is queried once).
+
+            >>> plan = P.plan(datasets, filters=None, fmt=None)
+
+        Arguments
+        ---------
+        datasets : list
+            names of the datasets.
+
+        Keyword Arguments
+        -----------------
+        filters : dict
+            filters applied to all the datasets, or dictionary of filters whose
+            keys are the names of the datasets.
+        fmt : str
+            see :meth:`estimate`.
+
+        Returns
+        -------
+        plan : :class:`collections.OrderedDict`
+            estimates of the datasets (see :meth:`estimate`).
+        """
+        if isinstance(datasets, str):
+            datasets = [datasets]
+        datasets = list(datasets)
+        filters = filters or {}
+        bydataset = set(filters.keys()).issubset(datasets) and filters != {}
+        sizes = self.sizes(datasets, fmt=fmt)
+        return OrderedDict([(d, self.estimate(d, filters=filters.get(d) if bydataset else filters,
+                                              fmt=fmt, size=sizes[d]))
+                            for d in datasets])
+
+    def summary(self, plan, budget=None):
+        """Summarise a plan: total bytes to download and peak memory when the
+        datasets are loaded one after the other or all together.
+
+            >>> summary = P.summary(plan, budget=None)
+        """
+        budget = budget or self._budget
+        peaks = []
+        for est in plan.values():
+            footprint = est['footprint']
+            if est['mode'] == 'memory':
+                peak = (footprint['text'] or 0) + footprint['columns'] + footprint['cube']
+            elif est['mode'] == 'columns':
+                peak = (footprint['text'] or 0) + footprint['columns']
+            else:
+                peak = budget // 10
+            peaks.append(peak)
+        return OrderedDict([('datasets', len(peaks)),
+                            ('compressed', sum([e['compressed'] or 0 for e in plan.values()])),
+                            ('peak_sequential', max(peaks) if peaks != [] else 0),
+                            ('peak_concurrent', sum(peaks)),
+                            ('budget', budget),
+                            ('concurrent', sum(peaks) <= budget)])
+
+    #/************************************************************************/
+    def route(self, dataset, filters=None, fmt=None, size=None, limit=None, workers=None):
+        """Estimate the cost of a query through the bulk download service and
+        through the REST service, and choose the cheaper route.
+
+            >>> route = P.route(dataset, filters=None, fmt=None, limit=None, workers=None)
+
+        Arguments
+        ---------
+        dataset : str
+            name of the dataset.
+
+        Keyword Arguments
+        -----------------
+        filters : dict
+            codes selected for some dimensions, e.g. :literal:`{'geo': ['AT', 'BE']}`.
+        fmt, size :
+            see :meth:`estimate`.
+        limit : int
+            maximum number of categories of a REST query; default: :data:`settings.API_CATEGORIES`.
+        workers : int
+            number of REST queries sent concurrently; default: :data:`settings.API_WORKERS`.
+
+        Returns
+        -------
+        route : :class:`collections.OrderedDict`
+            estimates with fields :literal:`'dataset'`, :literal:`'route'` (the
+            cheaper route, any of :data:`ROUTES`) and, for both routes, the
+            number of :literal:`'requests'`, the :literal:`'bytes'` transferred,
+            the number of :literal:`'cells'` read and the :literal:`'seconds'`
+            expected; :data:`None` fields are unknown.
+
+        Note
+        ----
+        The time is modelled with the constants :data:`LATENCY`, :data:`BANDWIDTH`,
+        :data:`PARSE`, :data:`JSON` and :data:`DECODE`: they can be adjusted
+        (e.g., by subclassing) to the actual network and machine.
+        When the dimensions of the dataset are unknown (no metabase), the cells of
+        a REST query are those of the whole file (see :meth:`estimate`), so that
+        the bulk route is favoured.
+        """
+        filters = OrderedDict([(k, v) for (k, v) in (filters or {}).items() if k not in settings.API_PARAMS])
+        workers = workers or settings.API_WORKERS
+        est = self.estimate(dataset, filters=filters, fmt=fmt, size=size)
+        query = Query(dataset, **filters)
+        # REST: the selected cells of the dataset, in as many requests as needed
+        cells = est['cells']
+        if cells is None and est['observations'] is not None:
+            # dimensions unknown: the observations of the whole file are an upper
+            # bound of those selected
+            cells = est['observations']
+        elif cells is None:
+            warnings.warn(pyroWarning('size of dataset %s unknown - REST cells underestimated' % dataset))
+            cells = query.categories
+        nrequests = query.nqueries(limit=limit)
+        rest = OrderedDict([('requests', nrequests), ('bytes', cells * self.JSON), ('cells', cells),
+                            ('seconds', math.ceil(nrequests / workers) * self.LATENCY
+                                        + cells * self.JSON / self.BANDWIDTH + cells / self.DECODE)])
+        # bulk: the whole file, downloaded and parsed at once
+        if est['compressed'] is None:
+            bulk = OrderedDict([('requests', 1), ('bytes', None), ('cells', None), ('seconds', None)])
+        else:
+            bulk = OrderedDict([('requests', 1), ('bytes', est['compressed']),
+                                ('cells', est['expanded'] // self.CHARS[est['fmt']]),
+                                ('seconds', self.LATENCY + est['compressed'] / self.BANDWIDTH
+                                            + est['expanded'] / self.PARSE)])
+        choice = 'rest' if bulk['seconds'] is None or rest['seconds'] <= bulk['seconds'] else 'bulk'
+        return OrderedDict([('dataset', dataset), ('route', choice), ('bulk', bulk), ('rest', rest),
+                            ('mode', est['mode'])])
+
+    def explain(self, dataset, filters=None, **kwargs):
+        """Report the estimates of both routes of a query (see :meth:`route`).
+
+            >>> print(P.explain(dataset, filters=None))
+        """
+        route = kwargs.pop('route', None) or self.route(dataset, filters=filters, **kwargs)
+        lines = ['query of dataset %s - route: %s' % (dataset, route['route'].upper())]
+        fmt = lambda v, f: 'unknown' if v is None else f.format(v)
+        for r in self.ROUTES:
+            est = route[r]
+            lines.append('  %-4s %s: %s requests, %s bytes, %s cells, %s seconds'
+                         % (r, '*' if r == route['route'] else ' ', fmt(est['requests'], '{:d}'),
+                            fmt(est['bytes'], '{:,}'), fmt(est['cells'], '{:,}'),
+                            fmt(est['seconds'], '{:.1f}')))
+        return '\n'.join(lines)
+
+    def load(self, dataset, filters=None, fmt=None, **kwargs):
+        """Load a query through the cheaper route (see :meth:`route`) into a
+        :class:`cube.Cube`.
+
+            >>> cube = P.load(dataset, filters=None, fmt=None, route=None)
+
+        Keyword Arguments
+        -----------------
+        route : str
+            route forced, any of :data:`ROUTES`; default: the cheaper route.
+        limit, workers :
+            see :meth:`route`.
+        """
+        # the codes of the dimensions are normalised to lists, the parameters of
+        # the API (e.g., precision) are passed unchanged
+        filters = OrderedDict([(k, v if k in settings.API_PARAMS else [v] if isinstance(v, str) else list(v))
+                               for (k, v) in (filters or {}).items()])
+        fmt = fmt or self._fmt
+        choice = kwargs.get('route') or self.route(dataset, filters=filters, fmt=fmt, limit=kwargs.get('limit'),
+                                                   workers=kwargs.get('workers'))['route']
+        if choice not in self.ROUTES:
+            raise pyroError('route ROUTE not recognised')
+        elif choice == 'rest':
+            fetcher = Fetcher(session=self.bulk.session, workers=kwargs.get('workers'), limit=kwargs.get('limit'),
+                              meta=self._meta)
+            return fetcher.run(Query(dataset, **filters))
+        from .pipeline import Pipeline
+        from .reader import read
+        from .cube import Cube
+        content = Pipeline(bulk=self.bulk, fmt=fmt).fetch(dataset)
+        cube = Cube.from_columns(read(content, fmt=fmt))
+        # the codes selected are kept (when found), as lists
+        sel = OrderedDict([(d, [c for c in codes if c in cube.index(d)])
+                           for (d, codes) in filters.items() if d in cube.dims])
+        return cube.loc(**sel)
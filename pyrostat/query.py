@@ -0,0 +1,542 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. query.py
+
+Queries of the REST service, split into compliant sub-queries and fetched
+concurrently.
+
+**Description**
+
+The REST service rejects the queries requesting more than :data:`settings.API_CATEGORIES`
+categories (error 416). A :class:`Query` stores a dataset and the codes selected
+for some of its dimensions, and counts the categories requested, i.e. the product
+of the numbers of codes selected. When the limit is exceeded, :meth:`Query.split`
+partitions the product of the selections into the fewest sub-queries under the
+limit: every dimension is cut into chunks of (almost) equal sizes, and the sizes
+of the chunks are chosen so that their product fits in the limit while the
+number of sub-queries is minimal.
+
+A :class:`Fetcher` sends the sub-queries concurrently (at most :data:`settings.API_WORKERS`
+at once), decodes the responses (see :class:`jsonstat.JsonStat`) and merges them
+into a single :class:`cube.Cube`.
+
+Equivalent queries (e.g., with the dimensions or the codes given in a different
+order) share the same canonical form (:meth:`Query.canonical`) and :data:`Query.key`.
+A :class:`CubeCache` stores the decoded responses, i.e. the cubes, indexed by their
+canonical keys, in memory and possibly on disk (see :class:`cube.CubeStore`), so
+that repeated queries skip both the network and the decoding.
+
+**Usage**
+
+    >>> from query import Query, Fetcher
+    >>> Q = Query('nama_10_gdp', geo=geos, time=['2018', '2019'], unit='CP_MEUR')
+    >>> Q.categories
+    176
+    >>> len(Q.split())
+    4
+    >>> cube = Fetcher().run(Q)
+    >>> Q.key == Query('nama_10_gdp', unit='CP_MEUR', time=['2019', '2018'], geo=geos).key
+    True
+    >>> F = Fetcher(cache=CubeCache(root=None))
+    >>> cube = F.run(Q) # fetched
+    >>> cube = F.run(Q) # from cache
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`session`, :mod:`jsonstat`, :mod:`cube`, :mod:`collection`
+
+*require*:      :mod:`os`, :mod:`math`, :mod:`time`, :mod:`hashlib`, :mod:`itertools`,
+                :mod:`threading`, :mod:`collections`, :mod:`concurrent.futures`, :mod:`urllib`,
+                :mod:`numpy`
+
+*optional*:     :mod:`requests`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 21:58:26 2026
+
+__all__         = ['Query', 'CubeCache', 'Fetcher']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import math
+import time
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+try:
+    from requests import HTTPError
+except ImportError:
+    HTTPError = IOError
+
+import numpy as np
+
+from . import settings
+from .settings import pyroError
+from .jsonstat import JsonStat, loads, check_error
+from .cube import Cube, CubeStore
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+def _chunking(counts, limit):
+    # sizes of the chunks of every dimension minimising the number of sub-queries
+    # whose product of sizes does not exceed the limit
+    best = [None, None]
+    def search(i, size, nqueries, sizes):
+        if best[0] is not None and nqueries >= best[0]:
+            return
+        elif i == len(counts):
+            best[0], best[1] = nqueries, list(sizes)
+            return
+        n = counts[i]
+        # the smallest chunk size for every possible number of chunks
+        candidates = sorted(set([int(math.ceil(n / math.ceil(n / c)))
+                                 for c in range(1, min(n, limit // size) + 1)]), reverse=True)
+        for c in candidates:
+            search(i + 1, size * c, nqueries * int(math.ceil(n / c)), sizes + [c])
+    search(0, 1, 1, [])
+    return best[1]
+
+def _chunks(codes, size):
+    # split a list of codes into chunks of (almost) equal lengths, at most size
+    k = int(math.ceil(len(codes) / size))
+    q, r = divmod(len(codes), k)
+    bounds = [i * q + min(i, r) for i in range(k + 1)]
+    return [codes[bounds[i]:bounds[i + 1]] for i in range(k)]
+
+def _canonical(filters):
+    # filters with the dimensions sorted by name, and the codes of every dimension
+    # sorted and deduplicated; scalar parameters are left unchanged
+    canonical = OrderedDict()
+    for key in sorted(filters):
+        value = filters[key]
+        if isinstance(value, (tuple, list, set)):
+            value = sorted(set([str(v) for v in value]))
+        canonical[key] = value
+    return canonical
+
+
+class Query(object):
+    """Query of a dataset of the REST service.
+
+        >>> Q = Query(dataset, lang=None, fmt=None, **filters)
+
+    Arguments
+    ---------
+    dataset : str
+        name of the dataset.
+
+    Keyword Arguments
+    -----------------
+    lang : str
+        language of the labels; default: :data:`settings.DEF_LANG`.
+    fmt : str
+        format of the response; default: :data:`settings.DEF_FMT`.
+    filters : dict
+        codes (a string or a list of strings) selected for some dimensions,
+        and parameters of the query (see :data:`settings.API_PARAMS`), e.g.
+        :literal:`precision`.
+    """
+
+    API     = settings.API_HISTORY['first']
+
+    #/************************************************************************/
+    def __init__(self, dataset, **kwargs):
+        if not isinstance(dataset, str) or dataset == '':
+            raise pyroError('wrong type for DATASET parameter')
+        lang, fmt       = kwargs.pop('lang', None), kwargs.pop('fmt', None)
+        if not all([x is None or isinstance(x, str) for x in (lang, fmt)]):
+            raise pyroError('wrong type for LANG/FMT parameters')
+        self.dataset    = dataset
+        self.lang       = (lang or settings.DEF_LANG[self.API]).lower()
+        self.fmt        = (fmt or settings.DEF_FMT).lower()
+        self.params     = OrderedDict()
+        self.filters    = OrderedDict()
+        if self.lang not in settings.API_LANGS[self.API]:
+            raise pyroError('language LANG not recognised')
+        elif self.fmt not in settings.API_FMTS[self.API]:
+            raise pyroError('format FMT not recognised')
+        for (key, value) in kwargs.items():
+            if key in settings.API_PARAMS:
+                self.params[key] = value
+            else:
+                self.filters[key] = [str(value)] if isinstance(value, (str, int)) else [str(v) for v in value]
+        if settings.API_PRECISION[self.API] is not None:
+            self.params.setdefault('precision', settings.API_PRECISION[self.API])
+        if 'precision' in self.params:
+            try:
+                self.params['precision'] = int(self.params['precision'])
+            except (TypeError, ValueError):
+                raise pyroError('wrong value for PRECISION parameter')
+
+    #/************************************************************************/
+    def __repr__(self):
+        return "<{} instance at {}: {} {}>".format(self.__class__.__name__, id(self), self.dataset,
+                dict(self.filters))
+    @property
+    def categories(self):
+        """Number of categories requested, i.e. product of the numbers of codes
+        selected for the dimensions.
+        """
+        return int(math.prod([len(c) for c in self.filters.values()])) if self.filters else 1
+    def copy(self, **filters):
+        """Copy the query, possibly replacing the codes of some dimensions.
+        """
+        kwargs = OrderedDict(self.filters)
+        kwargs.update(self.params)
+        kwargs.update(filters)
+        return self.__class__(self.dataset, lang=self.lang, fmt=self.fmt, **kwargs)
+    def canonical(self):
+        """Canonical form of the query: the parameters and the dimensions are
+        sorted by name, and the codes of every dimension are sorted and deduplicated.
+        
+            >>> C = Q.canonical()
+        """
+        kwargs = _canonical(self.params)
+        kwargs.update(_canonical(self.filters))
+        return self.__class__(self.dataset, lang=self.lang, fmt=self.fmt, **kwargs)
+    @property
+    def key(self):
+        """Canonical key of the query, shared by all the equivalent queries.
+
+            >>> Q.key
+            'json/en/nama_10_gdp?precision=1&geo=AT&geo=BE&time=2019'
+        """
+        C = self.canonical()
+        return '%s/%s/%s?%s' % (C.fmt, C.lang, C.dataset, urlencode(C.__params()))
+
+    #/************************************************************************/
+    def url(self):
+        """URL of the query.
+
+            >>> Q.url()
+            'http://ec.europa.eu/eurostat/wdds/rest/data/v2.1/json/en/nama_10_gdp?precision=1&geo=AT&geo=BE'
+        """
+        path = '{domain}/v{vers}/{fmt}/{lang}/{dataset}'.format(domain=settings.API_DOMAIN[self.API],
+                vers=settings.REST_VERSION[self.API], fmt=self.fmt, lang=self.lang, dataset=self.dataset)
+        params = self.__params()
+        url = '%s://%s' % (settings.DEF_PROTOCOL[self.API], path)
+        return url if params == [] else '%s?%s' % (url, urlencode(params))
+    def __params(self):
+        return list(self.params.items()) + [(d, c) for d in self.filters for c in self.filters[d]]
+
+    #/************************************************************************/
+    def split(self, limit=None):
+        """Split the query into the fewest sub-queries requesting at most :data:`limit`
+        categories each.
+
+            >>> queries = Q.split(limit=None)
+
+        Keyword Arguments
+        -----------------
+        limit : int
+            maximum number of categories of a query; default: :data:`settings.API_CATEGORIES`.
+
+        Returns
+        -------
+        queries : list
+            sub-queries, whose selections form a partition of the selection of
+            the query; the query itself when it does not exceed the limit.
+        """
+        sizes = self.__chunking(limit)
+        if sizes is None:
+            return [self]
+        dims = list(self.filters.keys())
+        chunks = [_chunks(self.filters[d], s) for (d, s) in zip(dims, sizes)]
+        return [self.copy(**dict(zip(dims, sel))) for sel in itertools.product(*chunks)]
+    def nqueries(self, limit=None):
+        """Number of sub-queries returned by :meth:`split`, computed without 
+        building them.
+        """
+        sizes = self.__chunking(limit)
+        if sizes is None:
+            return 1
+        return int(math.prod([math.ceil(len(c) / s) for (c, s) in zip(self.filters.values(), sizes)]))
+    def __chunking(self, limit):
+        limit = limit or settings.API_CATEGORIES
+        if not isinstance(limit, int) or limit < 1:
+            raise pyroError('wrong value for LIMIT parameter')
+        elif self.categories <= limit:
+            return None
+        return _chunking([len(c) for c in self.filters.values()], limit)
+
+
+#%%
+class CubeCache(object):
+    """Cache of the decoded responses of the REST service, stored as cubes.
+
+        >>> C = CubeCache(root=None, size=None, expire=None)
+
+    Keyword Arguments
+    -----------------
+    root : str
+        directory where the cubes are also stored (see :class:`cube.CubeStore`),
+        so that they persist over sessions; default: :data:`None`, i.e. the cubes
+        are only kept in memory.
+    size : int
+        maximum number of cubes kept in memory, the least recently used being
+        discarded first; default: :data:`settings.API_CACHE`.
+    expire : int
+        number of seconds after which the cubes stored are outdated; default:
+        :data:`settings.API_EXPIRE`.
+
+    Note
+    ----
+    The cubes are indexed by the canonical keys of the queries (see :data:`Query.key`),
+    so that equivalent queries hit the same entry. The cubes returned are shared
+    by all the hits, and should not be modified.
+    """
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        root            = kwargs.pop('root', None)
+        self._size      = kwargs.pop('size', None) or settings.API_CACHE
+        self._expire    = kwargs.pop('expire', None)
+        if self._expire is None:
+            self._expire = settings.API_EXPIRE
+        if not(root is None or isinstance(root, str)):
+            raise pyroError('wrong type for ROOT parameter')
+        elif not isinstance(self._size, int) or self._size < 1:
+            raise pyroError('wrong value for SIZE parameter')
+        elif not isinstance(self._expire, (int, float)) or self._expire < 0:
+            raise pyroError('wrong value for EXPIRE parameter')
+        self._store     = None if root is None else CubeStore(root)
+        self._cubes     = OrderedDict() # key: (dataset, time, cube)
+        self._lock      = threading.Lock()
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self._cubes)
+    def __contains__(self, query):
+        return self.get(query) is not None
+    @property
+    def store(self):
+        return self._store
+    @property
+    def size(self):
+        return self._size
+    @property
+    def expire(self):
+        return self._expire
+    @staticmethod
+    def _name(query):
+        # name of the cube in the store: the dataset is kept for selective removal
+        return '%s.%s' % (query.dataset, hashlib.sha1(query.key.encode('utf-8')).hexdigest())
+
+    #/************************************************************************/
+    def get(self, query):
+        """Retrieve the cube of a query, or :data:`None` when it is not stored
+        or outdated.
+
+            >>> cube = C.get(query)
+        """
+        key, now = query.key, time.time()
+        with self._lock:
+            entry = self._cubes.get(key)
+            if entry is not None and now - entry[1] <= self._expire:
+                self._cubes.move_to_end(key)
+                return entry[2]
+            elif entry is not None:
+                del self._cubes[key]
+            if self._store is None:
+                return None
+            name = self._name(query)
+            if name not in self._store:
+                return None
+            mtime = os.path.getmtime(os.path.join(self._store.path(name), CubeStore.INDEX))
+            if now - mtime > self._expire:
+                self._store.remove(name)
+                return None
+            cube = self._store.open(name)
+            self.__keep(key, query.dataset, mtime, cube)
+            return cube
+
+    def put(self, query, cube):
+        """Store the cube of a query, replacing any former version.
+
+            >>> C.put(query, cube)
+        """
+        if not isinstance(cube, Cube):
+            raise pyroError('wrong type for CUBE parameter')
+        with self._lock:
+            self.__keep(query.key, query.dataset, time.time(), cube)
+            if self._store is not None:
+                self._store.save(self._name(query), cube)
+
+    def __keep(self, key, dataset, mtime, cube):
+        self._cubes[key] = (dataset, mtime, cube)
+        self._cubes.move_to_end(key)
+        while len(self._cubes) > self._size:
+            self._cubes.popitem(last=False)
+
+    #/************************************************************************/
+    def invalidate(self, *datasets):
+        """Remove the cubes of the queries of some datasets, e.g. those updated 
+        since they were stored (see :meth:`diff.MetaDiff.affected`).
+
+            >>> C.invalidate(*datasets)
+        """
+        datasets = set(datasets)
+        with self._lock:
+            for key in [k for (k, e) in self._cubes.items() if e[0] in datasets]:
+                del self._cubes[key]
+            if self._store is not None:
+                for name in self._store.names:
+                    if name.rsplit('.', 1)[0] in datasets:
+                        self._store.remove(name)
+
+    def clear(self):
+        """Remove all the cubes stored.
+        """
+        with self._lock:
+            self._cubes.clear()
+            if self._store is not None:
+                for name in self._store.names:
+                    self._store.remove(name)
+
+
+#%%
+class Fetcher(object):
+    """Fetch queries of the REST service, split into compliant sub-queries sent
+    concurrently.
+
+        >>> F = Fetcher(session=None, workers=None, limit=None, cache=None)
+
+    Keyword Arguments
+    -----------------
+    session : :class:`session.Session`
+        session used to send the queries; default: a new session.
+    workers : int
+        maximum number of queries sent at once; default: :data:`settings.API_WORKERS`.
+    limit : int
+        maximum number of categories of a query; default: :data:`settings.API_CATEGORIES`.
+    cache : bool, :class:`CubeCache`
+        cache of the cubes fetched; when :data:`True`, a new in-memory cache is
+        created; default: :data:`None`, i.e. no cache.
+    meta : :class:`collection.Meta`
+        instance whose metabase is used to check the queries before any request
+        is sent (see :meth:`collection.Meta.checkQuery`); default: :data:`None`,
+        i.e. the queries are not checked.
+    """
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self._session   = kwargs.pop('session', None)
+        self._workers   = kwargs.pop('workers', None) or settings.API_WORKERS
+        self._limit     = kwargs.pop('limit', None) or settings.API_CATEGORIES
+        self._cache     = kwargs.pop('cache', None)
+        self._meta      = kwargs.pop('meta', None)
+        if self._meta is not None:
+            from .collection import Meta
+            if not isinstance(self._meta, Meta):
+                raise pyroError('wrong type for META parameter')
+        if not isinstance(self._workers, int) or self._workers < 1:
+            raise pyroError('wrong value for WORKERS parameter')
+        elif self._cache is True:
+            self._cache = CubeCache()
+        elif self._cache is False:
+            self._cache = None
+        elif not(self._cache is None or isinstance(self._cache, CubeCache)):
+            raise pyroError('wrong type for CACHE parameter')
+
+    #/************************************************************************/
+    @property
+    def session(self):
+        if self._session is None:
+            from .session import Session
+            self._session = Session()
+        return self._session
+    @property
+    def limit(self):
+        return self._limit
+    @property
+    def cache(self):
+        return self._cache
+    @property
+    def meta(self):
+        return self._meta
+
+    #/************************************************************************/
+    def fetch(self, query):
+        """Send a single query and decode its response.
+
+            >>> J = F.fetch(query)
+        """
+        try:
+            content = self.session.get_response(query.url()).content
+        except HTTPError as e:
+            # error responses (e.g., 400, 416) carry the JSON error envelope,
+            # whose message is raised
+            response = getattr(e, 'response', None)
+            if response is None:
+                raise pyroError('impossible to fetch query %s' % query.url())
+            try:
+                payload = loads(response.content)
+            except pyroError:
+                payload = None
+            check_error(payload)
+            raise pyroError('error %s fetching query %s' % (response.status_code, query.url()))
+        except:
+            raise pyroError('impossible to fetch query %s' % query.url())
+        return JsonStat.decode(content)
+
+    def fetch_many(self, queries):
+        """Send queries concurrently and decode their responses, returned in the
+        order of the queries.
+        """
+        queries = list(queries)
+        if len(queries) <= 1:
+            return [self.fetch(q) for q in queries]
+        with ThreadPoolExecutor(max_workers=min(len(queries), self._workers)) as executor:
+            return list(executor.map(self.fetch, queries))
+
+    def run(self, query, dtype=None, cache=True):
+        """Fetch a query, split into sub-queries when it exceeds the limit of
+        categories, and merge the responses into a single cube.
+
+            >>> cube = F.run(query, dtype=None, cache=True)
+
+        Keyword Arguments
+        -----------------
+        cache : bool
+            flag set to retrieve the cube from the cache when possible; when
+            :data:`False`, the query is sent anyway and the cube fetched replaces
+            the one cached; default: :data:`True`.
+
+        Note
+        ----
+        When a metabase is set, an invalid query is rejected before any request
+        is sent. When a cache is set, the cube is retrieved from the cache whenever
+        possible, and stored in the cache otherwise.
+        """
+        if self._meta is not None:
+            self._meta.checkQuery(query.dataset, **query.filters)
+        if self._cache is not None and cache is True:
+            cube = self._cache.get(query)
+            if cube is not None and (dtype is None or cube.values.dtype == np.dtype(dtype)):
+                return cube
+        queries = query.canonical().split(limit=self._limit)
+        responses = self.fetch_many(queries)
+        cubes = [r.to_cube() if dtype is None else r.to_cube(dtype=dtype) for r in responses]
+        cube = cubes[0] if len(cubes) == 1 else Cube.merge(cubes)
+        if self._cache is not None:
+            self._cache.put(query, cube)
+        return cube
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. reader.py
+
+Incremental readers of bulk datasets into compact columnar tables.
+
+**Description**
+
+Bulk datasets are available in TSV (:literal:`.tsv.gz`) and SDMX-ML (:literal:`.sdmx.zip`)
+formats (see :data:`settings.BULK_EXTS`). Both are read incrementally, in batches
+of :data:`settings.BULK_BATCH` observations, into the same :class:`Columns` structure:
+one integer-coded column per dimension (with the table of codes of the dimension),
+a column of values and a column of flags. Memory usage does not depend on the size
+of the dataset when iterating over the batches.
+
+SDMX-ML files are parsed with an event-driven parser (:mod:`lxml` when available,
+:mod:`xml.etree.ElementTree` otherwise): series are discarded as soon as their
+observations are read.
+
+**Usage**
+
+    >>> from reader import read_tsv, iter_sdmx
+    >>> table = read_tsv('aact_ali01.tsv.gz')
+    >>> for batch in iter_sdmx('aact_ali01.sdmx.zip'):
+    ...     process(batch)
+
+**Dependencies**
+
+*call*:         :mod:`settings`
+
+*require*:      :mod:`io`, :mod:`gzip`, :mod:`zipfile`, :mod:`re`, :mod:`collections`,
+                :mod:`numpy`
+
+*optional*:     :mod:`lxml`, :mod:`pandas`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 12:05:09 2026
+
+__all__         = ['Columns', 'iter_tsv', 'read_tsv', 'iter_sdmx', 'read_sdmx', 'read']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import io
+import re
+import gzip
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from . import settings
+from .settings import pyroError
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class Columns(object):
+    """Compact columnar table of the observations of a dataset.
+
+        >>> table = Columns(dims, codes, indices, values, flags, flagcodes)
+
+    Arguments
+    ---------
+    dims : list
+        names of the dimensions; the time dimension comes last.
+    codes : dict
+        table of codes of every dimension: :data:`codes[dim][i]` is the code
+        of the :data:`i`-th category of the dimension :data:`dim`.
+    indices : dict
+        integer column of every dimension, indexing its table of codes.
+    values : :class:`numpy.ndarray`
+        values of the observations (:data:`numpy.nan` when missing).
+    flags : :class:`numpy.ndarray`
+        integer column of flags, indexing :data:`flagcodes`.
+    flagcodes : list
+        table of flags; the first flag is always the empty string.
+    """
+
+    #/************************************************************************/
+    def __init__(self, dims, codes, indices, values, flags, flagcodes):
+        self.dims       = list(dims)
+        self.codes      = OrderedDict([(d, list(codes[d])) for d in self.dims])
+        self.indices    = OrderedDict([(d, np.asarray(indices[d], dtype=np.int32)) for d in self.dims])
+        self.values     = np.asarray(values, dtype=np.float64)
+        self.flags      = np.asarray(flags, dtype=np.int16)
+        self.flagcodes  = list(flagcodes)
+        if any([len(i) != len(self.values) for i in self.indices.values()])    \
+                or len(self.flags) != len(self.values):
+            raise pyroError('columns of different lengths')
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.values)
+    def __repr__(self):
+        return "<{} instance at {}: {} observations, dimensions {}>".format(
+                self.__class__.__name__, id(self), len(self), self.dims)
+
+    #/************************************************************************/
+    def column(self, dim):
+        """Column of codes (rather than integers) of a dimension, or of flags
+        when :data:`dim` is :literal:`'flag'`.
+        """
+        if dim == 'flag':
+            return np.asarray(self.flagcodes, dtype=object).take(self.flags)
+        elif dim not in self.dims:
+            raise pyroError('dimension %s not found' % dim)
+        return np.asarray(self.codes[dim], dtype=object).take(self.indices[dim])
+
+    #/************************************************************************/
+    def to_frame(self):
+        """Convert the table into a :class:`pandas.DataFrame` with categorical
+        columns for the dimensions and the flags; no code is copied.
+        """
+        if pd is None:
+            raise pyroError('conversion not supported in the absence of module pandas')
+        data = OrderedDict([(d, pd.Categorical.from_codes(self.indices[d], categories=self.codes[d]))
+                            for d in self.dims])
+        data['value'] = self.values
+        data['flag'] = pd.Categorical.from_codes(self.flags, categories=self.flagcodes)
+        return pd.DataFrame(data)
+
+    #/************************************************************************/
+    @classmethod
+    def concat(cls, batches):
+        """Concatenate batches read from the same dataset, i.e. whose tables of
+        codes are prefixes of each other (as yielded by :func:`iter_tsv` and
+        :func:`iter_sdmx`).
+        """
+        batches = list(batches)
+        if batches == []:
+            return None
+        last = batches[-1]
+        return cls(last.dims, last.codes,
+                   {d: np.concatenate([b.indices[d] for b in batches]) for d in last.dims},
+                   np.concatenate([b.values for b in batches]),
+                   np.concatenate([b.flags for b in batches]),
+                   last.flagcodes)
+
+
+#%%
+class _Encoder(object):
+    """Incremental encoder of codes into consecutive integers; the table of
+    codes only grows, so that integers remain valid from one batch to the next.
+    """
+    def __init__(self, codes=None):
+        self.index = {}
+        self.codes = []
+        for code in codes or []:
+            self.encode(code)
+    def encode(self, code):
+        try:
+            return self.index[code]
+        except KeyError:
+            self.index[code] = len(self.codes)
+            self.codes.append(code)
+            return self.index[code]
+
+
+def _open(source, mode='rb'):
+    """Open a file, possibly compressed, given as a path, bytes or a file object.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif isinstance(source, str):
+        source = open(source, mode)
+    if hasattr(source, 'peek'):
+        magic = source.peek(2)[:2]
+    else:
+        pos = source.tell()
+        magic = source.read(2)
+        source.seek(pos)
+    if magic == b'\x1f\x8b':
+        source = gzip.GzipFile(fileobj=source)
+    elif magic == b'PK':
+        raise pyroError('zipped source - use iter_sdmx for SDMX-ML archives')
+    return source
+
+
+#/****************************************************************************/
+def iter_tsv(source, **kwargs):
+    """Read incrementally a bulk dataset in TSV format.
+
+        >>> for batch in iter_tsv(source, batch=100000, missing=False):
+        ...     process(batch)
+
+    Arguments
+    ---------
+    source : str, bytes, file
+        path, content or file object of the (possibly gzipped) TSV file.
+
+    Keyword Arguments
+    -----------------
+    batch : int
+        approximate number of observations per batch; default: :data:`settings.BULK_BATCH`.
+    missing : bool
+        flag set to keep the missing observations (:literal:`':'`) which are
+        not flagged; default: :data:`False`.
+
+    Returns
+    -------
+    batch : :class:`Columns`
+        batches of observations.
+
+    Note
+    ----
+    The header of the file reads like :literal:`unit,geo\\time  2019  2018 ...`:
+    the last dimension before the tab is split into the last dimension of the
+    rows and the time dimension of the columns.
+    """
+    nbatch = kwargs.get('batch') or settings.BULK_BATCH
+    missing = kwargs.get('missing', False)
+    stream = io.TextIOWrapper(_open(source), encoding='utf-8')
+    header = stream.readline().rstrip('\n').split('\t')
+    if header == [''] :
+        raise pyroError('empty TSV source')
+    dims = [d.strip() for d in header[0].split('\\')[0].split(',')]
+    timedim = settings.BULK_TIME
+    periods = [t.strip() for t in header[1:]]
+    ntime = len(periods)
+    encoders = OrderedDict([(d, _Encoder()) for d in dims])
+    encoders[timedim] = _Encoder(periods)
+    flagenc = _Encoder([''])
+    nrows = max(1, nbatch // max(1, ntime))
+    while True:
+        lines = [l for l in (stream.readline() for _ in range(nrows)) if l.strip() != '']
+        if lines == []:
+            break
+        keys, cells = [], []
+        for line in lines:
+            row = line.rstrip('\n').split('\t')
+            keys.append([encoders[d].encode(c.strip()) for (d, c) in zip(dims, row[0].split(','))])
+            cells.extend((row[1:] + [':'] * ntime)[:ntime])
+        # vectorised parsing of the cells "value flags"
+        cells = np.char.partition(np.char.strip(np.asarray(cells, dtype=str)), ' ')
+        vals, flags = cells[:, 0], np.char.strip(cells[:, 2])
+        isnan = vals == ':'
+        values = np.where(isnan, 'nan', vals).astype(np.float64)
+        uflags, iflags = np.unique(flags, return_inverse=True)
+        flags = np.asarray([flagenc.encode(f) for f in uflags.tolist()], dtype=np.int16)[iflags.ravel()]
+        keep = None if missing else ~isnan | (flags != 0)
+        keys = np.asarray(keys, dtype=np.int32).reshape(len(lines), len(dims))
+        indices = {d: np.repeat(keys[:, i], ntime) for (i, d) in enumerate(dims)}
+        indices[timedim] = np.tile(np.arange(ntime, dtype=np.int32), len(lines))
+        if keep is not None:
+            indices = {d: i[keep] for (d, i) in indices.items()}
+            values, flags = values[keep], flags[keep]
+        yield Columns(list(encoders.keys()), {d: e.codes for (d, e) in encoders.items()},
+                      indices, values, flags, flagenc.codes)
+
+
+def read_tsv(source, **kwargs):
+    """Read a bulk dataset in TSV format at once; see :func:`iter_tsv`.
+    """
+    return Columns.concat(iter_tsv(source, **kwargs))
+
+
+#/****************************************************************************/
+_PERIODS = [(re.compile(r'^(\d{4})-([QSHW]\d+)$'), r'\1\2'),
+            (re.compile(r'^(\d{4})-(\d{2})$'), r'\1M\2'),
+            (re.compile(r'^(\d{4})-(\d{2})-(\d{2})$'), r'\1M\2D\3')]
+
+def _period(period):
+    """Convert a SDMX time period (e.g. :literal:`'2019-Q1'`, :literal:`'2019-01'`)
+    into the notation used in TSV files (e.g. :literal:`'2019Q1'`, :literal:`'2019M01'`).
+    """
+    for (regex, repl) in _PERIODS:
+        if regex.match(period):
+            return regex.sub(repl, period)
+    return period
+
+def _localname(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def iter_sdmx(source, **kwargs):
+    """Read incrementally a bulk dataset in SDMX-ML format.
+
+        >>> for batch in iter_sdmx(source, batch=100000, exclude=None):
+        ...     process(batch)
+
+    Arguments
+    ---------
+    source : str, bytes, file
+        path, content or file object of the SDMX-ML file, or of the zip archive
+        (:literal:`.sdmx.zip`) storing it.
+
+    Keyword Arguments
+    -----------------
+    batch : int
+        number of observations per batch; default: :data:`settings.BULK_BATCH`.
+    exclude : list
+        attributes of the series which are not dimensions; default:
+        :data:`settings.BULK_SDMX_ATTRS`.
+    missing : bool
+        see :func:`iter_tsv`.
+
+    Returns
+    -------
+    batch : :class:`Columns`
+        batches of observations, in the same format as :func:`iter_tsv`.
+
+    Note
+    ----
+    Only the elements of the series being read are kept in memory: they are
+    removed from the document as soon as the series ends.
+    """
+    nbatch = kwargs.get('batch') or settings.BULK_BATCH
+    exclude = set(kwargs.get('exclude') or settings.BULK_SDMX_ATTRS)
+    missing = kwargs.get('missing', False)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        members = [m for m in archive.namelist() if m.endswith('.xml') and not m.endswith('.dsd.xml')]
+        if members == []:
+            raise pyroError('no SDMX-ML file found in archive')
+        stream = archive.open(members[0])
+    else:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        stream = _open(source)
+    timedim = settings.BULK_TIME
+    dims, encoders, flagenc = None, None, _Encoder([''])
+    keys, times, values, flags = [], [], [], []
+    def columns():
+        return Columns(dims, {d: e.codes for (d, e) in encoders.items()},
+                       dict([(d, np.asarray([k[i] for k in keys], dtype=np.int32)) for (i, d) in enumerate(dims[:-1])]
+                            + [(timedim, times)]),
+                       values, flags, flagenc.codes)
+    stack, key = [], None
+    for event, elem in etree.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            if _localname(elem.tag) == 'Series':
+                attrs = [(k, v) for (k, v) in elem.attrib.items() if k not in exclude]
+                if dims is None:
+                    dims = [k for (k, _) in attrs] + [timedim]
+                    encoders = OrderedDict([(d, _Encoder()) for d in dims])
+                attrs = dict(attrs)
+                key = [encoders[d].encode(attrs.get(d, '')) for d in dims[:-1]]
+            continue
+        stack.pop()
+        name = _localname(elem.tag)
+        if name == 'Obs' and key is not None:
+            value = elem.get('OBS_VALUE')
+            flag = flagenc.encode((elem.get('OBS_STATUS') or elem.get('OBS_FLAG') or '').strip())
+            if value in (None, '', 'NaN', ':'):
+                if not missing and flag == 0:
+                    continue
+                value = np.nan
+            keys.append(key)
+            times.append(encoders[timedim].encode(_period(elem.get('TIME_PERIOD', ''))))
+            values.append(value)
+            flags.append(flag)
+            if len(values) >= nbatch:
+                yield columns()
+                keys, times, values, flags = [], [], [], []
+        elif name == 'Series':
+            key = None
+            # discard the series (and all its observations) from the document
+            elem.clear()
+            if stack != []:
+                stack[-1].clear()
+    if dims is not None and values != []:
+        yield columns()
+
+
+def read_sdmx(source, **kwargs):
+    """Read a bulk dataset in SDMX-ML format at once; see :func:`iter_sdmx`.
+    """
+    return Columns.concat(iter_sdmx(source, **kwargs))
+
+
+#/****************************************************************************/
+def read(source, fmt=None, **kwargs):
+    """Read a bulk dataset in any of the formats of :data:`settings.BULK_EXTS`;
+    when :data:`fmt` is not passed, it is guessed from the name of the file.
+    """
+    if fmt is None and isinstance(source, str):
+        fmt = 'sdmx' if '.sdmx' in source else 'tsv'
+    if fmt not in settings.BULK_EXTS['data']:
+        raise pyroError('bulk data format FMT not recognised')
+    return read_tsv(source, **kwargs) if fmt == 'tsv' else read_sdmx(source, **kwargs)
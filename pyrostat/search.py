@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. search.py
+
+Full-text search over the table of contents and the metabase.
+
+**Description**
+
+A :class:`SearchIndex` indexes documents (datasets with their codes and titles
+in all the languages of :data:`settings.LANGS`, dimensions, and codes of the
+dimensions with their labels) with two inverted indexes:
+
+* a token index, used for ranked keyword search (BM25 scoring, with prefix
+  matching of the query terms),
+* a trigram index, used to select the candidate documents of substring and
+  regular expression searches, which are then only verified on those candidates.
+
+Texts are normalised (lower case, accents removed) so that searches are case-
+and accent-insensitive.
+
+**Usage**
+
+    >>> from search import SearchIndex
+    >>> S = SearchIndex.build(meta.index, tocs={'en': toc_en, 'fr': toc_fr})
+    >>> S.search('labour input agri')
+    [OrderedDict([('kind', 'dataset'), ('key', 'aact_ali01'), ('score', 12.1)]), ...]
+    >>> S.search('ali0', mode='substring', kind='dataset')
+    >>> S.search(r'aact_ali0[12]', mode='regex')
+
+**Dependencies**
+
+*call*:         :mod:`settings`
+
+*require*:      :mod:`re`, :mod:`math`, :mod:`bisect`, :mod:`unicodedata`,
+                :mod:`collections`, :mod:`numpy`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 18:20:44 2026
+
+__all__         = ['SearchIndex']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import re
+import math
+import bisect
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from . import settings
+from .settings import pyroError
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+_TOKEN      = re.compile(r'\w+', re.UNICODE)
+_SPECIAL    = set('.^$*+?{}[]()|\\')
+
+def _normalise(text):
+    """Lower case and remove the accents of a text.
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join([c for c in text if not unicodedata.combining(c)])
+
+def _trigrams(text):
+    return set([text[i:i+3] for i in range(len(text) - 2)])
+
+def _literals(pattern):
+    """Extract from a regular expression literal strings that any match must
+    contain; an empty list is returned when none can be safely extracted.
+    """
+    if '|' in pattern or '(?' in pattern:
+        return []
+    literals, current, depth, i, n = [], '', 0, 0, len(pattern)
+    def close(run):
+        # literals within groups may be optional, e.g. '(abc)?'
+        if depth == 0 and len(run) >= 3:
+            literals.append(run)
+        return ''
+    while i < n:
+        c = pattern[i]
+        if c == '\\':
+            nxt = pattern[i+1:i+2]
+            if nxt != '' and not nxt.isalnum():
+                # escaped punctuation is a literal character
+                current += nxt
+            else:
+                current = close(current)
+            i += 2
+            continue
+        elif c == '[':
+            current = close(current)
+            j = pattern.find(']', i + 2)
+            i = n if j < 0 else j + 1
+            continue
+        elif c in '?*{':
+            # the preceding character is optional
+            current = close(current[:-1])
+            if c == '{':
+                j = pattern.find('}', i)
+                i = n if j < 0 else j + 1
+                continue
+        elif c in '()':
+            current = close(current)
+            depth += 1 if c == '(' else -1
+        elif c in _SPECIAL:
+            current = close(current)
+        else:
+            current += c
+        i += 1
+    close(current)
+    return literals
+
+
+#%%
+class SearchIndex(object):
+    """Token and trigram inverted indexes over a set of documents.
+
+        >>> S = SearchIndex()
+        >>> S.add(kind, key, *texts)
+        >>> S.freeze()
+
+    Documents are identified by a :data:`kind` (e.g., :literal:`'dataset'`) and
+    a :data:`key`; all their texts are indexed together. Documents can only be
+    added before the index is frozen (which is done by the first search).
+    """
+
+    KINDS   = ('dataset', 'dimension', 'label')
+    K1, B   = 1.2, 0.75 # BM25 parameters
+
+    #/************************************************************************/
+    def __init__(self):
+        self._kinds     = []
+        self._keys      = []
+        self._texts     = []   # original texts
+        self._norms     = []   # normalised texts
+        self._tokens    = {}   # token -> {doc: frequency}
+        self._grams     = {}   # trigram -> [docs]
+        self._lengths   = []
+        self._frozen    = False
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self._keys)
+    def __repr__(self):
+        return "<{} instance at {}: {} documents, {} tokens>".format(self.__class__.__name__, id(self),
+                len(self), len(self._tokens))
+
+    #/************************************************************************/
+    def add(self, kind, key, *texts):
+        """Add a document.
+        """
+        if self._frozen:
+            raise pyroError('index already frozen')
+        elif kind not in self.KINDS:
+            raise pyroError('kind %s not recognised' % kind)
+        doc = len(self._keys)
+        text = ' | '.join([t for t in texts if t])
+        norm = _normalise(text)
+        self._kinds.append(kind)
+        self._keys.append(key)
+        self._texts.append(text)
+        self._norms.append(norm)
+        tokens = _TOKEN.findall(norm)
+        self._lengths.append(len(tokens))
+        for token in tokens:
+            postings = self._tokens.setdefault(token, {})
+            postings[doc] = postings.get(doc, 0) + 1
+        for gram in _trigrams(norm):
+            self._grams.setdefault(gram, []).append(doc)
+        return doc
+
+    def freeze(self):
+        """Convert the postings into arrays; called once all documents are added.
+        """
+        if self._frozen:
+            return
+        self._tokens = {t: (np.fromiter(p.keys(), dtype=np.int32, count=len(p)),
+                            np.fromiter(p.values(), dtype=np.float32, count=len(p)))
+                        for (t, p) in self._tokens.items()}
+        # documents are added in order: postings are already sorted
+        self._grams = {g: np.asarray(p, dtype=np.int32) for (g, p) in self._grams.items()}
+        self._vocabulary = sorted(self._tokens.keys())
+        self._lengths = np.asarray(self._lengths, dtype=np.float32)
+        self._avglength = float(self._lengths.mean()) if len(self._lengths) > 0 else 0.
+        self._kindcodes = np.asarray([self.KINDS.index(k) for k in self._kinds], dtype=np.int8)
+        self._frozen = True
+
+    #/************************************************************************/
+    def __results(self, docs, scores=None, limit=None):
+        if scores is not None:
+            order = np.argsort(-scores, kind='stable')
+            docs, scores = docs[order], scores[order]
+        if limit is not None:
+            docs = docs[:limit]
+        return [OrderedDict([('kind', self._kinds[d]), ('key', self._keys[d]),
+                             ('score', None if scores is None else float(scores[i]))])
+                for (i, d) in enumerate(docs.tolist())]
+
+    def __filter(self, docs, kind):
+        if kind is None:
+            return docs
+        elif kind not in self.KINDS:
+            raise pyroError('kind %s not recognised' % kind)
+        return docs[self._kindcodes[docs] == self.KINDS.index(kind)]
+
+    #/************************************************************************/
+    def keyword(self, query, kind=None, limit=20, prefix=True):
+        """Ranked keyword search: documents containing the terms of the query
+        are scored with BM25.
+
+            >>> results = S.keyword(query, kind=None, limit=20, prefix=True)
+
+        Keyword Arguments
+        -----------------
+        kind : str
+            kind of documents searched; default: all.
+        limit : int
+            maximum number of results; default: 20.
+        prefix : bool
+            flag set to also match the terms of the index starting with the
+            terms of the query (with half their weight); default: :data:`True`.
+        """
+        self.freeze()
+        terms = _TOKEN.findall(_normalise(query))
+        if terms == []:
+            return []
+        ndocs = len(self._keys)
+        scores = np.zeros(ndocs, dtype=np.float32)
+        matched = np.zeros(ndocs, dtype=np.int16)
+        for term in set(terms):
+            found = np.zeros(ndocs, dtype=bool)
+            for (token, weight) in self.__expand(term, prefix):
+                docs, freqs = self._tokens[token]
+                idf = math.log(1. + (ndocs - len(docs) + .5) / (len(docs) + .5))
+                norm = freqs + self.K1 * (1 - self.B + self.B * self._lengths[docs] / self._avglength)
+                scores[docs] += weight * idf * freqs * (self.K1 + 1) / norm
+                found[docs] = True
+            matched += found
+        # all the terms of the query are required
+        docs = self.__filter(np.flatnonzero(matched == len(set(terms))), kind)
+        return self.__results(docs, scores[docs], limit=limit)
+
+    def __expand(self, term, prefix):
+        if term in self._tokens:
+            yield term, 1.
+        if prefix is True:
+            i = bisect.bisect_right(self._vocabulary, term)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+                yield self._vocabulary[i], .5
+                i += 1
+
+    #/************************************************************************/
+    def __candidates(self, literals):
+        # documents containing all the trigrams of the literals
+        docs = None
+        for literal in literals:
+            for gram in _trigrams(_normalise(literal)):
+                postings = self._grams.get(gram)
+                if postings is None:
+                    return np.zeros(0, dtype=np.int32)
+                docs = postings if docs is None else np.intersect1d(docs, postings, assume_unique=True)
+        return docs
+
+    def substring(self, text, kind=None, limit=None):
+        """Search the documents containing a substring (case- and accent-insensitive).
+
+            >>> results = S.substring(text, kind=None, limit=None)
+        """
+        self.freeze()
+        norm = _normalise(text)
+        if len(norm) >= 3:
+            docs = self.__filter(self.__candidates([norm]), kind)
+        else:
+            docs = self.__filter(np.arange(len(self._keys), dtype=np.int32), kind)
+        docs = np.asarray([d for d in docs.tolist() if norm in self._norms[d]], dtype=np.int32)
+        return self.__results(docs, limit=limit)
+
+    def regex(self, pattern, kind=None, limit=None, flags=re.IGNORECASE):
+        """Search the documents matching a regular expression; the literal
+        strings of the expression are used to select candidate documents with
+        the trigram index.
+
+            >>> results = S.regex(pattern, kind=None, limit=None, flags=re.IGNORECASE)
+        """
+        self.freeze()
+        try:
+            regex = re.compile(pattern, flags)
+        except re.error:
+            raise pyroError('wrong regular expression %s' % pattern)
+        literals = _literals(pattern)
+        if literals != []:
+            docs = self.__candidates(literals)
+        else:
+            docs = np.arange(len(self._keys), dtype=np.int32)
+        docs = self.__filter(docs, kind)
+        docs = np.asarray([d for d in docs.tolist() if regex.search(self._texts[d])], dtype=np.int32)
+        return self.__results(docs, limit=limit)
+
+    def search(self, query, mode='keyword', **kwargs):
+        """Search the index with any of the :literal:`'keyword'` (see :meth:`keyword`),
+        :literal:`'substring'` (see :meth:`substring`) or :literal:`'regex'`
+        (see :meth:`regex`) modes.
+        """
+        if mode not in ('keyword', 'substring', 'regex'):
+            raise pyroError('wrong value for MODE parameter')
+        return getattr(self, mode)(query, **kwargs)
+
+    #/************************************************************************/
+    @classmethod
+    def build(cls, index=None, tocs=None, dictionaries=None):
+        """Build the search index of the metadata of the bulk download service.
+
+            >>> S = SearchIndex.build(index=None, tocs=None, dictionaries=None)
+
+        Keyword Arguments
+        -----------------
+        index : :class:`metabase.MetaIndex`
+            indexes of the metabase: datasets, dimensions and codes of every
+            dimension are indexed.
+        tocs : dict
+            tables of contents (:class:`toc.TocTable`) in several languages, whose
+            titles are indexed with the datasets; the titles of all the languages
+            of a multilingual table are indexed.
+        dictionaries : dict
+            dictionaries (:class:`dictionary.Dictionary`) in several languages,
+            whose labels are indexed with the dimensions and codes.
+        """
+        inst = cls()
+        tables, tocs = tocs or {}, OrderedDict()
+        for (lang, toc) in tables.items():
+            for l in toc.langs or [lang]:
+                tocs.setdefault(l, toc)
+        tocs = OrderedDict([(l, tocs[l]) for l in settings.LANGS if l in tocs])
+        dictionaries = OrderedDict([(l, dictionaries[l]) for l in settings.LANGS if l in (dictionaries or {})])
+        def labels(dic, codes):
+            # labels of the codes in all the dictionaries, translated at once
+            translated = []
+            for d in dictionaries.values():
+                try:
+                    translated.append(d[dic].translate(codes, default='').tolist())
+                except:
+                    pass
+            return [[t[i] for t in translated] for i in range(len(codes))]
+        datasets = OrderedDict()
+        if index is not None:
+            datasets.update([(d, None) for d in index.datasets()])
+        for toc in tocs.values():
+            datasets.update([(d, None) for d in toc.codes])
+        for dataset in datasets:
+            titles = [toc.title(dataset, lang=l if l in toc.titles else None)
+                      for (l, toc) in tocs.items() if dataset in toc]
+            inst.add('dataset', dataset, dataset, *titles)
+        if index is not None:
+            dims = index.dimensions()
+            for (dim, names) in zip(dims, labels(settings.BULK_LIST['dic'], dims)):
+                inst.add('dimension', dim, dim, *names)
+                codes = index.labels(dim)
+                for (code, names) in zip(codes, labels(dim, codes)):
+                    inst.add('label', (dim, code), code, *names)
+        inst.freeze()
+        return inst
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. series.py
+
+Local store of the time series fetched from the REST service, refreshed
+incrementally.
+
+**Description**
+
+The time series of Eurostat datasets only gain a few new periods at every release.
+A :class:`SeriesStore` keeps the cube of every series fetched, indexed by the
+canonical key of its query regardless of the time selection (see :meth:`SeriesStore.key`),
+and remembers the last period stored. :meth:`SeriesStore.refresh` then requests
+only the periods since the last ones stored (parameter :literal:`sinceTimePeriod`
+of the REST service), and appends them to the stored cube.
+
+The last :data:`lookback` periods stored are fetched again on every refresh: the
+observations revised since they were stored (values or flags) are detected,
+reported and updated.
+
+**Usage**
+
+    >>> from series import SeriesStore
+    >>> S = SeriesStore(root='/data/eurostat/series', lookback=3)
+    >>> Q = Query('nama_10_gdp', geo=['AT', 'BE'], unit='CP_MEUR', na_item='B1GQ')
+    >>> S.refresh(Q)['mode'] # first call: full series
+    'full'
+    >>> S.last(Q)
+    '2019'
+    >>> report = S.refresh(Q) # next release: periods since 2017 only
+    >>> report['added'], report['revised']
+    (['2020'], ['2019'])
+    >>> cube = S.get(Q)
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`query`, :mod:`cube`
+
+*require*:      :mod:`hashlib`, :mod:`collections`, :mod:`numpy`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 22:41:07 2026
+
+__all__         = ['SeriesStore']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from . import settings
+from .settings import pyroError
+from .query import Query, Fetcher
+from .cube import Cube, CubeStore
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class SeriesStore(object):
+    """Store of time series fetched from the REST service, refreshed incrementally.
+
+        >>> S = SeriesStore(root=None, fetcher=None, lookback=None)
+
+    Keyword Arguments
+    -----------------
+    root : str
+        directory where the series are stored (see :class:`cube.CubeStore`);
+        default: :data:`None`, i.e. the series are only kept in memory.
+    fetcher : :class:`query.Fetcher`
+        fetcher used to send the queries; default: a new fetcher.
+    lookback : int
+        number of the last periods stored that are fetched again on every refresh
+        and checked for revisions; default: :data:`settings.API_LOOKBACK`.
+
+    Note
+    ----
+    The last period stored is always fetched again, since the period following it
+    cannot be derived from the codes alone (the frequency of the series is not known).
+    """
+
+    TIME    = 'time'
+    PERIODS = ('sinceTimePeriod', 'lastTimePeriod')
+
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        root            = kwargs.pop('root', None)
+        self._fetcher   = kwargs.pop('fetcher', None)
+        self._lookback  = kwargs.pop('lookback', None) or settings.API_LOOKBACK
+        if not(root is None or isinstance(root, str)):
+            raise pyroError('wrong type for ROOT parameter')
+        elif not(self._fetcher is None or isinstance(self._fetcher, Fetcher)):
+            raise pyroError('wrong type for FETCHER parameter')
+        elif not isinstance(self._lookback, int) or self._lookback < 1:
+            raise pyroError('wrong value for LOOKBACK parameter')
+        self._store     = None if root is None else CubeStore(root)
+        self._series    = {}
+
+    #/************************************************************************/
+    @property
+    def fetcher(self):
+        if self._fetcher is None:
+            self._fetcher = Fetcher()
+        return self._fetcher
+    @property
+    def store(self):
+        return self._store
+    @property
+    def lookback(self):
+        return self._lookback
+
+    #/************************************************************************/
+    @classmethod
+    def series(cls, query):
+        """Query of the whole series of a query, i.e. with no time selection.
+
+            >>> Q = S.series(query)
+        """
+        if not isinstance(query, Query):
+            raise pyroError('wrong type for QUERY parameter')
+        kwargs = OrderedDict([(k, v) for (k, v) in query.filters.items() if k != cls.TIME])
+        kwargs.update([(k, v) for (k, v) in query.params.items() if k not in cls.PERIODS])
+        return Query(query.dataset, lang=query.lang, fmt=query.fmt, **kwargs)
+    @classmethod
+    def key(cls, query):
+        """Key of the series of a query, shared by all the queries of the same
+        series whatever their time selection.
+        """
+        return cls.series(query).key
+    def _name(self, query):
+        return '%s.%s' % (query.dataset, hashlib.sha1(self.key(query).encode('utf-8')).hexdigest())
+
+    #/************************************************************************/
+    def get(self, query):
+        """Retrieve the series of a query, or :data:`None` when it is not stored.
+
+            >>> cube = S.get(query)
+        """
+        key = self.key(query)
+        if key in self._series:
+            return self._series[key]
+        elif self._store is None or self._name(query) not in self._store:
+            return None
+        cube = self._store.open(self._name(query))
+        self._series[key] = cube
+        return cube
+    def last(self, query):
+        """Last period stored for the series of a query, or :data:`None`.
+        """
+        cube = self.get(query)
+        if cube is None or self.TIME not in cube.dims or cube.codes[self.TIME] == []:
+            return None
+        return max(cube.codes[self.TIME])
+    def remove(self, query):
+        """Remove the series of a query from the store.
+        """
+        self._series.pop(self.key(query), None)
+        if self._store is not None:
+            self._store.remove(self._name(query))
+    def _put(self, query, cube):
+        self._series[self.key(query)] = cube
+        if self._store is not None:
+            self._store.save(self._name(query), cube)
+
+    #/************************************************************************/
+    def refresh(self, query, lookback=None):
+        """Update the series of a query: fetch the whole series (whatever the time
+        selection of the query) when it is not stored yet, only the last periods
+        otherwise.
+
+            >>> report = S.refresh(query, lookback=None)
+
+        Keyword Arguments
+        -----------------
+        lookback : int
+            number of the last periods stored fetched again and checked for
+            revisions; default: :data:`lookback`.
+
+        Returns
+        -------
+        report : :class:`collections.OrderedDict`
+            :literal:`'mode'` of the refresh (:literal:`'full'` or :literal:`'incremental'`),
+            first period requested (:literal:`'since'`), periods :literal:`'added'`
+            to the series, periods with :literal:`'revised'` observations and number
+            of :literal:`'revisions'`, i.e. of observations whose value or flag
+            changed.
+
+        Note
+        ----
+        The revised observations are updated; observations no longer returned
+        by the service are kept. The queries are always sent: the cache of the
+        fetcher, which may hold the periods fetched by a former refresh, is
+        bypassed (and updated).
+        """
+        lookback = lookback or self._lookback
+        if not isinstance(lookback, int) or lookback < 1:
+            raise pyroError('wrong value for LOOKBACK parameter')
+        report = OrderedDict([('mode', 'full'), ('since', None), ('added', []), ('revised', []),
+                              ('revisions', 0)])
+        old = self.get(query)
+        if old is not None and (self.TIME not in old.dims or old.codes[self.TIME] == []):
+            old = None
+        if old is None:
+            # the series is stored whole, as it is shared by all the queries
+            # with the same key
+            cube = self.fetcher.run(self.series(query), cache=False)
+            if self.TIME in cube.dims:
+                report['added'] = sorted(cube.codes[self.TIME])
+            self._put(query, cube)
+            return report
+        periods = sorted(old.codes[self.TIME])
+        since = periods[-min(lookback, len(periods))]
+        new = self.fetcher.run(self.series(query).copy(sinceTimePeriod=since), cache=False)
+        if new.dims != old.dims:
+            # structure of the dataset changed: the series is fetched again
+            self.remove(query)
+            return self.refresh(query, lookback=lookback)
+        report['mode'], report['since'] = 'incremental', since
+        report['added'] = sorted([p for p in new.codes[self.TIME] if p not in old.index(self.TIME)])
+        revised = self.revisions(old, new)
+        report['revised'] = sorted(revised.keys())
+        report['revisions'] = sum(revised.values())
+        cube = Cube.merge([old, new])
+        if report['added'] != []:
+            # periods kept in chronological order
+            cube = cube.loc(**{self.TIME: sorted(cube.codes[self.TIME])})
+        self._put(query, cube)
+        return report
+
+    #/************************************************************************/
+    @classmethod
+    def revisions(cls, old, new):
+        """Count the observations of the periods of both cubes whose value or
+        flag changed in the new cube.
+
+            >>> revised = S.revisions(old, new)
+
+        Returns
+        -------
+        revised : :class:`collections.OrderedDict`
+            number of revised observations per period, for the periods with
+            revisions only.
+        """
+        common = OrderedDict([(d, [c for c in old.codes[d] if c in new.index(d)]) for d in old.dims])
+        if any([c == [] for c in common.values()]):
+            return OrderedDict()
+        before, after = old.loc(**common), new.loc(**common)
+        def flags(cube):
+            if cube.flags is None:
+                return np.full(cube.shape, '', dtype=object)
+            return np.asarray(cube.flagcodes, dtype=object)[cube.flags]
+        bflags, aflags = flags(before), flags(after)
+        observed = ~np.isnan(after.values) | (aflags != '')
+        changed = (before.values != after.values) & ~(np.isnan(before.values) & np.isnan(after.values))
+        changed = observed & (changed | (bflags != aflags))
+        axis = after.dims.index(cls.TIME)
+        counts = changed.sum(axis=tuple([i for i in range(changed.ndim) if i != axis]))
+        return OrderedDict([(p, int(n)) for (p, n) in zip(after.codes[cls.TIME], counts.tolist()) if n > 0])
@@ -53,6 +53,7 @@ import time
 # local imports
 from . import settings
 from .settings import pyroWarning, pyroError, pyroVerbose
+from .listing import parse_listing
    
 # requirements
 
@@ -744,6 +745,35 @@ class Session(object):
                 rows.append(table.findAll('tr')) 
         return headers, rows
                
+    #/************************************************************************/
+    def read_listing_table(self, url, **kwargs):
+        """Read the table of files reported in a page of the bulk listing.
+        
+            >>> rows = session.read_listing_table(url, attrs={'class': 'filelist'})
+            
+        Arguments
+        ---------
+        url : str
+            
+        Keyword Arguments
+        -----------------
+        kwargs :
+            see :func:`listing.parse_listing`.
+            
+        Returns
+        -------
+        rows : list
+            rows :data:`(name, size, type, date)` of the table, as strings.
+
+        Note
+        ----
+        Unlike :meth:`read_html_table`, the page is parsed with the lightweight 
+        :class:`listing.ListingParser` which extracts the rows of the table 
+        directly, without building any document tree.
+        """
+        response = self.get_response(url)
+        return parse_listing(response.content, encoding=response.encoding, **kwargs)
+               
     #/************************************************************************/
     def read_html_table(self, url, **kwargs) ->pd.DataFrame: 
         try:
@@ -14,7 +14,11 @@ Basic definitions for Eurobase API
 
 import os, sys#analysis:ignore
 import inspect, six
-from collections import OrderedDict, Mapping
+from collections import OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 import logging
 
 from pyrostat import metadata
@@ -97,6 +101,33 @@ API_LANGS           = {k: ('en','de','fr') for k in (1,2)}
 """
 Languages supported by Eurostat API.
 """
+API_PARAMS          = ('precision', 'sinceTimePeriod', 'lastTimePeriod', 'unitLabel',
+                       'groupedIndicators', 'filterNonGeo', 'shortLabel')
+"""
+Parameters of Eurostat API queries that are not dimensions of the datasets.
+"""
+API_CATEGORIES      = 50
+"""
+Maximum number of categories requested in a single query of Eurostat REST API.
+"""
+API_WORKERS         = 4
+"""
+Maximum number of queries sent concurrently to Eurostat REST API.
+"""
+API_CACHE           = 64
+"""
+Maximum number of decoded queries of Eurostat REST API kept in memory.
+"""
+API_EXPIRE          = 86400
+"""
+Number of seconds after which the decoded queries of Eurostat REST API stored
+in cache are considered outdated and fetched again.
+"""
+API_LOOKBACK        = 3
+"""
+Number of the last periods of a time series fetched again through Eurostat REST
+API on every incremental refresh, so as to detect revised observations.
+"""
 
 DEF_SORT            = {API_HISTORY['first']: 1,
                        API_HISTORY['new']: None}
@@ -158,6 +189,11 @@ BULK_ZIP            = {'dic':   'gz',
 """
 Extension ("format") of compressed bulk dictionaries/datasets/metadata files.
 """
+BULK_ZIP_FMTS       = {'sdmx': 'zip'}
+"""
+Compression of the bulk files of some formats, overriding :data:`BULK_ZIP`: e.g.,
+the SDMX-ML datasets are zip archives (:literal:`.sdmx.zip`).
+"""
 BULK_FILES          = {'dic':   '', 
                        'data':  '', 
                        'base':  'metabase',
@@ -167,6 +203,46 @@ Generic string used for naming the bulk dictionaries/datasets/metadata files, fo
 instance the file storing all metadata about Eurostat datasets, or the the table 
 of contents providing contents of Eurostat database.
 """
+BULK_MANIFEST       = 'manifest.json'
+"""
+Name of the file storing, in a local copy of the bulk repository, the last update
+dates and sizes of the dictionaries/datasets already downloaded.
+"""
+BULK_MIRROR         = 'mirror.json'
+"""
+Name of the file storing, in a local mirror of the bulk repository, the dates,
+sizes and hashes of all the files mirrored.
+"""
+BULK_SIZE_UNITS     = {'B': 1, 'KB': 1024, 'MB': 1024**2, 'GB': 1024**3}
+"""
+Units used for the sizes of the files reported in the bulk listing.
+"""
+BULK_EXPIRE         = 86400
+"""
+Number of seconds after which the pages of the bulk listing already loaded are
+considered outdated and loaded again.
+"""
+BULK_WORKERS        = 8
+"""
+Maximum number of concurrent connections opened to the bulk download service.
+"""
+BULK_BATCH          = 100000
+"""
+Number of observations parsed at once when reading bulk datasets.
+"""
+BULK_MEMORY         = 2**30
+"""
+Memory budget (in bytes) used by default when planning the loading of bulk datasets.
+"""
+BULK_TIME           = 'time'
+"""
+Name of the time dimension of bulk datasets.
+"""
+BULK_SDMX_ATTRS     = ('FREQ', 'TIME_FORMAT')
+"""
+Attributes of the series of bulk SDMX-ML datasets which are not reported as
+dimensions, so that the datasets read from SDMX-ML and TSV files match.
+"""
 
 KW_DEFAULT          = 'default'
 """
@@ -394,6 +470,13 @@ class pyroObsolete(object):
 # GLOBAL CLASSES/METHODS/VARIABLES
 #==============================================================================
 
+def zipped_ext(key, ext):
+    """Extension of the (compressed) bulk files of a given type and format, e.g.
+    :literal:`'tsv.gz'` or :literal:`'sdmx.zip'` for the datasets.
+    """
+    zipped = BULK_ZIP_FMTS.get(ext, BULK_ZIP[key])
+    return ext if zipped == '' else '%s.%s' % (ext, zipped)
+
 def fileexists(file):
     """Check file existence.
     """
@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. snapshot.py
+
+Persistent binary snapshots of the metadata of the bulk download service.
+
+**Description**
+
+Loading the metabase and the table of contents means downloading (or reading)
+and parsing both files, then building the indexes derived from them. A :class:`Snapshot`
+persists, in a directory of :mod:`numpy` files which are all memory-mapped when
+loaded back:
+
+* the metabase as integer-coded columns (see :class:`metabase.CompactMetabase`),
+* the table of contents (see :class:`toc.TocTable`),
+* the metabase indexes as compressed sparse arrays (see :class:`MappedIndex`),
+
+together with the dates of the source files. A new process loads a snapshot in
+a few milliseconds instead of parsing the sources again; snapshots older than
+their sources are detected and rebuilt.
+
+**Usage**
+
+    >>> from snapshot import Snapshot
+    >>> S = Snapshot('/data/eurostat/snapshot')
+    >>> dates = S.source_dates(source='/data/eurostat') # local mirror
+    >>> if not S.is_valid(dates):
+    ...     S.save(compact, toc, dates)
+    >>> compact, toc, index = S.load()
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`metabase`, :mod:`toc`, :mod:`sync`
+
+*require*:      :mod:`os`, :mod:`time`, :mod:`shutil`, :mod:`tempfile`, :mod:`collections`,
+                :mod:`numpy`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 17:41:36 2026
+
+__all__         = ['MappedIndex', 'Snapshot']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import time
+import shutil
+import tempfile
+from collections import OrderedDict
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+import numpy as np
+
+from . import settings
+from .settings import pyroError
+from .metabase import MetaIndex, CompactMetabase
+from .toc import TocTable
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class MappedIndex(MetaIndex):
+    """Indexes of the metabase stored as compressed sparse arrays over the
+    integer-coded columns of a :class:`metabase.CompactMetabase`.
+
+        >>> index = MappedIndex(compact, arrays)
+        >>> index = MappedIndex.from_compact(compact)
+
+    The metabase rows are grouped into segments of consecutive rows with the same
+    dataset and dimension; :data:`arrays` stores:
+
+    * :literal:`'seg_dic'`, :literal:`'seg_start'`, :literal:`'seg_end'`: dimension
+      and rows of every segment, with the segments sorted by dataset,
+    * :literal:`'data_ptr'`: segments of dataset :data:`i` are :data:`data_ptr[i]:data_ptr[i+1]`,
+    * :literal:`'dic_seg'`, :literal:`'dic_ptr'`: segments sorted by dimension,
+      those of dimension :data:`j` being :data:`dic_seg[dic_ptr[j]:dic_ptr[j+1]]`,
+
+    so that no per-row structure is built in memory: the labels of a dataset and
+    dimension are only decoded when they are looked up.
+    """
+
+    ARRAYS  = ('seg_dic', 'seg_start', 'seg_end', 'data_ptr', 'dic_seg', 'dic_ptr')
+    CACHE   = 256 # number of label sets kept decoded
+
+    #/************************************************************************/
+    def __init__(self, compact, arrays):
+        self._compact   = compact
+        for k in self.ARRAYS:
+            setattr(self, '_%s' % k, arrays[k])
+        self._tdata     = compact.tables['data']
+        self._tdic      = compact.tables['dic']
+        self._tlabel    = None
+        self._data_pos  = {d: i for (i, d) in enumerate(self._tdata)}
+        self._dic_pos   = {d: i for (i, d) in enumerate(self._tdic)}
+        self._cache     = OrderedDict()
+        self._all       = {}
+
+    @classmethod
+    def from_compact(cls, compact):
+        data, dic = compact.columns['data'], compact.columns['dic']
+        n, ndata, ndic = len(data), len(compact.tables['data']), len(compact.tables['dic'])
+        change = np.ones(n, dtype=bool)
+        if n > 0:
+            change[1:] = (data[1:] != data[:-1]) | (dic[1:] != dic[:-1])
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], n).astype(np.int64)
+        order = np.argsort(data[starts], kind='stable')
+        seg_data, seg_dic = np.asarray(data[starts])[order], np.asarray(dic[starts])[order]
+        dic_seg = np.argsort(seg_dic, kind='stable')
+        arrays = {'seg_dic': seg_dic, 'seg_start': starts[order].astype(np.int64),
+                  'seg_end': ends[order],
+                  'data_ptr': np.searchsorted(seg_data, np.arange(ndata + 1)).astype(np.int64),
+                  'dic_seg': dic_seg.astype(np.int64),
+                  'dic_ptr': np.searchsorted(seg_dic[dic_seg], np.arange(ndic + 1)).astype(np.int64)}
+        return cls(compact, arrays)
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self._compact)
+    def __repr__(self):
+        return "<{} instance at {}: {} datasets, {} dimensions>".format(self.__class__.__name__,
+                id(self), len(self._tdata), len(self._tdic))
+
+    #/************************************************************************/
+    def __segments(self, dataset):
+        i = self._data_pos.get(dataset)
+        if i is None:
+            return range(0)
+        return range(int(self._data_ptr[i]), int(self._data_ptr[i + 1]))
+
+    def has_dataset(self, dataset):
+        return dataset in self._data_pos
+    def has_dimension(self, dimension, dataset=None):
+        if dataset is not None:
+            return self._labelset(dataset, dimension) is not None
+        j = self._dic_pos.get(dimension)
+        return j is not None and int(self._dic_ptr[j + 1]) > int(self._dic_ptr[j])
+    def datasets(self, dimension=None):
+        if dimension is None:
+            return list(self._tdata)
+        j = self._dic_pos.get(dimension)
+        if j is None:
+            return []
+        segs = self._dic_seg[int(self._dic_ptr[j]):int(self._dic_ptr[j + 1])]
+        datasets = {}
+        for s in segs.tolist():
+            datasets[self._tdata[int(np.searchsorted(self._data_ptr, s, side='right')) - 1]] = None
+        return list(datasets)
+    def dimensions(self, dataset=None):
+        if dataset is None:
+            return list(self._tdic)
+        dims = {}
+        for s in self.__segments(dataset):
+            dims[self._tdic[int(self._seg_dic[s])]] = None
+        return list(dims)
+
+    def _labelset(self, dataset, dimension):
+        key = (dataset, dimension)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        j = self._dic_pos.get(dimension)
+        if j is None:
+            return None
+        segs = [s for s in self.__segments(dataset) if int(self._seg_dic[s]) == j]
+        if segs == []:
+            return None
+        if self._tlabel is None:
+            self._tlabel = np.asarray(self._compact.tables['label'], dtype=object)
+        column = self._compact.columns['label']
+        labels = {}
+        for s in segs:
+            labels.update(dict.fromkeys(self._tlabel[column[int(self._seg_start[s]):int(self._seg_end[s])]].tolist()))
+        self._cache[key] = labels
+        if len(self._cache) > self.CACHE:
+            self._cache.popitem(last=False)
+        return labels
+
+    #/************************************************************************/
+    def save(self, path):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        for k in self.ARRAYS:
+            np.save(os.path.join(path, '%s.npy' % k), np.asarray(getattr(self, '_%s' % k)))
+    @classmethod
+    def load(cls, compact, path, mmap=True):
+        return cls(compact, {k: np.load(os.path.join(path, '%s.npy' % k), mmap_mode='r' if mmap else None)
+                             for k in cls.ARRAYS})
+
+
+#%%
+class Snapshot(object):
+    """Persistent binary snapshot of the metabase, the table of contents and
+    the indexes of the metabase.
+
+        >>> S = Snapshot(path)
+
+    Arguments
+    ---------
+    path : str
+        directory of the snapshot.
+    """
+
+    VERSION = 1
+    INFO    = 'snapshot.json'
+    PARTS   = ('metabase', 'toc', 'index')
+
+    #/************************************************************************/
+    def __init__(self, path):
+        if not isinstance(path, str):
+            raise pyroError('wrong type for PATH parameter')
+        self._path = path
+
+    #/************************************************************************/
+    @property
+    def path(self):
+        return self._path
+    def exists(self):
+        return os.path.exists(os.path.join(self._path, self.INFO))
+    @property
+    def info(self):
+        """Information stored with the snapshot: version, date of creation and
+        dates of the source files.
+        """
+        if not self.exists():
+            return None
+        try:
+            with open(os.path.join(self._path, self.INFO), 'r') as f:
+                return json.load(f)
+        except:
+            return None
+
+    #/************************************************************************/
+    @staticmethod
+    def source_files(lang=None):
+        """Names of the source files of a snapshot: the metabase and the table
+        of contents in a given language.
+        """
+        lang = lang or settings.LANGS[0]
+        return OrderedDict([
+            ('metabase', '%s.%s' % (settings.BULK_FILES['base'],
+                                    settings.zipped_ext('base', settings.BULK_EXTS['base'][0]))),
+            ('toc', '%s_%s.%s' % (settings.BULK_FILES['toc'], lang,
+                                  settings.zipped_ext('toc', settings.BULK_EXTS['toc'][0])))])
+
+    def source_dates(self, source=None, bulk=None, lang=None):
+        """Retrieve the dates of the source files of a snapshot.
+
+            >>> dates = S.source_dates(source=None, bulk=None, lang=None)
+
+        Keyword Arguments
+        -----------------
+        source : str
+            local directory storing the source files, e.g. a mirror of the bulk
+            repository (see :class:`mirror.Mirror`), whose manifest provides the
+            dates; when no manifest is found, the modification times of the files
+            are used.
+        bulk : :class:`collection.Bulk`
+            instance used to retrieve the dates (:literal:`Last-Modified` headers)
+            from the bulk repository, when :data:`source` is :data:`None`.
+        lang : str
+            language of the table of contents; default: the first of :data:`settings.LANGS`.
+
+        Returns
+        -------
+        dates : dict
+            dates of the :literal:`'metabase'` and :literal:`'toc'` files; a date
+            is :data:`None` when it cannot be retrieved.
+        """
+        files = self.source_files(lang)
+        dates = {}
+        if source is not None:
+            from .sync import Manifest
+            manifest = os.path.join(source, settings.BULK_MIRROR)
+            manifest = Manifest(manifest) if os.path.exists(manifest) else None
+            for (part, filename) in files.items():
+                entry = None if manifest is None else                   \
+                    manifest.get('base' if part == 'metabase' else 'toc', filename)
+                if entry is not None:
+                    dates[part] = entry.get('date')
+                elif os.path.exists(os.path.join(source, filename)):
+                    dates[part] = str(os.path.getmtime(os.path.join(source, filename)))
+                else:
+                    dates[part] = None
+        elif bulk is not None:
+            for (part, filename) in files.items():
+                try:
+                    response = bulk.session.session.head(bulk.build_url(file=filename), allow_redirects=True)
+                    response.raise_for_status()
+                    dates[part] = response.headers.get('Last-Modified')
+                except:
+                    dates[part] = None
+        else:
+            raise pyroError('one of the parameters SOURCE or BULK needs to be set')
+        return dates
+
+    def is_valid(self, dates=None):
+        """Check whether the snapshot exists and was built from the sources with
+        the given dates; dates which are :data:`None` (unknown) are not compared.
+        """
+        info = self.info
+        if info is None or info.get('version') != self.VERSION:
+            return False
+        elif dates is None:
+            return True
+        sources = info.get('sources') or {}
+        return all([sources.get(k) == d for (k, d) in dates.items() if d is not None])
+
+    #/************************************************************************/
+    def save(self, compact, toc, dates=None):
+        """Write a snapshot, replacing any former one.
+
+            >>> S.save(compact, toc, dates=None)
+
+        Arguments
+        ---------
+        compact : :class:`metabase.CompactMetabase`
+            the metabase.
+        toc : :class:`toc.TocTable`
+            the table of contents; may be :data:`None`.
+
+        Keyword Arguments
+        -----------------
+        dates : dict
+            dates of the source files (see :meth:`source_dates`).
+        """
+        path = self._path.rstrip(os.sep)
+        parent = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(parent):
+            os.makedirs(parent)
+        # a unique folder, so that concurrent savers do not write in each other's
+        tmp = tempfile.mkdtemp(prefix='%s.tmp' % os.path.basename(path), dir=parent)
+        old = '%s.old' % tmp
+        compact.save(os.path.join(tmp, 'metabase'))
+        MappedIndex.from_compact(compact).save(os.path.join(tmp, 'index'))
+        if toc is not None:
+            toc.save(os.path.join(tmp, 'toc'))
+        with open(os.path.join(tmp, self.INFO), 'w') as f:
+            json.dump({'version': self.VERSION, 'created': time.time(), 'toc': toc is not None,
+                       'sources': dates or {}}, f)
+        # the former snapshot is renamed aside instead of being removed before
+        # the new one is in place
+        try:
+            os.rename(path, old)
+        except OSError:
+            pass
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.exists(path):
+                if os.path.exists(old):
+                    os.rename(old, path)
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise pyroError('impossible to store snapshot in %s' % path)
+            # another snapshot was saved meanwhile: it is kept
+            shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def load(self, mmap=True):
+        """Load the snapshot; all the arrays are memory-mapped unless :data:`mmap`
+        is :data:`False`.
+
+            >>> compact, toc, index = S.load(mmap=True)
+        """
+        info = self.info
+        if info is None:
+            raise pyroError('snapshot not found in %s' % self._path)
+        elif info.get('version') != self.VERSION:
+            raise pyroError('snapshot version not supported - build it again')
+        compact = CompactMetabase.load(os.path.join(self._path, 'metabase'), mmap=mmap)
+        index = MappedIndex.load(compact, os.path.join(self._path, 'index'), mmap=mmap)
+        toc = None
+        if info.get('toc') is True:
+            toc = TocTable.load(os.path.join(self._path, 'toc'), mmap=mmap)
+        return compact, toc, index
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. sync.py
+
+Incremental synchronisation of bulk dictionaries/datasets with a local directory.
+
+**Description**
+
+The last update dates of the tables to synchronise are retrieved at once from
+either the bulk listing or the table of contents, and compared with those stored
+in a local manifest: only the tables that changed since the last run are downloaded
+(and possibly parsed) again.
+
+**Usage**
+
+    >>> from sync import Sync
+    >>> S = Sync('/data/eurostat')
+    >>> report = S.run(data=['aact_ali01', 'ilc_di01'])
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`collection`
+
+*require*:      :mod:`os`, :mod:`json`, :mod:`collections`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 10:12:31 2026
+
+__all__         = ['Manifest', 'Sync']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import warnings
+from collections import OrderedDict
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+from . import settings
+from .settings import pyroWarning, pyroError
+from . import collection
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class Manifest(object):
+    """Manifest of the bulk tables stored in a local directory, i.e. a JSON file
+    keeping track, for every table, of the date of last update as well as the
+    sizes reported in the listing and actually downloaded.
+
+        >>> M = Manifest(path)
+    """
+
+    #/************************************************************************/
+    def __init__(self, path):
+        if not isinstance(path, str):
+            raise pyroError('wrong type for PATH parameter')
+        self._path      = path
+        self._entries   = {key: {} for key in settings.BULK_DIR}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self._entries.update(json.load(f))
+            except:
+                raise pyroError('impossible to read manifest %s' % path)
+
+    #/************************************************************************/
+    @property
+    def path(self):
+        return self._path
+    @property
+    def entries(self):
+        return self._entries
+
+    #/************************************************************************/
+    def get(self, key, name):
+        """Retrieve the entry (a dictionary with :literal:`'date'`, :literal:`'size'`,
+        :literal:`'bytes'` and :literal:`'file'` keys) stored for a given table.
+        """
+        return self._entries[key].get(name)
+    def set(self, key, name, **entry):
+        self._entries[key][name] = entry
+    def remove(self, key, name):
+        self._entries[key].pop(name, None)
+    def __contains__(self, item):
+        key, name = item
+        return name in self._entries[key]
+
+    #/************************************************************************/
+    def save(self):
+        """Write the manifest on disk; the file is replaced atomically so that
+        an interrupted run does not corrupt it.
+        """
+        dirname = os.path.dirname(os.path.abspath(self._path))
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        tmp = '%s.tmp' % self._path
+        with open(tmp, 'w') as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._path)
+
+
+#%%
+class Sync(object):
+    """Incremental synchronisation of bulk tables with a local directory.
+
+        >>> S = Sync(dest, bulk=None, meta=None, source='listing')
+
+    Arguments
+    ---------
+    dest : str
+        local directory where the bulk tables are stored, using the same tree
+        structure (:literal:`data/`, :literal:`dic/{lang}/`) as the bulk repository.
+
+    Keyword Arguments
+    -----------------
+    bulk : :class:`collection.Bulk`
+        instance used to query the bulk listing and download the tables; when
+        :data:`None`, a new instance is created.
+    meta : :class:`collection.Meta`
+        instance whose table of contents is already loaded (see
+        :meth:`collection.Meta.readTocTable`); required when
+        :data:`source` is :literal:`'toc'`.
+    source : str
+        either :literal:`'listing'` or :literal:`'toc'`: where the dates of last
+        update of the tables are retrieved from; default: :literal:`'listing'`.
+    manifest : str
+        path of the manifest file; default: :data:`settings.BULK_MANIFEST` in
+        :data:`dest`.
+    """
+
+    #/************************************************************************/
+    def __init__(self, dest, **kwargs):
+        if not isinstance(dest, str):
+            raise pyroError('wrong type for DEST parameter')
+        self._dest      = dest
+        self._bulk      = kwargs.pop('bulk', None) or collection.Bulk()
+        self._meta      = kwargs.pop('meta', None)
+        self._source    = kwargs.pop('source', 'listing')
+        if self._source not in ('listing', 'toc'):
+            raise pyroError('wrong value for SOURCE parameter')
+        elif self._source == 'toc' and self._meta is None:
+            raise pyroError('META instance needed to synchronise from the table of contents')
+        self._manifest  = Manifest(kwargs.pop('manifest', None)     \
+                                   or os.path.join(dest, settings.BULK_MANIFEST))
+
+    #/************************************************************************/
+    @property
+    def dest(self):
+        return self._dest
+    @property
+    def bulk(self):
+        return self._bulk
+    @property
+    def manifest(self):
+        return self._manifest
+
+    #/************************************************************************/
+    def last_updates(self, key, names, ext=None):
+        """Retrieve, in one go, the dates of last update of a set of tables; the
+        dates of the dictionaries are always retrieved from the listing.
+
+            >>> dates = S.last_updates(key, names, ext=None)
+        """
+        if self._source == 'listing' or key == 'dic':
+            # the listing also provides the sizes of the files
+            listing = self.bulk.read_listing(key, ext=ext,
+                                             alpha=None if key == 'dic' else sorted(set([n[0].lower() for n in names])))
+            return {n: (listing[n]['date'], listing[n]['size']) if n in listing else (None, None)
+                    for n in names}
+        self._meta.wait('toc')
+        toc = self._meta.toctable
+        if toc is None:
+            raise pyroError('table of contents not found - load the file from Eurobase')
+        return {n: (toc.last_update(n), None) if n in toc else (None, None) for n in names}
+
+    #/************************************************************************/
+    def changes(self, **kwargs):
+        """Determine which tables changed since the last synchronisation.
+
+            >>> changed, unchanged, dates = S.changes(data=names, ext=None)
+
+        Keyword Arguments
+        -----------------
+        dic, data : str, list
+            name(s) of the dictionaries or datasets to check; only one of them
+            can be passed.
+        ext : str
+            format of the tables (see :data:`settings.BULK_EXTS`).
+
+        Returns
+        -------
+        changed, unchanged : list
+            names of the tables which need to be (or not) downloaded again.
+        dates : dict
+            dates of last update and sizes of the tables as reported by the source;
+            tables not found in the source are reported with a :data:`None` date.
+        """
+        key, names, ext, lext = self.__parse_kwargs(**kwargs)
+        dates = self.last_updates(key, names, ext=lext)
+        changed, unchanged = [], []
+        for name in names:
+            date, _ = dates[name]
+            entry = self.manifest.get(key, name)
+            # the file stored must also be the one requested (same format/language)
+            filename = self.bulk.build_file(key, name, ext=ext)
+            if date is not None and entry is not None and entry.get('date') == date   \
+                    and entry.get('file') == filename                                  \
+                    and os.path.exists(os.path.join(self.dest, filename)):
+                unchanged.append(name)
+            elif date is not None:
+                changed.append(name)
+        return changed, unchanged, dates
+
+    #/************************************************************************/
+    def run(self, **kwargs):
+        """Download, and possibly parse, the tables that changed since the last
+        synchronisation.
+
+            >>> report = S.run(data=names, ext=None, parser=None)
+
+        Keyword Arguments
+        -----------------
+        dic, data, ext :
+            see :meth:`changes`.
+        parser : callable
+            function :data:`parser(content, name)` applied to the (raw) content
+            of every table actually downloaded; its outputs are returned in the
+            :literal:`'parsed'` field of the report.
+
+        Returns
+        -------
+        report : :class:`collections.OrderedDict`
+            report of the run, with fields: :literal:`'checked'`, :literal:`'updated'`,
+            :literal:`'unchanged'`, :literal:`'missing'` and :literal:`'failed'`
+            (number of tables), :literal:`'bytes_downloaded'`, :literal:`'bytes_saved'`
+            (bytes that were not downloaded again, as recorded in the manifest),
+            and :literal:`'parsed'` (outputs of :data:`parser`).
+        """
+        parser = kwargs.pop('parser', None)
+        if not (parser is None or callable(parser)):
+            raise pyroError('wrong type for PARSER parameter')
+        key, names, ext, _ = self.__parse_kwargs(**kwargs)
+        changed, unchanged, dates = self.changes(**kwargs)
+        report = OrderedDict([('checked', len(names)), ('updated', 0),
+                              ('unchanged', len(unchanged)),
+                              ('missing', len(names) - len(changed) - len(unchanged)),
+                              ('failed', 0), ('bytes_downloaded', 0), ('bytes_saved', 0),
+                              ('parsed', OrderedDict())])
+        for name in unchanged:
+            entry = self.manifest.get(key, name)
+            report['bytes_saved'] += entry.get('bytes') or entry.get('size') or 0
+        for name in changed:
+            filename = self.bulk.build_file(key, name, ext=ext)
+            try:
+                content = self.bulk.session.get_response(self.bulk.build_url(file=filename)).content
+                self.__write(filename, content)
+            except:
+                warnings.warn(pyroWarning('impossible to download bulk table %s' % name))
+                report['failed'] += 1
+                continue
+            date, size = dates[name]
+            self.manifest.set(key, name, date=date, size=size, bytes=len(content), file=filename)
+            report['updated'] += 1
+            report['bytes_downloaded'] += len(content)
+            if parser is not None:
+                report['parsed'][name] = parser(content, name)
+        self.manifest.save()
+        return report
+
+    #/************************************************************************/
+    @staticmethod
+    def __parse_kwargs(**kwargs):
+        dimension, dataset = [kwargs.get(key) for key in ('dic','data')]
+        if dataset is None and dimension is None:
+            raise pyroError('one of the parameters DIC or DATA needs to be set')
+        elif not(dataset is None or dimension is None):
+            raise pyroError('parameters DIC or DATA are incompatible')
+        key = 'dic' if dimension is not None else 'data'
+        names = dimension or dataset
+        if isinstance(names, str):
+            names = [names]
+        ext = kwargs.get('ext') or settings.BULK_EXTS[key][0]
+        if not ext in settings.BULK_EXTS[key]:
+            raise pyroError('bulk %s extension EXT not recognised' % key)
+        # the listing reports the names of the compressed files
+        return key, list(names), ext, settings.zipped_ext(key, ext)
+
+    def __write(self, filename, content):
+        pathname = os.path.join(self.dest, filename)
+        dirname = os.path.dirname(pathname)
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        tmp = '%s.part' % pathname
+        with open(tmp, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, pathname)
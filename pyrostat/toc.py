@@ -0,0 +1,493 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. toc.py
+
+Compact tables of contents of the bulk download service.
+
+**Description**
+
+The table of contents (:literal:`table_of_contents_{lang}.txt`) lists all the
+themes, folders, datasets and tables of Eurostat database with their title, type,
+dates of last update and of last structure change, and first and last periods.
+A :class:`TocTable` indexes the entries by code and stores every field in a
+:class:`StringColumn`, i.e. a single UTF-8 buffer and an array of offsets: the
+columns can be saved and memory-mapped, and only the entries actually looked up
+are decoded. The tables of contents in several languages share the same codes:
+they can be merged into a single :class:`TocTable` storing one column of titles
+per language.
+
+A :class:`TocTree` keeps the hierarchy of themes and folders of the XML table of
+contents (:literal:`table_of_contents.xml`), read with an event-driven parser:
+nodes are numbered in depth-first order, so that the subtree of a node is the
+range of nodes between the node and its :data:`end` pointer, and every node
+keeps a pointer to its parent.
+
+**Usage**
+
+    >>> from toc import TocTable
+    >>> T = TocTable.parse('table_of_contents_en.txt')
+    >>> T.title('aact_ali01')
+    'Agricultural labour input statistics: absolute figures (1 000 annual work units)'
+    >>> T.period('aact_ali01')
+    ['1973', '2019']
+    >>> T = TocTable.parse_many({'en': 'table_of_contents_en.txt', 'fr': 'table_of_contents_fr.txt'})
+    >>> T.title('aact_ali01', lang='fr')
+    "Statistiques de l'apport de main-d'œuvre agricole: chiffres absolus (1 000 unités de travail annuel)"
+    >>> tree = TocTree.parse('table_of_contents.xml')
+    >>> tree.path('aact_ali01')
+    ['data', 'agr', 'aact', 'aact_ali']
+    >>> datasets = tree.subtree('agr', type='dataset')
+
+**Dependencies**
+
+*call*:         :mod:`settings`, :mod:`reader`
+
+*require*:      :mod:`os`, :mod:`io`, :mod:`csv`, :mod:`collections`, :mod:`numpy`
+
+*optional*:     :mod:`lxml`, :mod:`pandas`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Sun Oct 18 17:12:05 2026
+
+__all__         = ['StringColumn', 'TocTable', 'TocTree']
+
+#%%
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import io
+import csv
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+try:
+    import pandas as pd
+except ImportError:
+    PANDAS_INSTALLED = False
+else:
+    PANDAS_INSTALLED = True
+
+from . import settings
+from .settings import pyroError
+from .reader import _open, _localname
+
+#==============================================================================
+# CLASSES/METHODS
+#==============================================================================
+
+class StringColumn(object):
+    """Column of strings stored as a single UTF-8 buffer and the offsets of the
+    strings in the buffer.
+
+        >>> column = StringColumn(buffer, offsets)
+        >>> column = StringColumn.from_list(strings)
+    """
+
+    #/************************************************************************/
+    def __init__(self, buffer, offsets):
+        self.buffer     = buffer
+        self.offsets    = offsets
+
+    @classmethod
+    def from_list(cls, strings):
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.offsets) - 1
+    def __getitem__(self, i):
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.buffer[start:end].tobytes().decode('utf-8')
+    def tolist(self):
+        content, offsets = self.buffer.tobytes(), self.offsets.tolist()
+        return [content[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(self))]
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + self.offsets.nbytes
+
+    #/************************************************************************/
+    def save(self, path, name):
+        np.save(os.path.join(path, '%s.buf.npy' % name), np.asarray(self.buffer))
+        np.save(os.path.join(path, '%s.off.npy' % name), np.asarray(self.offsets))
+    @classmethod
+    def load(cls, path, name, mmap=True):
+        mode = 'r' if mmap else None
+        return cls(np.load(os.path.join(path, '%s.buf.npy' % name), mmap_mode=mode),
+                   np.load(os.path.join(path, '%s.off.npy' % name), mmap_mode=mode))
+
+
+#%%
+class TocTable(object):
+    """Table of contents indexed by code.
+
+        >>> T = TocTable(columns, titles=None)
+
+    Arguments
+    ---------
+    columns : dict
+        columns of the table of contents, with keys as in :data:`settings.BULK_NAMES['toc']`
+        (e.g., :literal:`'code'`, :literal:`'title'`, :literal:`'last_update'`),
+        given as lists of strings or :class:`StringColumn`.
+
+    Keyword Arguments
+    -----------------
+    titles : dict
+        columns of the titles in different languages, whose keys are the languages;
+        the :literal:`'title'` column is the title in the first language.
+
+    Note
+    ----
+    Entries (e.g., datasets classified under several themes) may appear several
+    times in the table of contents: the first occurrence is used for lookups.
+    """
+
+    FIELDS  = tuple(settings.BULK_NAMES['toc'].keys())
+    INDEX   = 'code'
+
+    #/************************************************************************/
+    def __init__(self, columns, titles=None):
+        if set(columns.keys()) != set(self.FIELDS):
+            raise pyroError('wrong value for COLUMNS parameter')
+        column = lambda c: c if isinstance(c, StringColumn) else StringColumn.from_list(c)
+        self.columns    = OrderedDict([(k, column(columns[k])) for k in self.FIELDS])
+        self.titles     = OrderedDict([(l, column(c)) for (l, c) in (titles or {}).items()])
+        if len(set([len(c) for c in list(self.columns.values()) + list(self.titles.values())])) > 1:
+            raise pyroError('columns of different lengths')
+        codes           = self.columns[self.INDEX].tolist()
+        self._rows      = {}
+        for (i, code) in enumerate(codes):
+            self._rows.setdefault(code, i)
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.columns[self.INDEX])
+    def __contains__(self, code):
+        return code in self._rows
+    def __iter__(self):
+        return iter(self._rows)
+    def __repr__(self):
+        return "<{} instance at {}: {} entries>".format(self.__class__.__name__, id(self), len(self._rows))
+    @property
+    def codes(self):
+        return list(self._rows.keys())
+    @property
+    def langs(self):
+        return list(self.titles.keys())
+
+    #/************************************************************************/
+    def row(self, code):
+        try:
+            return self._rows[code]
+        except KeyError:
+            raise pyroError('member not found in codelist of table of contents')
+    def field(self, code, field):
+        """Retrieve one field of the entry of a given code.
+        """
+        if field not in self.columns:
+            raise pyroError('field %s not recognised' % field)
+        return self.columns[field][self.row(code)]
+    def get(self, code):
+        """Retrieve all the fields of the entry of a given code.
+        """
+        i = self.row(code)
+        return OrderedDict([(k, c[i]) for (k, c) in self.columns.items()])
+    def title(self, code, lang=None):
+        """Retrieve the title of the entry of a given code in a given language;
+        default: the first language of the table.
+        """
+        if lang is None or self.titles == {}:
+            return self.field(code, 'title')
+        elif lang not in self.titles:
+            raise pyroError('language LANG not recognised')
+        return self.titles[lang][self.row(code)]
+    def period(self, code):
+        i = self.row(code)
+        return [self.columns['start'][i], self.columns['end'][i]]
+    def last_update(self, code):
+        return self.field(code, 'last_update')
+
+    #/************************************************************************/
+    @classmethod
+    def parse(cls, source, lang=None):
+        """Parse the (tab-separated) table of contents, given as a path, bytes or
+        a file object, possibly in a given language.
+
+            >>> T = TocTable.parse(source, lang=None)
+        """
+        stream = _open(source)
+        try:
+            rows = csv.reader(io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline=''),
+                              delimiter='\t')
+            try:
+                header = [h.strip() for h in next(rows)]
+                names = settings.BULK_NAMES['toc']
+                pos = [header.index(names[k]) for k in cls.FIELDS]
+            except:
+                raise pyroError('table of contents not recognised')
+            columns = OrderedDict([(k, []) for k in cls.FIELDS])
+            lists = list(columns.values())
+            for row in rows:
+                if len(row) < len(header):
+                    continue
+                for (l, p) in zip(lists, pos):
+                    l.append(row[p].strip())
+        finally:
+            stream.close()
+        return cls(columns, titles=None if lang is None else {lang: columns['title']})
+
+    @classmethod
+    def parse_many(cls, sources):
+        """Parse the tables of contents in several languages and merge them.
+
+            >>> T = TocTable.parse_many(sources)
+
+        Arguments
+        ---------
+        sources : dict
+            sources of the tables of contents (see :meth:`parse`), whose keys are
+            the languages.
+        """
+        return cls.merge(OrderedDict([(l, cls.parse(s, lang=l)) for (l, s) in sources.items()]))
+
+    @classmethod
+    def merge(cls, tables):
+        """Merge tables of contents in different languages into one: the entries
+        of the first table are kept, the entries found only in the other tables
+        are appended, and the titles are aligned on the codes.
+
+            >>> T = TocTable.merge(tables)
+
+        Arguments
+        ---------
+        tables : dict
+            tables of contents (:class:`TocTable`), whose keys are the languages.
+        """
+        if tables in (None, {}):
+            raise pyroError('no table of contents to merge')
+        tables = list(tables.items())
+        columns = OrderedDict([(k, c.tolist()) for (k, c) in tables[0][1].columns.items()])
+        codes = columns[cls.INDEX]
+        known = set(codes)
+        for (_, table) in tables[1:]:
+            # entries missing from the first table
+            rows = [i for (code, i) in table._rows.items() if code not in known]
+            for (k, c) in table.columns.items():
+                columns[k].extend([c[i] for i in rows])
+            known.update([table.columns[cls.INDEX][i] for i in rows])
+        titles = OrderedDict()
+        for (lang, table) in tables:
+            title, positions = table.columns['title'].tolist(), table._rows
+            titles[lang] = [title[positions[code]] if code in positions else '' for code in codes]
+        return cls(columns, titles=titles)
+
+    #/************************************************************************/
+    def save(self, path):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        for (k, c) in self.columns.items():
+            c.save(path, k)
+        for (l, c) in self.titles.items():
+            c.save(path, 'title_%s' % l)
+    @classmethod
+    def load(cls, path, mmap=True):
+        try:
+            langs = [l for l in settings.LANGS
+                     if os.path.exists(os.path.join(path, 'title_%s.off.npy' % l))]
+            return cls(OrderedDict([(k, StringColumn.load(path, k, mmap=mmap)) for k in cls.FIELDS]),
+                       titles=OrderedDict([(l, StringColumn.load(path, 'title_%s' % l, mmap=mmap))
+                                           for l in langs]))
+        except IOError:
+            raise pyroError('impossible to load table of contents from %s' % path)
+
+
+#%%
+class TocTree(object):
+    """Hierarchical table of contents.
+
+        >>> tree = TocTree.parse(source)
+
+    Nodes are identified by their position in depth-first order; for every node
+    :data:`i`, the arrays :data:`parent`, :data:`end` and :data:`depth` store the
+    position of its parent (:data:`-1` for the roots), the position following its
+    last descendant, and its depth. The fields of the nodes (see :data:`settings.BULK_NAMES['toc']`)
+    are stored in :data:`fields`, and their titles in :data:`titles`, per language.
+
+    Note
+    ----
+    Folders are reported with type :literal:`'folder'`; a dataset classified
+    under several themes appears as several nodes, all found by :meth:`find`.
+    """
+
+    # tags of the XML table of contents and corresponding fields
+    NODES   = ('branch', 'leaf')
+    TAGS    = {'code': 'code', 'lastUpdate': 'last_update', 'lastModified': 'last_change',
+               'dataStart': 'start', 'dataEnd': 'end'}
+    FOLDER  = 'folder'
+
+    #/************************************************************************/
+    def __init__(self, fields, titles, parent, end):
+        self.fields     = fields
+        self.titles     = titles
+        self.parent     = np.asarray(parent, dtype=np.int32)
+        self.end        = np.asarray(end, dtype=np.int32)
+        depth = np.zeros(len(self.parent), dtype=np.int16)
+        for i in range(len(self.parent)):
+            # parents precede their children in depth-first order
+            if self.parent[i] >= 0:
+                depth[i] = depth[self.parent[i]] + 1
+        self.depth      = depth
+        self._nodes     = {}
+        for (i, code) in enumerate(fields['code']):
+            self._nodes.setdefault(code, []).append(i)
+
+    #/************************************************************************/
+    def __len__(self):
+        return len(self.parent)
+    def __contains__(self, code):
+        return code in self._nodes
+    def __repr__(self):
+        return "<{} instance at {}: {} nodes, {} codes>".format(self.__class__.__name__, id(self),
+                len(self), len(self._nodes))
+    @property
+    def roots(self):
+        return np.flatnonzero(self.parent < 0).tolist()
+
+    #/************************************************************************/
+    def find(self, code):
+        """Positions of all the nodes of a given code.
+        """
+        try:
+            return self._nodes[code]
+        except KeyError:
+            raise pyroError('member not found in codelist of table of contents')
+    def node(self, code):
+        if isinstance(code, (int, np.integer)):
+            return int(code)
+        return self.find(code)[0]
+
+    def get(self, code, lang=None):
+        """Retrieve the fields and title of a node, given by its code or position.
+        """
+        i = self.node(code)
+        entry = OrderedDict([(k, f[i]) for (k, f) in self.fields.items()])
+        entry['title'] = self.title(i, lang=lang)
+        return entry
+    def title(self, code, lang=None):
+        lang = lang or settings.LANGS[0]
+        if lang not in self.titles:
+            raise pyroError('language LANG not recognised')
+        return self.titles[lang][self.node(code)]
+
+    #/************************************************************************/
+    def parent_of(self, code):
+        """Code of the parent of a node; :data:`None` for the roots.
+        """
+        p = int(self.parent[self.node(code)])
+        return None if p < 0 else self.fields['code'][p]
+    def path(self, code):
+        """Codes of the ancestors of a node, from the root.
+        """
+        path, p = [], int(self.parent[self.node(code)])
+        while p >= 0:
+            path.append(self.fields['code'][p])
+            p = int(self.parent[p])
+        return path[::-1]
+    def children(self, code):
+        """Codes of the direct children of a node.
+        """
+        i = self.node(code)
+        children, j = [], i + 1
+        while j < self.end[i]:
+            children.append(self.fields['code'][j])
+            j = int(self.end[j])
+        return children
+    def subtree(self, code, type=None):
+        """Codes of all the descendants of a node, in depth-first order, possibly
+        restricted to the nodes of a given type (e.g., :literal:`'dataset'`).
+
+            >>> codes = tree.subtree(code, type=None)
+        """
+        i = self.node(code)
+        nodes = range(i + 1, int(self.end[i]))
+        codes, types = self.fields['code'], self.fields['type']
+        if type is None:
+            return [codes[j] for j in nodes]
+        return [codes[j] for j in nodes if types[j] == type]
+
+    #/************************************************************************/
+    @classmethod
+    def parse(cls, source):
+        """Parse the XML table of contents, given as a path, bytes or a file
+        object; elements are discarded as soon as they are read.
+
+            >>> tree = TocTree.parse(source)
+        """
+        fields = OrderedDict([(k, []) for k in settings.BULK_NAMES['toc'] if k != 'title'])
+        titles = OrderedDict()
+        parent, end, stack = [], [], []
+        stream = _open(source)
+        try:
+            for (event, elem) in etree.iterparse(stream, events=('start', 'end')):
+                tag = _localname(elem.tag)
+                if event == 'start':
+                    if tag in cls.NODES:
+                        i = len(parent)
+                        parent.append(stack[-1] if stack != [] else -1)
+                        end.append(i + 1)
+                        for f in fields.values():
+                            f.append('')
+                        for t in titles.values():
+                            t.append('')
+                        fields['type'][i] = (elem.get('type') or cls.FOLDER) if tag == 'leaf' else cls.FOLDER
+                        stack.append(i)
+                    continue
+                if tag in cls.NODES:
+                    i = stack.pop()
+                    end[i] = len(parent)
+                    elem.clear()
+                elif stack == []:
+                    continue
+                elif tag == 'title':
+                    lang = elem.get('language') or settings.LANGS[0]
+                    if lang not in titles:
+                        titles[lang] = [''] * len(parent)
+                    titles[lang][stack[-1]] = (elem.text or '').strip()
+                elif tag in cls.TAGS:
+                    fields[cls.TAGS[tag]][stack[-1]] = (elem.text or '').strip()
+                else:
+                    continue
+                elem.clear()
+        except etree.ParseError as e:
+            raise pyroError('wrong XML table of contents: %s' % e)
+        finally:
+            stream.close()
+        return cls(fields, titles, parent, end)
+
+    #/************************************************************************/
+    def to_frame(self, lang=None):
+        """Flatten the tree into a :class:`pandas.DataFrame` with the columns of
+        the (text) table of contents in a given language.
+        """
+        if PANDAS_INSTALLED is False:
+            raise pyroError('pandas package required')
+        names = settings.BULK_NAMES['toc']
+        lang = lang or settings.LANGS[0]
+        columns = OrderedDict([(names[k], self.titles.get(lang, [''] * len(self)) if k == 'title'
+                                          else self.fields[k]) for k in names])
+        return pd.DataFrame(columns)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 12:31:08 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import json
+import unittest
+
+from pyrostat import api, settings
+from pyrostat.settings import pyroError
+from .base import runtest as baseRuntest
+from .jsonstat import RESPONSE
+from .query import LocalSession
+
+URL = 'http://ec.europa.eu/eurostat/wdds/rest/data/v2.1/json/en/nama_10_gdp?precision=1&geo=AT'
+
+#/****************************************************************************/
+# ApiTestCase
+#/****************************************************************************/
+class ApiTestCase(unittest.TestCase):
+    """Class of tests for `api.py`
+    """
+    module = 'api'
+
+    #/************************************************************************/
+    def test1_defaults(self):
+        E = api.Eurostat(session=LocalSession(json.dumps(RESPONSE).encode('utf-8')))
+        self.assertEqual(E.fmt, settings.DEF_FMT)
+        self.assertIsNone(E.url)
+        self.assertRaises(pyroError, E.fetch)
+        E.url = URL
+        status, resp = E.fetch()
+        self.assertEqual(E.session.urls, [URL])
+        self.assertEqual(status, 200)
+        self.assertEqual(E.status, 200)
+        self.assertEqual(resp, RESPONSE)
+
+    #/************************************************************************/
+    def test2_json(self):
+        E = api.Eurostat(session=LocalSession(json.dumps(RESPONSE).encode('utf-8')))
+        status, resp = E.fetch(url=URL, fmt='json')
+        self.assertEqual(status, 200)
+        self.assertEqual(resp['id'], ['unit', 'geo', 'time'])
+        self.assertEqual(resp['value']['5'], 7)
+
+    #/************************************************************************/
+    def test3_error(self):
+        envelope = {"error": {"status": "416", "label": "Too many categories have been requested. Maximum is 50."}}
+        E = api.Eurostat(session=LocalSession(json.dumps(envelope).encode('utf-8'), status_code=416), url=URL)
+        with self.assertRaises(pyroError) as cm:
+            E.fetch()
+        self.assertIn('error 416: Too many categories have been requested', str(cm.exception))
+        self.assertEqual(E.status, 416)
+        # the envelope of a response whose status is OK is raised too
+        envelope = {"error": {"status": "400", "label": "Dataset contains no data."}}
+        E = api.Eurostat(session=LocalSession(json.dumps(envelope).encode('utf-8')), url=URL)
+        self.assertRaises(pyroError, E.fetch)
+
+    #/************************************************************************/
+    def test4_raw(self):
+        content = b'<message:GenericData>...</message:GenericData>'
+        E = api.Eurostat(session=LocalSession(content), url=URL, fmt='sdmx')
+        status, resp = E.fetch()
+        self.assertEqual(status, 200)
+        self.assertIs(resp, content)
+        # the raw content is returned for any format but JSON
+        status, resp = api.Eurostat(session=LocalSession(content), url=URL).fetch(fmt='unicode')
+        self.assertEqual(resp, content)
+        E = api.Eurostat(session=LocalSession(content, status_code=404), url=URL, fmt='sdmx')
+        with self.assertRaises(pyroError) as cm:
+            E.fetch()
+        self.assertIn('error 404', str(cm.exception))
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(ApiTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
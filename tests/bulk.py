@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 12:04:26 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import warnings
+import unittest
+
+from pyrostat import collection
+from .base import runtest as baseRuntest
+
+PAGES = {'a': [('aact_ali01.tsv.gz', '12 KB', 'file', '17/10/2026 23:00:00'),
+               ('aact_ali01.sdmx.zip', '40 KB', 'file', '17/10/2026 23:00:00'),
+               ('aact_ali02.tsv.gz', '1 MB', 'file', '16/10/2026 23:00:00')],
+         'i': [('ilc_di01.tsv.gz', '300', 'file', '18/10/2026 11:00:00')],
+         'dic': [('geo.dic', '2 KB', 'file', '18/10/2026 11:00:00'),
+                 ('unit.dic', '1 KB', 'file', '18/10/2026 11:00:00')]}
+
+class LocalSession(object):
+
+    def __init__(self, pages):
+        self.pages, self.urls = pages, []
+
+    def read_listing_table(self, url):
+        self.urls.append(url)
+        params = dict([p.split('=') for p in url.split('?')[1].split('&')])
+        page = params.get('start', params['dir'])
+        if page not in self.pages:
+            raise IOError('page %s not found' % page)
+        return list(self.pages[page])
+
+    def read_html_table(self, url, **kwargs):
+        raise IOError('page not found')
+
+class LocalBulk(collection.Bulk):
+
+    def __init__(self, pages, **kwargs):
+        super(LocalBulk, self).__init__(**kwargs)
+        self._session = LocalSession(pages)
+
+    def build_url(self, **kwargs):
+        return 'http://bulk/listing?%s' % '&'.join(['%s=%s' % (k, kwargs[k]) for k in sorted(kwargs)])
+
+#/****************************************************************************/
+# BulkTestCase
+#/****************************************************************************/
+class BulkTestCase(unittest.TestCase):
+    """Class of tests for the class `Bulk` of `collection.py`
+    """
+    module = 'collection'
+
+    #/************************************************************************/
+    def test1_crawl(self):
+        B = LocalBulk(PAGES)
+        self.assertEqual(list(B.datasets), [])
+        listing = B.crawl('data', alpha=['a', 'i'])
+        self.assertEqual(len(B.session.urls), 2)
+        self.assertEqual(sorted(listing.pages), ['a', 'i'])
+        self.assertEqual(sorted(B.datasets), ['aact_ali01', 'aact_ali02', 'ilc_di01'])
+        # membership is checked on the pages already loaded...
+        self.assertTrue(B.check_dataset('ilc_di01'))
+        self.assertFalse(B.check_dataset('aact_xxx'))
+        self.assertEqual(len(B.session.urls), 2)
+        # ... and only the page where the dataset is expected is loaded
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.assertFalse(B.check_dataset('nama_10_gdp'))
+        self.assertEqual(len(B.session.urls), 3)
+        self.assertNotIn('n', B.crawl('data', alpha=[]).pages)
+        self.assertEqual(list(B.dictionaries), [])
+        self.assertTrue(B.check_dimension('geo'))
+        self.assertEqual(list(B.dictionaries), ['geo', 'unit'])
+        # datasets set explicitly follow those of the listing
+        B.datasets = ['xxx', 'ilc_di01']
+        self.assertEqual(sorted(B.datasets[:-1]), ['aact_ali01', 'aact_ali02', 'ilc_di01'])
+        self.assertEqual(B.datasets[-1], 'xxx')
+
+    #/************************************************************************/
+    def test2_expire(self):
+        B = LocalBulk(PAGES, expire=None)
+        B.crawl('data', alpha='a')
+        B.crawl('data', alpha='a')
+        self.assertEqual(len(B.session.urls), 1)
+        B.crawl('data', alpha='a', force=True)
+        self.assertEqual(len(B.session.urls), 2)
+        B.expire = 0
+        B.crawl('data', alpha='a')
+        self.assertEqual(len(B.session.urls), 3)
+        # pages which cannot be loaded are reported, and tried again
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            B.crawl('data', alpha='z')
+            B.crawl('data', alpha='z')
+        self.assertEqual(len(w), 2)
+        self.assertEqual(len(B.session.urls), 5)
+        self.assertRaises(Exception, setattr, B, 'expire', -1)
+
+    #/************************************************************************/
+    def test3_read_listing(self):
+        B = LocalBulk(PAGES)
+        listing = B.read_listing('data', alpha=['a', 'i'])
+        self.assertEqual(list(listing.keys()), ['aact_ali01', 'aact_ali02', 'ilc_di01'])
+        self.assertEqual(listing['aact_ali01'], {'name': 'aact_ali01.tsv.gz', 'size': 12 * 1024, 'type': 'file',
+                                                 'date': '17/10/2026 23:00:00'})
+        self.assertEqual(listing['aact_ali02']['size'], 2**20)
+        self.assertEqual(listing['ilc_di01']['size'], 300)
+        listing = B.read_listing('data', alpha='a', ext='sdmx.zip')
+        self.assertEqual(list(listing.keys()), ['aact_ali01'])
+        self.assertEqual(listing['aact_ali01']['size'], 40 * 1024)
+        self.assertEqual(len(B.session.urls), 2)
+        self.assertEqual(list(B.read_listing('dic').keys()), ['geo', 'unit'])
+        self.assertEqual(B.last_updates(data=['ilc_di01', 'xxx']), {'ilc_di01': '18/10/2026 11:00:00', 'xxx': None})
+        self.assertEqual(B.last_update(dic='unit'), '18/10/2026 11:00:00')
+        self.assertRaises(Exception, B.read_listing, 'xxx')
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(BulkTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 13:48:05 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from pyrostat import cube, reader
+from pyrostat.settings import pyroError
+from .base import runtest as baseRuntest
+from .reader import TSV
+
+#/****************************************************************************/
+# CubeTestCase
+#/****************************************************************************/
+class CubeTestCase(unittest.TestCase):
+    """Class of tests for `cube.py`
+    """
+    module = 'cube'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cube = cube.Cube(['geo', 'time'], {'geo': ['AT', 'BE', 'FR'], 'time': ['2018', '2019']},
+                              np.arange(6, dtype=np.float64).reshape(3, 2),
+                              flags=np.array([[0, 1], [0, 0], [2, 0]], dtype=np.int16),
+                              flagcodes=['', 'p', 'e'])
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    #/************************************************************************/
+    def test1_loc(self):
+        C = self.cube
+        sub = C.loc(geo=['BE', 'FR'])
+        self.assertEqual(sub.dims, ['geo', 'time'])
+        self.assertEqual(sub.values.tolist(), [[2., 3.], [4., 5.]])
+        # contiguous selections are views
+        self.assertTrue(np.shares_memory(sub.values, C.values))
+        sub = C.loc(geo=['FR', 'AT'], time='2019')
+        self.assertEqual(sub.dims, ['geo'])
+        self.assertEqual(sub.codes['geo'], ['FR', 'AT'])
+        self.assertEqual(sub.values.tolist(), [5., 1.])
+        self.assertEqual(sub.flags.tolist(), [0, 1])
+        self.assertEqual(C.loc(geo='FR', time='2018'), 4.)
+        self.assertEqual(C.get(geo='AT', time='2019'), 1.)
+        self.assertRaises(pyroError, C.get, geo='AT')
+        self.assertRaises(pyroError, C.loc, geo=['XX'])
+        self.assertRaises(pyroError, C.loc, unit='EUR')
+
+    #/************************************************************************/
+    def test2_from_columns(self):
+        C = cube.Cube.from_columns(reader.read_tsv(TSV.encode('utf-8')))
+        self.assertEqual(C.dims, ['unit', 'geo', 'time'])
+        self.assertEqual(C.shape, (1, 2, 2))
+        self.assertEqual(C.get(unit='EUR', geo='AT', time='2019'), 1.2)
+        self.assertEqual(C.get(unit='EUR', geo='BE', time='2018Q1'), 4.5)
+        self.assertTrue(np.isnan(C.get(unit='EUR', geo='AT', time='2018Q1')))
+        flags = np.asarray(C.flagcodes, dtype=object)[C.flags]
+        self.assertEqual(flags[0, C.index('geo')['AT'], C.index('time')['2019']], 'p')
+        self.assertEqual(flags[0, C.index('geo')['BE'], C.index('time')['2019']], 'c')
+
+    #/************************************************************************/
+    def test3_store(self):
+        store = cube.CubeStore(os.path.join(self.dir, 'cubes'))
+        self.assertEqual(store.names, [])
+        store.save('gdp', self.cube)
+        self.assertEqual(store.names, ['gdp'])
+        C = store.open('gdp')
+        self.assertIsInstance(C.values, np.memmap)
+        self.assertEqual(C.dims, self.cube.dims)
+        self.assertEqual(C.codes, self.cube.codes)
+        self.assertEqual(C.values.tolist(), self.cube.values.tolist())
+        self.assertEqual(C.flags.tolist(), self.cube.flags.tolist())
+        self.assertEqual(C.flagcodes, self.cube.flagcodes)
+        self.assertIs(store.open('gdp'), C)
+        # a new version replaces the former one, leaving no temporary folder
+        store.save('gdp', self.cube.loc(time=['2019']))
+        self.assertEqual(sorted(os.listdir(store.root)), ['gdp'])
+        self.assertEqual(store.open('gdp').shape, (3, 1))
+        store.remove('gdp')
+        self.assertNotIn('gdp', store)
+        self.assertRaises(pyroError, store.open, 'gdp')
+
+    #/************************************************************************/
+    def test4_modes(self):
+        store = cube.CubeStore(self.dir)
+        store.save('gdp', self.cube)
+        self.assertRaises(pyroError, store.open, 'gdp', mode='w')
+        # copy-on-write: changes are not written to disk
+        C = store.open('gdp', mode='c')
+        C.values[0, 0] = 100.
+        self.assertEqual(cube.CubeStore(self.dir).open('gdp').values[0, 0], 0.)
+        # read and write: changes are written to disk
+        C = store.open('gdp', mode='r+')
+        C.values[0, 0] = 100.
+        C.values.flush()
+        self.assertEqual(cube.CubeStore(self.dir).open('gdp').values[0, 0], 100.)
+        # read-only
+        C = store.open('gdp', mode='r')
+        self.assertRaises(ValueError, C.values.__setitem__, (0, 0), 0.)
+
+    #/************************************************************************/
+    def test5_atomic(self):
+        store = cube.CubeStore(self.dir)
+        store.save('gdp', self.cube)
+        rename = os.rename
+        def failing(src, dst):
+            if src.endswith(store.TMP):
+                raise OSError('rename failed')
+            rename(src, dst)
+        # when the new version cannot be moved in place, the former one is kept
+        with mock.patch.object(cube.os, 'rename', side_effect=failing):
+            self.assertRaises(pyroError, store.save, 'gdp', self.cube.loc(time=['2019']))
+        self.assertEqual(store.names, ['gdp'])
+        self.assertEqual(store.open('gdp').shape, (3, 2))
+        # leftovers of failed saves are ignored, and cleaned by the next save
+        store.save('gdp', self.cube.loc(time=['2019']))
+        self.assertEqual(sorted(os.listdir(self.dir)), ['gdp'])
+        self.assertEqual(store.open('gdp').shape, (3, 1))
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(CubeTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 13:12:40 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import sys
+import gzip
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pyrostat import dictionary, collection, reader
+from pyrostat.settings import pyroError
+from .base import runtest as baseRuntest
+from .reader import TSV
+
+GEO_DIC = "BE\tBelgium\r\nAT\tAustria\n\nFR\tFrance \nEU\tEuropean Union\n"
+UNIT_DIC = "EUR\tEuro\nNAC\tNational currency\n"
+DIMLIST_DIC = "geo\tGeopolitical entity\nunit\tUnit of measure\n"
+
+class LocalResponse(object):
+    def __init__(self, content):
+        self.content = content
+
+class LocalBulk(collection.Bulk):
+
+    def __init__(self, files, **kwargs):
+        super(LocalBulk, self).__init__(**kwargs)
+        self.files, self.urls = files, []
+        self._session = self
+
+    def build_url(self, **kwargs):
+        return 'http://bulk/%s' % kwargs.get('file', '')
+
+    def get_response(self, url, **kwargs):
+        self.urls.append(url)
+        return LocalResponse(self.files[url.replace('http://bulk/', '')])
+
+#/****************************************************************************/
+# DictionaryTestCase
+#/****************************************************************************/
+class DictionaryTestCase(unittest.TestCase):
+    """Class of tests for `dictionary.py`
+    """
+    module = 'dictionary'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.codelist = dictionary.CodeList.parse(GEO_DIC, name='geo', lang='en')
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    #/************************************************************************/
+    def test1_parse(self):
+        C = self.codelist
+        self.assertEqual(len(C), 4)
+        self.assertEqual(C.codes.tolist(), ['AT', 'BE', 'EU', 'FR'])
+        self.assertEqual(C.labels.tolist(), ['Austria', 'Belgium', 'European Union', 'France'])
+        for content in (GEO_DIC.encode('utf-8'), gzip.compress(GEO_DIC.encode('utf-8'))):
+            P = dictionary.CodeList.parse(content, name='geo')
+            self.assertEqual(P.codes.tolist(), C.codes.tolist())
+            self.assertEqual(P.labels.tolist(), C.labels.tolist())
+        self.assertRaises(pyroError, dictionary.CodeList, 'geo', ['AT'], [])
+
+    #/************************************************************************/
+    def test2_translate(self):
+        C = self.codelist
+        self.assertTrue('BE' in C)
+        self.assertFalse('XX' in C)
+        self.assertEqual(C['FR'], 'France')
+        self.assertRaises(pyroError, C.__getitem__, 'XX')
+        self.assertEqual(C.lookup(['FR', 'XX', 'AT', 'ZZ']).tolist(), [3, -1, 0, -1])
+        self.assertEqual(C.translate([['BE', 'AT'], ['FR', 'BE']]).tolist(),
+                         [['Belgium', 'Austria'], ['France', 'Belgium']])
+        self.assertEqual(C.translate(['BE', 'XX']).tolist(), ['Belgium', 'XX'])
+        self.assertEqual(C.translate(['BE', 'XX'], default='').tolist(), ['Belgium', ''])
+        self.assertRaises(pyroError, C.translate, ['BE', 'XX'], strict=True)
+        self.assertEqual(C.translate_indices(['AT', 'FR'], np.array([1, 1, 0])).tolist(),
+                         ['France', 'France', 'Austria'])
+        empty = dictionary.CodeList('geo', [], [])
+        self.assertEqual(empty.lookup(['AT']).tolist(), [-1])
+        self.assertEqual(empty.translate(['AT']).tolist(), ['AT'])
+
+    #/************************************************************************/
+    def test3_save_load(self):
+        path = os.path.join(self.dir, 'en', 'geo.npz')
+        self.codelist.save(path)
+        C = dictionary.CodeList.load(path)
+        self.assertEqual((C.name, C.lang), ('geo', 'en'))
+        self.assertEqual(C.codes.tolist(), self.codelist.codes.tolist())
+        self.assertEqual(C.labels.tolist(), self.codelist.labels.tolist())
+        self.assertEqual(C.labels.dtype, object)
+        # the labels loaded are interned again
+        self.assertIs(C.labels[0], sys.intern('Austria'))
+        self.assertIs(C['BE'], self.codelist['BE'])
+        C = dictionary.CodeList.load(path)
+        self.assertEqual(C.translate(['FR', 'XX']).tolist(), ['France', 'XX'])
+
+    #/************************************************************************/
+    def test4_dictionary(self):
+        source, cache = os.path.join(self.dir, 'source'), os.path.join(self.dir, 'cache')
+        os.makedirs(os.path.join(source, 'en'))
+        with open(os.path.join(source, 'en', 'geo.dic'), 'w') as f:
+            f.write(GEO_DIC)
+        with open(os.path.join(source, 'en', 'dimlist.dic.gz'), 'wb') as f:
+            f.write(gzip.compress(DIMLIST_DIC.encode('utf-8')))
+        self.assertRaises(pyroError, dictionary.Dictionary, lang='xx')
+        D = dictionary.Dictionary(source=source, cache=cache)
+        self.assertEqual(D.lang, 'en')
+        self.assertIs(D['geo'], D.load('geo'))
+        self.assertTrue(os.path.exists(os.path.join(cache, 'en', 'geo.npz')))
+        self.assertTrue('unit' in D)
+        self.assertFalse('xxx' in D)
+        table = reader.read_tsv(TSV.encode('utf-8'))
+        self.assertEqual(D.translate(table, 'geo').tolist(),
+                         D['geo'].translate(np.asarray(table.codes['geo'])[table.indices['geo']]).tolist())
+        self.assertRaises(pyroError, D.translate, table, 'time')
+        # the binary copy is loaded by other instances, without the source
+        shutil.rmtree(source)
+        D = dictionary.Dictionary(cache=cache, bulk=LocalBulk({}))
+        self.assertEqual(D['geo'].translate(['AT']).tolist(), ['Austria'])
+        self.assertEqual(D.bulk.urls, [])
+
+    #/************************************************************************/
+    def test5_download(self):
+        self.assertEqual(collection.Bulk().build_file('dic', 'geo'), 'dic/en/geo.dic.gz')
+        self.assertEqual(collection.Bulk(lang='fr').build_file('dic', 'geo'), 'dic/fr/geo.dic.gz')
+        bulk = LocalBulk({'dic/en/unit.dic.gz': gzip.compress(UNIT_DIC.encode('utf-8'))})
+        D = dictionary.Dictionary(bulk=bulk)
+        self.assertEqual(D['unit'].translate(['NAC']).tolist(), ['National currency'])
+        self.assertEqual(bulk.urls, ['http://bulk/dic/en/unit.dic.gz'])
+        D['unit']
+        self.assertEqual(len(bulk.urls), 1)
+        self.assertRaises(pyroError, D.load, 'geo')
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(DictionaryTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
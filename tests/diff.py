@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 20:58:02 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import unittest
+
+from pyrostat import diff, metabase, toc
+from .base import runtest as baseRuntest
+
+OLD = [('aact_ali01', 'geo', 'AT'), ('aact_ali01', 'geo', 'BE'), ('aact_ali01', 'time', '2018'),
+       ('ilc_di01', 'geo', 'AT'), ('ilc_di01', 'unit', 'EUR'), ('demo_pjan', 'geo', 'AT')]
+NEW = [('aact_ali01', 'geo', 'AT'), ('aact_ali01', 'time', '2018'), ('aact_ali01', 'time', '2019'),
+       ('ilc_di01', 'geo', 'AT'), ('ilc_di01', 'sex', 'F'), ('ei_bsco_m', 'geo', 'AT')]
+
+def compact(rows):
+    return metabase.CompactMetabase.parse(('\n'.join(['\t'.join(r) for r in rows]) + '\n').encode('utf-8'))
+
+def table(entries):
+    columns = {k: [] for k in toc.TocTable.FIELDS}
+    for (code, last_update) in entries:
+        for k in columns:
+            columns[k].append(code if k == 'code' else last_update if k == 'last_update' else '')
+    return toc.TocTable(columns)
+
+#/****************************************************************************/
+# DiffTestCase
+#/****************************************************************************/
+class DiffTestCase(unittest.TestCase):
+    """Class of tests for `diff.py`
+    """
+    module = 'diff'
+
+    #/************************************************************************/
+    def test1_metabase(self):
+        D = diff.MetaDiff(compact(OLD), compact(NEW))
+        self.assertEqual(D.datasets['added'], ['ei_bsco_m'])
+        self.assertEqual(D.datasets['removed'], ['demo_pjan'])
+        self.assertEqual(D.datasets['changed'], ['aact_ali01', 'ilc_di01'])
+        self.assertEqual(D.dimensions['ilc_di01'], {'added': ['sex'], 'removed': ['unit']})
+        self.assertEqual(D.labels[('aact_ali01', 'geo')], {'added': [], 'removed': ['BE']})
+        self.assertEqual(D.labels[('aact_ali01', 'time')], {'added': ['2019'], 'removed': []})
+        self.assertNotIn(('ilc_di01', 'sex'), D.labels)
+        self.assertFalse(diff.MetaDiff(compact(OLD), compact(OLD)))
+
+    #/************************************************************************/
+    def test2_toc(self):
+        D = diff.MetaDiff(compact(OLD), compact(NEW),
+                          old_toc=table([('aact_ali01', '01.01.2020'), ('demo_pjan', '01.01.2020')]),
+                          new_toc=table([('aact_ali01', '02.01.2020'), ('ei_bsco_m', '02.01.2020')]))
+        self.assertEqual(D.toc['added'], ['ei_bsco_m'])
+        self.assertEqual(D.toc['removed'], ['demo_pjan'])
+        self.assertEqual(D.toc['changed'], {'aact_ali01': {'last_update': ('01.01.2020', '02.01.2020')}})
+        self.assertEqual(D.affected(), ['aact_ali01', 'demo_pjan', 'ei_bsco_m', 'ilc_di01'])
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(DiffTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
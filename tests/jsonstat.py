@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 21:36:12 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import json
+import unittest
+
+import numpy as np
+
+from pyrostat import jsonstat
+from .base import runtest as baseRuntest
+
+RESPONSE = {"version": "2.0", "class": "dataset", "label": "GDP", "updated": "2020-01-01",
+            "id": ["unit", "geo", "time"], "size": [1, 3, 2],
+            "dimension": {"unit": {"category": {"index": {"EUR": 0}, "label": {"EUR": "Euro"}}},
+                          "geo": {"category": {"index": {"BE": 1, "AT": 0, "FR": 2},
+                                               "label": {"AT": "Austria", "BE": "Belgium", "FR": "France"}}},
+                          "time": {"category": {"index": ["2019", "2020"]}}},
+            "value": {"5": 7, "0": 1.5, "3": 2.0}, "status": {"3": "p", "4": ":"}}
+
+#/****************************************************************************/
+# JsonStatTestCase
+#/****************************************************************************/
+class JsonStatTestCase(unittest.TestCase):
+    """Class of tests for `jsonstat.py`
+    """
+    module = 'jsonstat'
+
+    #/************************************************************************/
+    def test1_decode(self):
+        J = jsonstat.JsonStat.decode(json.dumps(RESPONSE).encode('utf-8'))
+        self.assertEqual(J.dims, ['unit', 'geo', 'time'])
+        self.assertEqual(J.codes['geo'], ['AT', 'BE', 'FR'])
+        self.assertEqual(J.labels['geo'], ['Austria', 'Belgium', 'France'])
+        self.assertEqual(J.positions.tolist(), [0, 3, 4, 5])
+        np.testing.assert_array_equal(J.values, [1.5, 2., np.nan, 7.])
+        self.assertEqual([J.flagcodes[f] for f in J.flags], ['', 'p', ':', ''])
+        self.assertEqual(J.info['updated'], '2020-01-01')
+        self.assertRaises(Exception, jsonstat.JsonStat.decode,
+                          '{"error":{"status":"416","label":"Too many categories have been requested."}}')
+
+    #/************************************************************************/
+    def test2_convert(self):
+        J = jsonstat.JsonStat.decode(RESPONSE)
+        cube = J.to_cube()
+        self.assertEqual(cube.shape, (1, 3, 2))
+        self.assertEqual(cube.get(unit='EUR', geo='BE', time='2020'), 2.)
+        self.assertTrue(np.isnan(cube.get(unit='EUR', geo='AT', time='2020')))
+        table = J.to_columns()
+        self.assertEqual(table.column('geo').tolist(), ['AT', 'BE', 'FR', 'FR'])
+        self.assertEqual(table.column('time').tolist(), ['2019', '2020', '2019', '2020'])
+
+    #/************************************************************************/
+    def test3_loads(self):
+        content = json.dumps(RESPONSE).encode('utf-8')
+        installed = jsonstat.ORJSON_INSTALLED, jsonstat.SIMDJSON_INSTALLED
+        try:
+            # same result whatever the backend, from bytes or from a buffer
+            for backend in ((True, False), (False, True), (False, False)):
+                if any([b and not i for (b, i) in zip(backend, installed)]):
+                    continue
+                jsonstat.ORJSON_INSTALLED, jsonstat.SIMDJSON_INSTALLED = backend
+                self.assertEqual(jsonstat.loads(content), RESPONSE)
+                self.assertEqual(jsonstat.loads(memoryview(content)), RESPONSE)
+                self.assertRaises(Exception, jsonstat.loads, content[:-1])
+        finally:
+            jsonstat.ORJSON_INSTALLED, jsonstat.SIMDJSON_INSTALLED = installed
+        self.assertRaises(Exception, jsonstat.check_error, {'error': {'status': '400', 'label': 'Bad Request'}})
+        self.assertIsNone(jsonstat.check_error(RESPONSE))
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(JsonStatTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
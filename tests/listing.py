@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 11:40:12 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import unittest
+
+from pyrostat import listing
+from .base import runtest as baseRuntest
+
+HTML = """<html><body>
+<table><tr><td>menu</td></tr></table>
+<table class="filelist">
+<thead><tr><th>Name</th><th>Size</th><th>Type</th><th>Date</th></tr></thead>
+<tr><td><a href="BulkDownloadListing?dir=data">..</a></td><td></td><td>DIR</td><td></td></tr>
+<tr><td><a href="BulkDownloadListing?file=data%2Faact_ali01.tsv.gz">aact_ali01.tsv.gz</a></td>
+<td>3 KB</td><td>tsv.gz</td><td>&nbsp;05/02/2019 23:00:00</td></tr>
+<tr><td><a href="BulkDownloadListing?file=data%2Faact_ali01.sdmx.zip">aact_ali01.sdmx.zip</a></td>
+<td>5 KB</td><td>sdmx.zip</td><td>&nbsp;05/02/2019 23:00:00</td></tr>
+</table></body></html>"""
+
+ROWS = [('aact_ali01.tsv.gz', '3 KB', 'tsv.gz', '05/02/2019 23:00:00'),
+        ('aact_ali01.sdmx.zip', '5 KB', 'sdmx.zip', '05/02/2019 23:00:00')]
+
+#/****************************************************************************/
+# ListingTestCase
+#/****************************************************************************/
+class ListingTestCase(unittest.TestCase):
+    """Class of tests for `listing.py`
+    """
+    module = 'listing'
+
+    #/************************************************************************/
+    def test1_parse(self):
+        self.assertEqual(listing.parse_listing(HTML, parser='html.parser'), ROWS)
+        if listing.LXML_INSTALLED:
+            self.assertEqual(listing.parse_listing(HTML, parser='lxml'), ROWS)
+
+    #/************************************************************************/
+    def test2_parse_chunks(self):
+        content = HTML.encode('utf-8')
+        chunks = [content[i:i+7] for i in range(0, len(content), 7)]
+        self.assertEqual(listing.parse_listing(chunks), ROWS)
+
+    #/************************************************************************/
+    def test3_index(self):
+        L = listing.Listing()
+        L.update('a', ROWS)
+        self.assertIn('aact_ali01', L)
+        self.assertEqual(L.get('aact_ali01', ext='sdmx.zip')['size'], '5 KB')
+        self.assertEqual(L.files('aact_ali01'), [r[0] for r in ROWS])
+        self.assertFalse(L.expired('a'))
+        self.assertTrue(L.expired('a', expire_after=0))
+        L.update('a', ROWS[:1])
+        self.assertEqual(L.files('aact_ali01'), [ROWS[0][0]])
+        L.remove('a')
+        self.assertNotIn('aact_ali01', L)
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(ListingTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
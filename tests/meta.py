@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 10:31:47 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pyrostat import collection
+from .base import runtest as baseRuntest
+from .toc import TOC_TXT
+from .query import local_meta
+
+#/****************************************************************************/
+# Meta whose metabase is only loaded when released
+#/****************************************************************************/
+class SlowMeta(collection.Meta):
+
+    def __init__(self, **kwargs):
+        self.release, self.error = threading.Event(), None
+        super(SlowMeta, self).__init__(**kwargs)
+
+    def readCompactMetabase(self, **kwargs):
+        self.release.wait(10)
+        raise self.error or IOError('metabase not available')
+
+#/****************************************************************************/
+# MetaTestCase
+#/****************************************************************************/
+class MetaTestCase(unittest.TestCase):
+    """Class of tests for the class `Meta` of `collection.py`
+    """
+    module = 'collection'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        with open(os.path.join(self.source, 'table_of_contents_en.txt'), 'w') as f:
+            f.write(TOC_TXT % ('Agricultural labour input', 'Population on 1 January', 'demo_pjan'))
+    def tearDown(self):
+        shutil.rmtree(self.source, ignore_errors=True)
+
+    #/************************************************************************/
+    def test1_load(self):
+        M = SlowMeta()
+        self.assertIsNone(M.future('toc'))
+        self.assertTrue(M.ready('metabase'))
+        futures = M.load(source=self.source, langs=['en'])
+        self.assertEqual(sorted(futures.keys()), ['metabase', 'toc'])
+        # the table of contents is available while the metabase is still loading
+        self.assertEqual(M.getTitle('demo_pjan'), 'Population on 1 January')
+        self.assertFalse(M.ready('metabase'))
+        self.assertFalse(M.future('metabase').done())
+        # errors of the background loading are raised when waiting
+        M.release.set()
+        self.assertRaises(IOError, M.wait, 'metabase', timeout=10)
+        self.assertTrue(M.ready('metabase'))
+        self.assertRaises(Exception, M.future, 'dic')
+
+    #/************************************************************************/
+    def test2_lazy(self):
+        M = SlowMeta(lazy=True, source=self.source)
+        self.assertIsNotNone(M.future('toc'))
+        self.assertIsNotNone(M.future('metabase'))
+        M.release.set()
+        self.assertRaises(Exception, M.wait, timeout=10)
+
+    #/************************************************************************/
+    def test3_search(self):
+        M = local_meta(self.source)
+        # search of the metabase rows: case-sensitive by default
+        res = M.search('ali')
+        self.assertEqual(list(res.columns), ['data', 'dic', 'label'])
+        self.assertEqual(len(res), 4)
+        self.assertEqual(set(res['data']), set(['aact_ali01']))
+        self.assertEqual(len(M.search('eur')), 0)
+        self.assertEqual(len(M.search('eur', case=False)), 1)
+        self.assertEqual(list(M.search('^(AT|FR)$')['label']), ['AT', 'AT', 'FR'])
+        # same rows whether the metabase is in compact form or a table
+        for regex in ('ali', 'geo', '^(AT|FR)$', '20'):
+            rows = local_meta(self.source).search(regex).index.tolist()
+            self.assertEqual(M.search(regex).index.tolist(), rows)
+        self.assertEqual(M.search('geo').index.tolist(), [1, 2, 4, 5])
+        self.assertRaises(Exception, M.search, '(')
+        # indexed search, which includes the table of contents
+        results = M.searchMetadata('labour', mode='keyword', kind='dataset')
+        self.assertEqual([r['key'] for r in results], ['aact_ali01'])
+        results = M.searchMetadata('EUR', kind='label')
+        self.assertEqual([r['key'] for r in results], [('unit', 'EUR')])
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(MetaTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
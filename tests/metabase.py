@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 16:30:41 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+
+from pyrostat import metabase
+from .base import runtest as baseRuntest
+
+ROWS = [('aact_ali01', 'unit', 'EUR'), ('aact_ali01', 'geo', 'AT'), ('aact_ali01', 'geo', 'BE'),
+        ('aact_ali01', 'time', '2019'), ('ilc_di01', 'geo', 'AT'), ('ilc_di01', 'geo', 'FR'),
+        ('ilc_di01', 'time', '2019'), ('ilc_di01', 'time', '2019')]
+
+#/****************************************************************************/
+# MetabaseTestCase
+#/****************************************************************************/
+class MetabaseTestCase(unittest.TestCase):
+    """Class of tests for `metabase.py`
+    """
+    module = 'metabase'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.index = metabase.MetaIndex(*zip(*ROWS))
+
+    #/************************************************************************/
+    def test1_lookups(self):
+        index = self.index
+        self.assertEqual(index.datasets(), ['aact_ali01', 'ilc_di01'])
+        self.assertEqual(index.datasets('unit'), ['aact_ali01'])
+        self.assertEqual(index.dimensions('aact_ali01'), ['unit', 'geo', 'time'])
+        self.assertEqual(index.labels('geo', dataset='ilc_di01'), ['AT', 'FR'])
+        self.assertEqual(index.labels('geo'), ['AT', 'BE', 'FR'])
+        self.assertEqual(index.labels('time', dataset='ilc_di01'), ['2019'])
+        self.assertTrue(index.has_label('BE', 'geo'))
+        self.assertFalse(index.has_label('BE', 'geo', dataset='ilc_di01'))
+        self.assertEqual(index.check(['ilc_di01', 'xxx']), [True, False])
+
+    #/************************************************************************/
+    def test2_validate(self):
+        index = self.index
+        self.assertEqual(index.validate('aact_ali01', {'geo': ['AT', 'BE'], 'time': '2019'}), {})
+        self.assertEqual(index.validate('xxx'), {'dataset': 'xxx'})
+        errors = index.validate('ilc_di01', {'geo': ['AT', 'BE'], 'unit': 'EUR'})
+        self.assertEqual(errors['dimensions'], ['unit'])
+        self.assertEqual(errors['labels'], {'geo': ['BE']})
+        self.assertEqual(len(index.validate_many([('ilc_di01', {}), ('xxx', {})])), 2)
+
+    #/************************************************************************/
+    def test3_compact(self):
+        content = gzip.compress(('\n'.join(['\t'.join(r) for r in ROWS]) + '\n').encode('utf-8'))
+        for chunk in (5, 2**24):
+            compact = metabase.CompactMetabase.parse(content, chunk=chunk)
+            self.assertEqual(len(compact), len(ROWS))
+            self.assertEqual(compact.tables['dic'], ['unit', 'geo', 'time'])
+            self.assertEqual(list(zip(*[compact.column(k) for k in compact.KEYS])), ROWS)
+        index = metabase.MetaIndex.from_compact(compact)
+        self.assertEqual(index.dimensions('aact_ali01'), self.index.dimensions('aact_ali01'))
+        self.assertEqual(index.labels('geo'), self.index.labels('geo'))
+        path = tempfile.mkdtemp()
+        try:
+            compact.save(path)
+            loaded = metabase.CompactMetabase.load(path, mmap=True)
+            self.assertEqual(loaded.tables, compact.tables)
+            self.assertEqual(loaded.columns['label'].tolist(), compact.columns['label'].tolist())
+        finally:
+            shutil.rmtree(path)
+
+    #/************************************************************************/
+    def test4_graph(self):
+        content = ('\n'.join(['\t'.join(r) for r in ROWS]) + '\n').encode('utf-8')
+        graph = metabase.MetaGraph.from_compact(metabase.CompactMetabase.parse(content))
+        self.assertEqual(graph.intersection('geo', 'time'), ['aact_ali01', 'ilc_di01'])
+        self.assertEqual(graph.intersection('geo', ('unit', 'EUR')), ['aact_ali01'])
+        self.assertEqual(graph.intersection(('geo', 'FR'), ('geo', 'XX')), [])
+        self.assertEqual(graph.union(('geo', 'BE'), ('geo', 'FR')), ['aact_ali01', 'ilc_di01'])
+        self.assertEqual(graph.common(['aact_ali01', 'ilc_di01']), ['geo', 'time'])
+        self.assertEqual(graph.common(['aact_ali01', 'ilc_di01'], by='label'), [('geo', 'AT'), ('time', '2019')])
+        self.assertEqual(graph.similar('ilc_di01', by='label'), {'aact_ali01': 0.4})
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(MetabaseTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
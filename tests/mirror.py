@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 10:05:32 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+from pyrostat import mirror
+from .base import runtest as baseRuntest
+
+#/****************************************************************************/
+# Bulk and HTTP session serving fixed files, without any request
+#/****************************************************************************/
+class LocalResponse(object):
+
+    def __init__(self, content, status_code=200, headers=None):
+        self.content, self.status_code = content, status_code
+        self.headers = headers or {'Content-Length': str(len(content))}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError('error %s' % self.status_code)
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+class LocalBulk(object):
+
+    lang = 'en'
+
+    def __init__(self, files):
+        # files: {filename: (date, content)}
+        self.files, self.requests, self.exts = files, [], []
+        self.session = self
+        self.session.session = self
+
+    def read_listing(self, key, ext=None, alpha=None):
+        self.exts.append(ext)
+        return {os.path.basename(f).split('.')[0]: {'name': os.path.basename(f), 'date': d, 'size': len(c or b'')}
+                for (f, (d, c)) in self.files.items() if f.startswith('%s/' % key) and f.endswith(ext)}
+
+    def build_url(self, file=None):
+        return file
+
+    def get(self, url, headers=None, stream=False):
+        self.requests.append((url, headers or {}))
+        if url not in self.files:
+            return LocalResponse(b'', status_code=404)
+        content = self.files[url][1]
+        if content is None:
+            raise IOError('connection lost')
+        if headers and 'Range' in headers:
+            offset = int(headers['Range'][len('bytes='):-1])
+            if offset >= len(content):
+                return LocalResponse(b'', status_code=416, headers={'Content-Range': 'bytes */%d' % len(content)})
+            return LocalResponse(content[offset:], status_code=206)
+        return LocalResponse(content)
+
+    def head(self, url, allow_redirects=True):
+        return self.get(url)
+
+#/****************************************************************************/
+# MirrorTestCase
+#/****************************************************************************/
+class MirrorTestCase(unittest.TestCase):
+    """Class of tests for `mirror.py`
+    """
+    module = 'mirror'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.bulk = LocalBulk({'data/aact_ali01.tsv.gz': ('01.01.2020', b'a' * 100),
+                               'data/ilc_di01.tsv.gz': ('01.01.2020', b'b' * 50),
+                               'data/ilc_di01.sdmx.zip': ('01.01.2020', b'c' * 70)})
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    #/************************************************************************/
+    def test1_changes(self):
+        M = mirror.Mirror(self.root, bulk=self.bulk, langs=['en'])
+        changed, unchanged, removed, files = M.changes('data')
+        self.assertEqual(self.bulk.exts, ['tsv.gz', 'sdmx.zip'])
+        self.assertEqual(sorted(changed), sorted(self.bulk.files.keys()))
+        self.assertEqual((unchanged, removed), ([], []))
+        M.update(keys='data')
+        self.bulk.files['data/ilc_di01.tsv.gz'] = ('01.02.2020', b'd' * 60)
+        del self.bulk.files['data/ilc_di01.sdmx.zip']
+        changed, unchanged, removed, _ = M.changes('data')
+        self.assertEqual((changed, unchanged, removed),
+                         (['data/ilc_di01.tsv.gz'], ['data/aact_ali01.tsv.gz'], ['data/ilc_di01.sdmx.zip']))
+
+    #/************************************************************************/
+    def test2_update(self):
+        M = mirror.Mirror(self.root, bulk=self.bulk, langs=['en'], fmts=['tsv'])
+        # partial download of a former run, with the version downloaded
+        os.makedirs(os.path.join(self.root, 'data'))
+        with open(os.path.join(self.root, 'data', 'aact_ali01.tsv.gz.part'), 'wb') as f:
+            f.write(b'a' * 40)
+        with open(os.path.join(self.root, 'data', 'aact_ali01.tsv.gz.part.date'), 'w') as f:
+            f.write('01.01.2020')
+        report = M.update(keys=['data'])
+        self.assertEqual([report[k] for k in ('checked', 'updated', 'unchanged', 'failed')], [2, 2, 0, 0])
+        self.assertEqual((report['bytes_downloaded'], report['bytes_resumed']), (110, 40))
+        self.assertIn(('data/aact_ali01.tsv.gz', {'Range': 'bytes=40-'}), self.bulk.requests)
+        with open(os.path.join(self.root, 'data', 'aact_ali01.tsv.gz'), 'rb') as f:
+            self.assertEqual(f.read(), b'a' * 100)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, 'data'))),
+                         ['aact_ali01.tsv.gz', 'ilc_di01.tsv.gz'])
+        with open(M.manifest.path) as f:
+            entries = json.load(f)
+        self.assertEqual(entries['data']['data/aact_ali01.tsv.gz']['sha256'],
+                         hashlib.sha256(b'a' * 100).hexdigest())
+        # nothing changed since
+        report = M.update(keys=['data'])
+        self.assertEqual([report[k] for k in ('updated', 'unchanged', 'bytes_saved')], [0, 2, 150])
+        # interrupted download: the partial state is already saved on disk
+        self.bulk.files['data/ilc_di01.tsv.gz'] = ('01.02.2020', None)
+        report = M.update(keys=['data'])
+        self.assertEqual(report['failed'], 1)
+        with open(os.path.join(self.root, 'data', 'ilc_di01.tsv.gz.part.date')) as f:
+            self.assertEqual(f.read(), '01.02.2020')
+
+    #/************************************************************************/
+    def test4_complete(self):
+        M = mirror.Mirror(self.root, bulk=self.bulk, langs=['en'], fmts=['tsv'])
+        part = os.path.join(self.root, 'data', 'aact_ali01.tsv.gz.part')
+        os.makedirs(os.path.dirname(part))
+        # partial download already complete: the range requested is not satisfiable
+        with open(part, 'wb') as f:
+            f.write(b'a' * 100)
+        with open('%s.date' % part, 'w') as f:
+            f.write('01.01.2020')
+        nbytes, sha256, resumed = M.download('data/aact_ali01.tsv.gz', date='01.01.2020')
+        self.assertEqual((nbytes, resumed), (100, 100))
+        self.assertEqual(sha256, hashlib.sha256(b'a' * 100).hexdigest())
+        self.assertEqual(os.listdir(os.path.dirname(part)), ['aact_ali01.tsv.gz'])
+        # partial download longer than the file: downloaded again
+        with open(part, 'wb') as f:
+            f.write(b'a' * 120)
+        with open('%s.date' % part, 'w') as f:
+            f.write('01.01.2020')
+        nbytes, sha256, resumed = M.download('data/aact_ali01.tsv.gz', date='01.01.2020')
+        self.assertEqual((nbytes, resumed), (100, 0))
+        with open(os.path.join(self.root, 'data', 'aact_ali01.tsv.gz'), 'rb') as f:
+            self.assertEqual(f.read(), b'a' * 100)
+        # partial download of another version: downloaded again
+        with open(part, 'wb') as f:
+            f.write(b'z' * 40)
+        nbytes, sha256, resumed = M.download('data/aact_ali01.tsv.gz', date='01.02.2020')
+        self.assertEqual((nbytes, resumed), (100, 0))
+        self.assertEqual(self.bulk.requests[-1], ('data/aact_ali01.tsv.gz', {}))
+
+    #/************************************************************************/
+    def test5_save(self):
+        self.bulk.files.update([('data/nama_%02d.tsv.gz' % i, ('01.01.2020', b'n')) for i in range(5)])
+        M = mirror.Mirror(self.root, bulk=self.bulk, langs=['en'], fmts=['tsv'], workers=1)
+        saves = []
+        save = M.manifest.save
+        M.manifest.save = lambda: saves.append(len(M.manifest.entries['data'])) or save()
+        M.SAVE = 3
+        report = M.update(keys=['data'])
+        self.assertEqual(report['updated'], 7)
+        # the manifest is saved every SAVE files and at the end of the update
+        self.assertEqual(saves, [3, 6, 7])
+
+    #/************************************************************************/
+    def test3_verify(self):
+        M = mirror.Mirror(self.root, bulk=self.bulk, langs=['en'], fmts=['tsv'])
+        M.update(keys=['data'])
+        self.assertEqual(M.verify(), [])
+        with open(os.path.join(self.root, 'data', 'ilc_di01.tsv.gz'), 'wb') as f:
+            f.write(b'corrupted')
+        self.assertEqual(M.verify(), ['data/ilc_di01.tsv.gz'])
+        changed, _, _, _ = M.changes('data')
+        self.assertEqual(changed, ['data/ilc_di01.tsv.gz'])
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(MirrorTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
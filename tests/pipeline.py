@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 09:41:05 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from pyrostat import collection, pipeline
+from .base import runtest as baseRuntest
+from .reader import TSV, SDMX
+
+#/****************************************************************************/
+# PipelineTestCase
+#/****************************************************************************/
+class PipelineTestCase(unittest.TestCase):
+    """Class of tests for `pipeline.py`
+    """
+    module = 'pipeline'
+
+    #/************************************************************************/
+    def setUp(self):
+        # local copy of the bulk repository
+        self.source = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.source, 'data'))
+        for name in ('aact_ali01', 'ilc_di01'):
+            with open(os.path.join(self.source, 'data', '%s.tsv.gz' % name), 'wb') as f:
+                f.write(gzip.compress(TSV.encode('utf-8')))
+            with zipfile.ZipFile(os.path.join(self.source, 'data', '%s.sdmx.zip' % name), 'w') as z:
+                z.writestr('%s.sdmx.xml' % name, SDMX)
+        self.bulk = collection.Bulk()
+    def tearDown(self):
+        shutil.rmtree(self.source, ignore_errors=True)
+
+    #/************************************************************************/
+    def test1_build_file(self):
+        self.assertEqual(self.bulk.build_file('data', 'aact_ali01'), 'data/aact_ali01.tsv.gz')
+        self.assertEqual(self.bulk.build_file('data', 'aact_ali01', ext='sdmx'), 'data/aact_ali01.sdmx.zip')
+
+    #/************************************************************************/
+    def test2_run(self):
+        names = ['aact_ali01', 'nama_10_gdp', 'ilc_di01']
+        for fmt in ('tsv', 'sdmx'):
+            for processes in (0, 2):
+                P = pipeline.Pipeline(bulk=self.bulk, source=self.source, fmt=fmt, processes=processes)
+                tables = P.read(names)
+                self.assertEqual(list(tables.keys()), ['aact_ali01', 'ilc_di01'])
+                self.assertTrue(all([t.dims == ['unit', 'geo', 'time'] for t in tables.values()]))
+                self.assertTrue(all([len(t) == 3 for t in tables.values()]))
+                # the missing file is reported, not raised
+                self.assertEqual(list(P.errors.keys()), ['nama_10_gdp'])
+                self.assertEqual(list(P.timings.keys()), ['download', 'decompress', 'parse', 'wall'])
+                self.assertTrue(all([t >= 0 for t in P.timings.values()]))
+                self.assertGreater(P.timings['wall'], 0)
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(PipelineTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 11:37:52 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import json
+import warnings
+import unittest
+
+from pyrostat import planner
+from .base import runtest as baseRuntest
+from .jsonstat import RESPONSE
+from .query import LocalSession
+
+SIZE = 10 * 2**20 # compressed size of the file of the dataset
+DIMS = {'geo': 300, 'unit': 50, 'na_item': 100, 'time': 30}
+
+class LocalBulk(object):
+
+    def __init__(self, sizes, session=None):
+        self.sizes, self.exts, self.session = sizes, [], session
+
+    def read_listing(self, key, ext=None, alpha=None):
+        self.exts.append(ext)
+        return {d: {'size': s} for (d, s) in self.sizes.items()}
+
+class LocalMeta(object):
+
+    def getAllDimensions(self, dataset):
+        return list(DIMS.keys())
+
+    def getAllLabels(self, dimension, data=None):
+        return ['%s%03d' % (dimension.upper(), i) for i in range(DIMS[dimension])]
+
+#/****************************************************************************/
+# PlannerTestCase
+#/****************************************************************************/
+class PlannerTestCase(unittest.TestCase):
+    """Class of tests for `planner.py`
+    """
+    module = 'planner'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.filters = {'geo': ['GEO000', 'GEO001'], 'unit': 'UNIT000'}
+
+    #/************************************************************************/
+    def test1_route_nometa(self):
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            route = P.route('nama_10_gdp')
+        # the cells of the REST query are those of the whole file
+        observations = SIZE * P.RATIO['tsv'] // P.CHARS['tsv']
+        self.assertEqual(route['rest']['cells'], observations)
+        self.assertEqual(route['bulk']['cells'], observations)
+        self.assertEqual(route['bulk']['bytes'], SIZE)
+        self.assertEqual(route['route'], 'bulk')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            route = P.route('nama_10_gdp', filters=self.filters)
+        self.assertEqual(route['rest']['cells'], observations)
+        self.assertEqual(route['route'], 'bulk')
+
+    #/************************************************************************/
+    def test2_route_meta(self):
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}), meta=LocalMeta())
+        route = P.route('nama_10_gdp')
+        self.assertEqual(route['rest']['cells'], 300 * 50 * 100 * 30)
+        self.assertEqual(route['route'], 'bulk')
+        route = P.route('nama_10_gdp', filters=self.filters)
+        self.assertEqual(route['rest']['cells'], 2 * 1 * 100 * 30)
+        self.assertEqual(route['rest']['requests'], 1)
+        self.assertEqual(route['route'], 'rest')
+        self.assertLess(route['rest']['seconds'], route['bulk']['seconds'])
+        # the REST query is split to comply with the limit of categories
+        route = P.route('nama_10_gdp', filters=self.filters, limit=1)
+        self.assertEqual(route['rest']['requests'], 2)
+
+    #/************************************************************************/
+    def test3_route_unknown(self):
+        P = planner.Planner(bulk=LocalBulk({}))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            route = P.route('nama_10_gdp', filters=self.filters)
+        self.assertTrue(len(w) > 0)
+        self.assertIsNone(route['bulk']['seconds'])
+        self.assertEqual(route['route'], 'rest')
+
+    #/************************************************************************/
+    def test4_explain(self):
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}), meta=LocalMeta())
+        lines = P.explain('nama_10_gdp', filters=self.filters).split('\n')
+        self.assertEqual(lines[0], 'query of dataset nama_10_gdp - route: REST')
+        self.assertTrue(lines[1].startswith('  bulk  :'))
+        self.assertTrue(lines[2].startswith('  rest *: 1 requests, 192,000 bytes, 6,000 cells'))
+        lines = P.explain('nama_10_gdp').split('\n')
+        self.assertEqual(lines[0], 'query of dataset nama_10_gdp - route: BULK')
+        P = planner.Planner(bulk=LocalBulk({}))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            lines = P.explain('nama_10_gdp', filters=self.filters).split('\n')
+        self.assertEqual(lines[1], '  bulk  : 1 requests, unknown bytes, unknown cells, unknown seconds')
+
+    #/************************************************************************/
+    def test5_estimate(self):
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}), meta=LocalMeta())
+        est = P.estimate('nama_10_gdp')
+        self.assertEqual(P.bulk.exts, ['tsv.gz'])
+        expanded = SIZE * P.RATIO['tsv']
+        observations = expanded // P.CHARS['tsv']
+        cells = 300 * 50 * 100 * 30
+        self.assertEqual(est['compressed'], SIZE)
+        self.assertEqual(est['expanded'], expanded)
+        self.assertEqual(est['dims'], {'geo': (300, 300), 'unit': (50, 50), 'na_item': (100, 100), 'time': (30, 30)})
+        self.assertEqual(est['cells'], cells)
+        self.assertEqual(est['observations'], observations)
+        self.assertEqual(est['footprint']['text'], expanded)
+        self.assertEqual(est['footprint']['columns'], observations * (4 * P.INDEX + P.VALUE + P.FLAG))
+        self.assertEqual(est['footprint']['frame'], observations * (4 * P.CATEGORY + P.VALUE + P.CATEGORY))
+        self.assertEqual(est['footprint']['cube'], cells * (P.VALUE + P.FLAG))
+        self.assertEqual((est['mode'], est['batch']), ('memory', None))
+        # the observations are spread over the cells of the selection
+        est = P.estimate('nama_10_gdp', filters=self.filters)
+        self.assertEqual(est['dims']['geo'], (300, 2))
+        self.assertEqual(est['cells'], 2 * 1 * 100 * 30)
+        self.assertEqual(est['observations'], observations * 6000 // cells)
+        self.assertEqual(est['footprint']['cube'], 6000 * (P.VALUE + P.FLAG))
+
+    #/************************************************************************/
+    def test6_recommend(self):
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}), meta=LocalMeta())
+        est = P.estimate('nama_10_gdp')
+        footprint = est['footprint']
+        text, columns, cube = footprint['text'], footprint['columns'], footprint['cube']
+        self.assertEqual(P.recommend(est, budget=text + columns + cube), ('memory', None))
+        self.assertEqual(P.recommend(est, budget=text + columns), ('columns', None))
+        # a dataset over budget is read in batches using a tenth of the budget
+        budget = (text + columns) // 2
+        mode, batch = P.recommend(est, budget=budget)
+        self.assertEqual(mode, 'chunked')
+        self.assertEqual(batch, budget // 10 // (4 * P.INDEX + P.VALUE + P.FLAG + P.CHARS['tsv']))
+        self.assertTrue(batch > 0)
+        est = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}), meta=LocalMeta(),
+                              budget=budget).estimate('nama_10_gdp')
+        self.assertEqual((est['mode'], est['batch']), (mode, batch))
+        self.assertEqual(P.recommend(est, budget=1), ('chunked', 1))
+        # the size of a dataset absent from the listing is unknown
+        P = planner.Planner(bulk=LocalBulk({}))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            est = P.estimate('nama_10_gdp')
+        self.assertTrue(len(w) > 0)
+        self.assertIsNone(est['footprint']['columns'])
+        self.assertEqual(est['mode'], 'chunked')
+        self.assertTrue(est['batch'] > 0)
+
+    #/************************************************************************/
+    def test7_summary(self):
+        sizes = {'nama_10_gdp': SIZE, 'nama_10_a10': SIZE // 1024}
+        P = planner.Planner(bulk=LocalBulk(sizes), meta=LocalMeta())
+        plan = P.plan(['nama_10_gdp', 'nama_10_a10'])
+        self.assertEqual(list(plan.keys()), ['nama_10_gdp', 'nama_10_a10'])
+        self.assertEqual(P.bulk.exts, ['tsv.gz'])
+        peaks = [sum(plan[d]['footprint'][f] for f in ('text', 'columns', 'cube')) for d in plan]
+        summary = P.summary(plan)
+        self.assertEqual(summary['datasets'], 2)
+        self.assertEqual(summary['compressed'], SIZE + SIZE // 1024)
+        self.assertEqual(summary['peak_sequential'], max(peaks))
+        self.assertEqual(summary['peak_concurrent'], sum(peaks))
+        self.assertEqual(summary['budget'], P.budget)
+        self.assertEqual(summary['concurrent'], sum(peaks) <= P.budget)
+        self.assertFalse(summary['concurrent'])
+        # datasets read in batches use a tenth of the budget
+        plan['nama_10_gdp']['mode'] = 'chunked'
+        summary = P.summary(plan, budget=2**30)
+        self.assertEqual(summary['peak_concurrent'], 2**30 // 10 + peaks[1])
+        self.assertTrue(summary['concurrent'])
+
+    #/************************************************************************/
+    def test8_load(self):
+        # the numeric parameters of the API are passed unchanged
+        filters = {'geo': ['AT', 'BE', 'FR'], 'unit': 'EUR', 'precision': 1, 'lastTimePeriod': 2}
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}), meta=LocalMeta())
+        self.assertEqual(P.route('nama_10_gdp', filters=filters)['route'], 'rest')
+        session = LocalSession(json.dumps(RESPONSE).encode('utf-8'))
+        P = planner.Planner(bulk=LocalBulk({'nama_10_gdp': SIZE}, session=session))
+        cube = P.load('nama_10_gdp', filters=filters, route='rest')
+        self.assertEqual(len(session.urls), 1)
+        self.assertIn('precision=1', session.urls[0])
+        self.assertIn('lastTimePeriod=2', session.urls[0])
+        self.assertIn('unit=EUR', session.urls[0])
+        self.assertEqual(cube.dims, ['unit', 'geo', 'time'])
+        self.assertEqual(cube.get(unit='EUR', geo='FR', time='2020'), 7.)
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(PlannerTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
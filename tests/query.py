@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 22:14:51 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import itertools
+import unittest
+
+import numpy as np
+import requests
+
+from pyrostat import query, cube, collection, settings
+from pyrostat.settings import pyroError
+from .base import runtest as baseRuntest
+from .metabase import ROWS
+from .jsonstat import RESPONSE
+
+GEOS = ['G%02d' % i for i in range(44)]
+TIMES = ['2018', '2019', '2020', '2021']
+
+class LocalFetcher(query.Fetcher):
+
+    def __init__(self, **kwargs):
+        super(LocalFetcher, self).__init__(**kwargs)
+        self.queries = []
+
+    def fetch_many(self, queries):
+        self.queries.extend(queries)
+        raise IOError('no connection')
+
+class LocalResponse(object):
+
+    def __init__(self, content, status_code=200):
+        self.content, self.status_code = content, status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError('%s error' % self.status_code, response=self)
+
+class LocalSession(object):
+
+    def __init__(self, content, status_code=200):
+        self.response, self.urls = LocalResponse(content, status_code), []
+
+    def get_response(self, url, **kwargs):
+        self.urls.append(url)
+        self.response.raise_for_status()
+        return self.response
+
+def local_meta(source):
+    # Meta instance whose metabase is read from a local file
+    basefile = '%s.%s' % (settings.BULK_FILES['base'], settings.zipped_ext('base', settings.BULK_EXTS['base'][0]))
+    with open(os.path.join(source, basefile), 'wb') as f:
+        f.write(gzip.compress(('\n'.join(['\t'.join(r) for r in ROWS]) + '\n').encode('utf-8')))
+    M = collection.Meta()
+    M.load(source=source, langs=['en'])
+    M.wait('metabase')
+    return M
+
+#/****************************************************************************/
+# QueryTestCase
+#/****************************************************************************/
+class QueryTestCase(unittest.TestCase):
+    """Class of tests for `query.py`
+    """
+    module = 'query'
+
+    #/************************************************************************/
+    def test1_split(self):
+        Q = query.Query('nama_10_gdp', geo=GEOS, time=TIMES, unit='CP_MEUR')
+        self.assertEqual(Q.categories, 176)
+        self.assertEqual(Q.split(limit=200), [Q])
+        for (limit, nqueries) in ((50, 4), (10, 18), (1, 176)):
+            queries = Q.split(limit=limit)
+            self.assertEqual(len(queries), nqueries)
+            self.assertTrue(all([q.categories <= limit for q in queries]))
+            selections = set(itertools.chain(*[itertools.product(*q.filters.values()) for q in queries]))
+            self.assertEqual(len(selections), 176)
+        self.assertIn('precision=1', Q.url())
+
+    #/************************************************************************/
+    def test2_merge(self):
+        left = cube.Cube(['geo', 'time'], {'geo': ['AT', 'BE'], 'time': ['2019']},
+                         np.array([[1.], [2.]]), flags=np.array([[0], [1]], dtype=np.int16),
+                         flagcodes=['', 'p'])
+        right = cube.Cube(['geo', 'time'], {'geo': ['BE'], 'time': ['2019', '2020']},
+                          np.array([[np.nan, 4.]]))
+        merged = cube.Cube.merge([left, right])
+        self.assertEqual(merged.codes, {'geo': ['AT', 'BE'], 'time': ['2019', '2020']})
+        self.assertEqual(merged.get(geo='BE', time='2019'), 2.)
+        self.assertEqual(merged.get(geo='BE', time='2020'), 4.)
+        self.assertTrue(np.isnan(merged.get(geo='AT', time='2020')))
+        self.assertEqual(merged.flagcodes[merged.flags[1, 0]], 'p')
+
+    #/************************************************************************/
+    def test3_cache(self):
+        Q = query.Query('nama_10_gdp', geo=['BE', 'AT', 'AT'], time=['2019', '2018'], unit='CP_MEUR',
+                        precision='1', lang='EN')
+        R = query.Query('nama_10_gdp', unit=['CP_MEUR'], time=['2018', '2019'], geo=['AT', 'BE'])
+        self.assertEqual(Q.key, R.key)
+        self.assertEqual(list(Q.canonical().filters), ['geo', 'time', 'unit'])
+        self.assertEqual(Q.canonical().filters['geo'], ['AT', 'BE'])
+        C = cube.Cube(['geo', 'time'], {'geo': ['AT', 'BE'], 'time': ['2018', '2019']}, np.ones((2, 2)))
+        cache = query.CubeCache(size=1)
+        self.assertIsNone(cache.get(Q))
+        cache.put(Q, C)
+        self.assertIs(cache.get(R), C)
+        cache.put(query.Query('nama_10_gdp', geo='FR'), C)
+        self.assertEqual(len(cache), 1)
+        self.assertNotIn(Q, cache)
+        cache.invalidate('nama_10_gdp')
+        self.assertEqual(len(cache), 0)
+
+    #/************************************************************************/
+    def test4_check(self):
+        source = tempfile.mkdtemp()
+        try:
+            M = local_meta(source)
+        finally:
+            shutil.rmtree(source)
+        self.assertRaises(pyroError, query.Fetcher, meta=object())
+        F = LocalFetcher(meta=M)
+        self.assertIs(F.meta, M)
+        # invalid queries are rejected before any request is sent
+        with self.assertRaises(pyroError) as cm:
+            F.run(query.Query('ilc_di01', geo=['AT', 'BE'], unit='EUR'))
+        self.assertIn('invalid query - dimensions unit; codes BE of dimension geo not found', str(cm.exception))
+        self.assertRaises(pyroError, F.run, query.Query('xxx', geo='AT'))
+        self.assertEqual(F.queries, [])
+        # valid queries are sent, the parameters not being checked
+        self.assertRaises(IOError, F.run, query.Query('aact_ali01', geo=['AT', 'BE'], precision='1'))
+        self.assertEqual(len(F.queries), 1)
+        M.checkQuery('ilc_di01', geo='FR', time='2019', precision='1')
+        self.assertRaises(pyroError, M.checkQuery, 'ilc_di01', geo='BE')
+
+    #/************************************************************************/
+    def test5_fetch(self):
+        Q = query.Query('nama_10_gdp', geo=['AT', 'BE', 'FR'], unit='EUR')
+        F = query.Fetcher(session=LocalSession(json.dumps(RESPONSE).encode('utf-8')))
+        J = F.fetch(Q)
+        self.assertEqual(J.dims, ['unit', 'geo', 'time'])
+        self.assertEqual(F.session.urls, [Q.url()])
+        # the messages of the error responses are raised
+        envelope = {"error": {"status": "416", "label": "Too many categories have been requested. Maximum is 50."}}
+        F = query.Fetcher(session=LocalSession(json.dumps(envelope).encode('utf-8'), status_code=416))
+        with self.assertRaises(pyroError) as cm:
+            F.fetch(Q)
+        self.assertIn('error 416: Too many categories have been requested', str(cm.exception))
+        envelope = {"error": {"status": "400", "label": "Dataset contains no data."}}
+        F = query.Fetcher(session=LocalSession(json.dumps(envelope).encode('utf-8'), status_code=400))
+        with self.assertRaises(pyroError) as cm:
+            F.run(Q)
+        self.assertIn('error 400: Dataset contains no data.', str(cm.exception))
+        F = query.Fetcher(session=LocalSession(b'<html>Service Unavailable</html>', status_code=503))
+        with self.assertRaises(pyroError) as cm:
+            F.fetch(Q)
+        self.assertIn('error 503', str(cm.exception))
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(QueryTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 12:41:56 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import unittest
+import gzip
+import io
+import zipfile
+
+from pyrostat import reader
+from .base import runtest as baseRuntest
+
+TSV = "unit,geo\\time\t2019 \t2018Q1 \nEUR,AT\t1.2 p\t: \nEUR,BE\t: c\t4.5 \n"
+
+SDMX = """<?xml version="1.0" encoding="UTF-8"?>
+<CompactData xmlns="http://www.SDMX.org/resources/SDMXML/schemas/v2_0/message" xmlns:data="urn:data">
+<Header><ID>test</ID></Header>
+<data:DataSet>
+<data:Series FREQ="A" unit="EUR" geo="AT" TIME_FORMAT="P1Y">
+<data:Obs TIME_PERIOD="2019" OBS_VALUE="1.2" OBS_STATUS="p"/><data:Obs TIME_PERIOD="2018-Q1" OBS_VALUE="NaN"/>
+</data:Series>
+<data:Series FREQ="A" unit="EUR" geo="BE" TIME_FORMAT="P1Y">
+<data:Obs TIME_PERIOD="2019" OBS_STATUS="c"/><data:Obs TIME_PERIOD="2018-Q1" OBS_VALUE="4.5"/>
+</data:Series>
+</data:DataSet></CompactData>"""
+
+ROWS = [('EUR', 'AT', '2019', '1.2', 'p'), ('EUR', 'BE', '2018Q1', '4.5', ''),
+        ('EUR', 'BE', '2019', 'nan', 'c')]
+
+#/****************************************************************************/
+# ReaderTestCase
+#/****************************************************************************/
+class ReaderTestCase(unittest.TestCase):
+    """Class of tests for `reader.py`
+    """
+    module = 'reader'
+
+    #/************************************************************************/
+    @staticmethod
+    def rows(table):
+        return sorted(zip(*[table.column(d) for d in table.dims],
+                          [str(v) for v in table.values], table.column('flag')))
+
+    #/************************************************************************/
+    def test1_tsv(self):
+        table = reader.read_tsv(gzip.compress(TSV.encode('utf-8')))
+        self.assertEqual(table.dims, ['unit', 'geo', 'time'])
+        self.assertEqual(self.rows(table), ROWS)
+
+    #/************************************************************************/
+    def test2_sdmx(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as z:
+            z.writestr('test.dsd.xml', '<Structure/>')
+            z.writestr('test.sdmx.xml', SDMX)
+        table = reader.read_sdmx(archive.getvalue())
+        self.assertEqual(table.dims, ['unit', 'geo', 'time'])
+        self.assertEqual(self.rows(table), ROWS)
+
+    #/************************************************************************/
+    def test3_batches(self):
+        batches = list(reader.iter_sdmx(SDMX.encode('utf-8'), batch=1))
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(self.rows(reader.Columns.concat(batches)), ROWS)
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(ReaderTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 18:52:19 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import unittest
+
+from pyrostat import search
+from .base import runtest as baseRuntest
+
+#/****************************************************************************/
+# SearchTestCase
+#/****************************************************************************/
+class SearchTestCase(unittest.TestCase):
+    """Class of tests for `search.py`
+    """
+    module = 'search'
+
+    #/************************************************************************/
+    def setUp(self):
+        S = search.SearchIndex()
+        S.add('dataset', 'aact_ali01', 'aact_ali01', 'Agricultural labour input statistics',
+              'Statistiques de l\'apport de main-d\'œuvre agricole')
+        S.add('dataset', 'aact_ali02', 'aact_ali02', 'Agricultural labour input: indices')
+        S.add('dataset', 'demo_pjan', 'demo_pjan', 'Population on 1 January', 'Bevölkerung am 1. Januar')
+        S.add('label', ('geo', 'AT'), 'AT', 'Austria', 'Autriche', 'Österreich')
+        self.index = S
+
+    #/************************************************************************/
+    def test1_literals(self):
+        self.assertEqual(search._literals(r'aact_ali0[12]'), ['aact_ali0'])
+        self.assertEqual(search._literals(r'abc(def)?ghi'), ['abc', 'ghi'])
+        self.assertEqual(search._literals(r'ab{2,3}cde'), ['cde'])
+        self.assertEqual(search._literals(r'a|bcd'), [])
+
+    #/************************************************************************/
+    def test2_keyword(self):
+        results = self.index.keyword('labour stat')
+        self.assertEqual([r['key'] for r in results], ['aact_ali01'])
+        results = self.index.keyword('agricultural labour')
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.index.keyword('osterreich')[0]['key'], ('geo', 'AT'))
+        self.assertEqual(self.index.keyword('bevolkerung', kind='label'), [])
+
+    #/************************************************************************/
+    def test3_substring_regex(self):
+        self.assertEqual([r['key'] for r in self.index.substring('ALI0')], ['aact_ali01', 'aact_ali02'])
+        self.assertEqual([r['key'] for r in self.index.regex(r'ali0[2-9]')], ['aact_ali02'])
+        self.assertEqual([r['key'] for r in self.index.regex(r'^demo_')], ['demo_pjan'])
+        self.assertEqual(len(self.index.search('.', mode='regex')), 4)
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(SearchTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
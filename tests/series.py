@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 22:52:19 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pyrostat import query, cube, series
+from .base import runtest as baseRuntest
+
+#/****************************************************************************/
+# Fetcher serving a fixed time series, without any request
+#/****************************************************************************/
+class LocalResponse(object):
+
+    def __init__(self, cube):
+        self.cube = cube
+
+    def to_cube(self, dtype=None):
+        return self.cube
+
+class LocalFetcher(query.Fetcher):
+
+    def __init__(self, data, **kwargs):
+        super(LocalFetcher, self).__init__(**kwargs)
+        self.data, self.keys = data, []
+
+    def fetch(self, Q):
+        self.keys.append(Q.key)
+        since = Q.params.get('sinceTimePeriod', '')
+        times = [t for t in sorted(self.data) if t >= since]
+        if 'time' in Q.filters:
+            sel = Q.filters['time']
+            times = [t for t in times if t in ([sel] if isinstance(sel, str) else sel)]
+        geos = Q.filters['geo']
+        values = np.array([[self.data[t] * (i + 1) for t in times] for i in range(len(geos))])
+        return LocalResponse(cube.Cube(['geo', 'time'], {'geo': geos, 'time': times}, values))
+
+#/****************************************************************************/
+# SeriesTestCase
+#/****************************************************************************/
+class SeriesTestCase(unittest.TestCase):
+    """Class of tests for `series.py`
+    """
+    module = 'series'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    #/************************************************************************/
+    def test1_refresh(self):
+        fetcher = LocalFetcher({'2017': 1., '2018': 2., '2019': 3.})
+        S = series.SeriesStore(root=self.root, fetcher=fetcher, lookback=2)
+        Q = query.Query('nama_10_gdp', geo=['AT', 'BE'], time='2017')
+        self.assertEqual(S.key(Q), S.key(Q.copy(time=['2018', '2019'])))
+        report = S.refresh(Q)
+        self.assertEqual(report['mode'], 'full')
+        self.assertEqual(S.last(Q), '2019')
+        fetcher.data.update({'2019': 3.5, '2020': 4.})
+        report = S.refresh(Q)
+        self.assertEqual(report['mode'], 'incremental')
+        self.assertEqual(report['since'], '2018')
+        self.assertIn('sinceTimePeriod=2018', fetcher.keys[-1])
+        self.assertEqual(report['added'], ['2020'])
+        self.assertEqual(report['revised'], ['2019'])
+        self.assertEqual(report['revisions'], 2)
+        # series reloaded from disk
+        stored = series.SeriesStore(root=self.root, fetcher=fetcher).get(Q)
+        self.assertEqual(stored.codes['time'], ['2017', '2018', '2019', '2020'])
+        self.assertEqual(stored.get(geo='BE', time='2019'), 7.)
+
+    #/************************************************************************/
+    def test2_refresh_time(self):
+        fetcher = LocalFetcher({'2017': 1., '2018': 2., '2019': 3.})
+        S = series.SeriesStore(root=self.root, fetcher=fetcher)
+        # the time selection of the first query does not truncate the series
+        for Q in (query.Query('nama_10_gdp', geo=['AT'], time='2019'),
+                  query.Query('nama_10_gdp', geo=['BE'], sinceTimePeriod='2019')):
+            report = S.refresh(Q)
+            self.assertEqual(report['mode'], 'full')
+            self.assertEqual(report['added'], ['2017', '2018', '2019'])
+            self.assertNotIn('time', fetcher.keys[-1])
+            self.assertEqual(S.get(Q).codes['time'], ['2017', '2018', '2019'])
+
+    #/************************************************************************/
+    def test3_refresh_cache(self):
+        fetcher = LocalFetcher({'2017': 1., '2018': 2., '2019': 3.}, cache=True)
+        S = series.SeriesStore(root=self.root, fetcher=fetcher, lookback=2)
+        Q = query.Query('nama_10_gdp', geo=['AT'])
+        S.refresh(Q)
+        S.refresh(Q)
+        # new data published since: the cached response of the same query is not used
+        fetcher.data.update({'2019': 3.5, '2020': 4.})
+        self.assertEqual(fetcher.run(S.series(Q).copy(sinceTimePeriod='2018')).codes['time'], ['2018', '2019'])
+        nkeys = len(fetcher.keys)
+        report = S.refresh(Q)
+        self.assertEqual(len(fetcher.keys), nkeys + 1)
+        self.assertEqual((report['added'], report['revised']), (['2020'], ['2019']))
+        self.assertEqual(S.get(Q).get(geo='AT', time='2019'), 3.5)
+        # the cache is updated with the cube fetched
+        self.assertEqual(fetcher.run(S.series(Q).copy(sinceTimePeriod='2018')).codes['time'],
+                         ['2018', '2019', '2020'])
+        self.assertEqual(len(fetcher.keys), nkeys + 1)
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(SeriesTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
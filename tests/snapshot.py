@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 11:02:15 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pyrostat import metabase, snapshot
+from pyrostat.settings import pyroError
+from .metabase import ROWS
+from .base import runtest as baseRuntest
+
+CONTENT = gzip.compress(('\n'.join(['\t'.join(r) for r in ROWS]) + '\n').encode('utf-8'))
+
+#/****************************************************************************/
+# SnapshotTestCase
+#/****************************************************************************/
+class SnapshotTestCase(unittest.TestCase):
+    """Class of tests for `snapshot.py`
+    """
+    module = 'snapshot'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.compact = metabase.CompactMetabase.parse(CONTENT)
+        self.index = metabase.MetaIndex(*zip(*ROWS))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    #/************************************************************************/
+    def assertParity(self, mapped):
+        index = self.index
+        self.assertEqual(len(mapped), len(ROWS))
+        self.assertEqual(mapped.datasets(), index.datasets())
+        self.assertEqual(mapped.dimensions(), index.dimensions())
+        for data in index.datasets() + ['xxx']:
+            self.assertEqual(mapped.has_dataset(data), index.has_dataset(data))
+            self.assertEqual(mapped.dimensions(data), index.dimensions(data))
+        for dim in index.dimensions() + ['xxx']:
+            self.assertEqual(mapped.has_dimension(dim), index.has_dimension(dim))
+            self.assertEqual(mapped.datasets(dim), index.datasets(dim))
+            self.assertEqual(mapped.labels(dim), index.labels(dim))
+            for data in index.datasets() + ['xxx']:
+                self.assertEqual(mapped.has_dimension(dim, dataset=data),
+                                 index.has_dimension(dim, dataset=data))
+                self.assertEqual(mapped.labels(dim, dataset=data), index.labels(dim, dataset=data))
+                for label in ('AT', 'BE', 'EUR', '2019', 'XX'):
+                    self.assertEqual(mapped.has_label(label, dim, dataset=data),
+                                     index.has_label(label, dim, dataset=data))
+            for label in ('AT', 'BE', 'EUR', '2019', 'XX'):
+                self.assertEqual(mapped.has_label(label, dim), index.has_label(label, dim))
+        self.assertEqual(mapped.check(['ilc_di01', 'xxx']), index.check(['ilc_di01', 'xxx']))
+        queries = [('aact_ali01', {'geo': ['AT', 'BE'], 'time': '2019'}), ('xxx', {}),
+                   ('ilc_di01', {'geo': ['AT', 'BE'], 'unit': 'EUR'})]
+        for (data, filters) in queries:
+            self.assertEqual(mapped.validate(data, filters), index.validate(data, filters))
+        self.assertEqual(mapped.validate_many(queries), index.validate_many(queries))
+
+    #/************************************************************************/
+    def test1_mapped_index(self):
+        mapped = snapshot.MappedIndex.from_compact(self.compact)
+        self.assertParity(mapped)
+        path = os.path.join(self.dir, 'index')
+        mapped.save(path)
+        for mmap in (True, False):
+            self.assertParity(snapshot.MappedIndex.load(self.compact, path, mmap=mmap))
+
+    #/************************************************************************/
+    def test2_save_load(self):
+        S = snapshot.Snapshot(os.path.join(self.dir, 'snapshot'))
+        self.assertFalse(S.exists())
+        self.assertFalse(S.is_valid())
+        dates = {'metabase': 'Mon, 19 Oct 2026 10:00:00 GMT', 'toc': None}
+        S.save(self.compact, None, dates)
+        self.assertTrue(S.exists())
+        self.assertEqual(S.info['sources'], dates)
+        compact, toc, index = S.load(mmap=True)
+        self.assertIsNone(toc)
+        self.assertEqual(list(zip(*[compact.column(k) for k in compact.KEYS])), ROWS)
+        self.assertParity(index)
+        # saving again replaces the former snapshot
+        S.save(self.compact, None, {})
+        self.assertEqual(S.info['sources'], {})
+        self.assertEqual([f for f in os.listdir(self.dir) if f.startswith('snapshot')], ['snapshot'])
+
+    #/************************************************************************/
+    def test3_is_valid(self):
+        S = snapshot.Snapshot(os.path.join(self.dir, 'snapshot'))
+        dates = {'metabase': 'Mon, 19 Oct 2026 10:00:00 GMT', 'toc': 'Mon, 19 Oct 2026 10:05:00 GMT'}
+        S.save(self.compact, None, dates)
+        self.assertTrue(S.is_valid())
+        self.assertTrue(S.is_valid(dates))
+        self.assertTrue(S.is_valid({'metabase': dates['metabase'], 'toc': None}))
+        self.assertFalse(S.is_valid({'metabase': 'Tue, 20 Oct 2026 10:00:00 GMT', 'toc': dates['toc']}))
+
+    #/************************************************************************/
+    def test4_source_dates(self):
+        S = snapshot.Snapshot(os.path.join(self.dir, 'snapshot'))
+        files = S.source_files('en')
+        self.assertEqual(list(files.keys()), ['metabase', 'toc'])
+        with open(os.path.join(self.dir, files['metabase']), 'wb') as f:
+            f.write(CONTENT)
+        dates = S.source_dates(source=self.dir, lang='en')
+        self.assertEqual(dates['metabase'], str(os.path.getmtime(os.path.join(self.dir, files['metabase']))))
+        self.assertIsNone(dates['toc'])
+        S.save(self.compact, None, dates)
+        self.assertTrue(S.is_valid(S.source_dates(source=self.dir, lang='en')))
+        os.utime(os.path.join(self.dir, files['metabase']), (0, 0))
+        self.assertFalse(S.is_valid(S.source_dates(source=self.dir, lang='en')))
+        with self.assertRaises(pyroError):
+            S.source_dates()
+
+    #/************************************************************************/
+    def test5_swap(self):
+        S = snapshot.Snapshot(os.path.join(self.dir, 'snapshot'))
+        S.save(self.compact, None, {'metabase': 'first'})
+        rename = os.rename
+        def failing(src, dst):
+            if dst == S.path and not src.endswith('.old'):
+                raise OSError('rename failed')
+            rename(src, dst)
+        # the former snapshot is kept when the new one cannot be moved in place
+        with mock.patch.object(snapshot.os, 'rename', side_effect=failing):
+            self.assertRaises(pyroError, S.save, self.compact, None, {'metabase': 'second'})
+        self.assertEqual(S.info['sources'], {'metabase': 'first'})
+        self.assertEqual([f for f in os.listdir(self.dir) if f.startswith('snapshot')], ['snapshot'])
+        # another process saves a snapshot while this one is written: the
+        # snapshots saved are not mixed
+        other = snapshot.Snapshot(S.path)
+        def concurrent(src, dst):
+            if dst == S.path and not os.path.exists(dst):
+                with mock.patch.object(snapshot.os, 'rename', side_effect=rename):
+                    other.save(self.compact, None, {'metabase': 'other'})
+            rename(src, dst)
+        with mock.patch.object(snapshot.os, 'rename', side_effect=concurrent):
+            S.save(self.compact, None, {'metabase': 'third'})
+        self.assertEqual(S.info['sources'], {'metabase': 'other'})
+        self.assertTrue(S.is_valid())
+        self.assertEqual([f for f in os.listdir(self.dir) if f.startswith('snapshot')], ['snapshot'])
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(SnapshotTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Mon Oct 19 09:12:40 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from pyrostat import sync, settings, collection
+from .base import runtest as baseRuntest
+from .toc import TOC_TXT
+
+#/****************************************************************************/
+# Bulk serving a fixed listing and fixed files, without any request
+#/****************************************************************************/
+class LocalResponse(object):
+    def __init__(self, content):
+        self.content = content
+
+class LocalBulk(object):
+
+    def __init__(self, files):
+        # files: {name: (date, content)}
+        self.files, self.urls = files, []
+        self.session = self
+
+    def read_listing(self, key, ext=None, alpha=None):
+        return {n: {'date': d, 'size': len(c)} for (n, (d, c)) in self.files.items()}
+
+    def build_file(self, key, name, ext=None):
+        return 'data/%s.%s' % (name, settings.zipped_ext(key, ext or 'tsv'))
+
+    def build_url(self, file=None):
+        return 'http://bulk/%s' % file
+
+    def get_response(self, url):
+        self.urls.append(url)
+        name = os.path.basename(url).split('.')[0]
+        if name not in self.files:
+            raise IOError('file not found')
+        return LocalResponse(self.files[name][1])
+
+#/****************************************************************************/
+# SyncTestCase
+#/****************************************************************************/
+class SyncTestCase(unittest.TestCase):
+    """Class of tests for `sync.py`
+    """
+    module = 'sync'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.dest = tempfile.mkdtemp()
+    def tearDown(self):
+        shutil.rmtree(self.dest, ignore_errors=True)
+
+    #/************************************************************************/
+    def test1_run(self):
+        bulk = LocalBulk({'aact_ali01': ('01.01.2020', b'a' * 10), 'ilc_di01': ('01.01.2020', b'b' * 20)})
+        S = sync.Sync(self.dest, bulk=bulk)
+        report = S.run(data=['aact_ali01', 'ilc_di01', 'nama_10_gdp'])
+        self.assertEqual([report[k] for k in ('checked', 'updated', 'unchanged', 'missing', 'failed')],
+                         [3, 2, 0, 1, 0])
+        self.assertEqual(report['bytes_downloaded'], 30)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, 'data', 'ilc_di01.tsv.gz')))
+        # manifest saved on disk
+        with open(os.path.join(self.dest, 'manifest.json')) as f:
+            entries = json.load(f)
+        self.assertEqual(entries['data']['ilc_di01'],
+                         {'date': '01.01.2020', 'size': 20, 'bytes': 20, 'file': 'data/ilc_di01.tsv.gz'})
+        # second run: only the table updated since is downloaded again
+        bulk.files['aact_ali01'] = ('01.02.2020', b'c' * 15)
+        S = sync.Sync(self.dest, bulk=bulk)
+        changed, unchanged, _ = S.changes(data=['aact_ali01', 'ilc_di01'])
+        self.assertEqual((changed, unchanged), (['aact_ali01'], ['ilc_di01']))
+        nurls = len(bulk.urls)
+        report = S.run(data=['aact_ali01', 'ilc_di01'], parser=lambda content, name: len(content))
+        self.assertEqual([report[k] for k in ('checked', 'updated', 'unchanged', 'missing')], [2, 1, 1, 0])
+        self.assertEqual(report['bytes_saved'], 20)
+        self.assertEqual(report['parsed'], {'aact_ali01': 15})
+        self.assertEqual(len(bulk.urls), nurls + 1)
+        self.assertEqual(sync.Manifest(S.manifest.path).get('data', 'aact_ali01')['date'], '01.02.2020')
+        # the same table in another format is not the file stored
+        changed, unchanged, _ = S.changes(data=['ilc_di01'], ext='sdmx')
+        self.assertEqual((changed, unchanged), (['ilc_di01'], []))
+        S.run(data='ilc_di01', ext='sdmx')
+        self.assertTrue(os.path.exists(os.path.join(self.dest, 'data', 'ilc_di01.sdmx.zip')))
+        self.assertEqual(S.manifest.get('data', 'ilc_di01')['file'], 'data/ilc_di01.sdmx.zip')
+
+    #/************************************************************************/
+    def test2_toc(self):
+        source = os.path.join(self.dest, 'toc')
+        os.makedirs(source)
+        with open(os.path.join(source, 'table_of_contents_en.txt'), 'w') as f:
+            f.write(TOC_TXT % ('Agricultural labour input', 'Population on 1 January', 'demo_pjan'))
+        meta = collection.Meta()
+        self.assertRaises(Exception, sync.Sync, self.dest, source='toc')
+        meta.readTocTable(langs='en', source=source)
+        bulk = LocalBulk({'aact_ali01': ('01.01.2020', b'a' * 10), 'demo_pjan': ('01.01.2020', b'b' * 20)})
+        S = sync.Sync(self.dest, bulk=bulk, meta=meta, source='toc')
+        self.assertEqual(S.last_updates('data', ['aact_ali01', 'demo_pjan', 'nama_10_gdp']),
+                         {'aact_ali01': ('04.02.2020', None), 'demo_pjan': ('25.03.2020', None),
+                          'nama_10_gdp': (None, None)})
+        report = S.run(data=['aact_ali01', 'demo_pjan', 'nama_10_gdp'])
+        self.assertEqual([report[k] for k in ('checked', 'updated', 'unchanged', 'missing')], [3, 2, 0, 1])
+        self.assertEqual(S.manifest.get('data', 'demo_pjan')['date'], '25.03.2020')
+        changed, unchanged, _ = S.changes(data=['aact_ali01', 'demo_pjan'])
+        self.assertEqual((changed, unchanged), ([], ['aact_ali01', 'demo_pjan']))
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(SyncTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()
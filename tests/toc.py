@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+About
+-----
+
+*credits*:      `gjacopo <jacopo.grazzini@jrc.ec.europa.eu>`_
+
+*since*:        Sun Oct 18 19:24:37 2026
+"""
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import unittest
+
+from pyrostat import toc
+from .base import runtest as baseRuntest
+
+TOC_XML = b'''<?xml version="1.0" encoding="UTF-8"?>
+<nt:tree xmlns:nt="urn:eu.europa.ec.eurostat.navtree">
+<nt:branch><nt:title language="en">Database by themes</nt:title><nt:code>data</nt:code>
+<nt:children>
+  <nt:branch><nt:title language="en">Agriculture</nt:title><nt:title language="fr">Agriculture</nt:title>
+  <nt:code>agr</nt:code><nt:children>
+    <nt:leaf type="dataset"><nt:title language="en">Agricultural labour input</nt:title>
+    <nt:code>aact_ali01</nt:code><nt:lastUpdate>04.02.2020</nt:lastUpdate>
+    <nt:dataStart>1973</nt:dataStart><nt:dataEnd>2019</nt:dataEnd></nt:leaf>
+    <nt:leaf type="table"><nt:title language="en">Agricultural labour input (table)</nt:title>
+    <nt:code>tag00001</nt:code></nt:leaf>
+  </nt:children></nt:branch>
+  <nt:branch><nt:title language="en">Population</nt:title><nt:code>pop</nt:code><nt:children>
+    <nt:leaf type="dataset"><nt:title language="en">Population on 1 January</nt:title>
+    <nt:code>demo_pjan</nt:code></nt:leaf>
+  </nt:children></nt:branch>
+</nt:children></nt:branch>
+</nt:tree>'''
+
+TOC_TXT = '''"title"	"code"	"type"	"last update of data"	"last table structure change"	"data start"	"data end"	"values"
+"%s"	"aact_ali01"	"dataset"	"04.02.2020"	"04.02.2020"	"1973"	"2019"	
+"%s"	"%s"	"dataset"	"25.03.2020"	"25.03.2020"	"1960"	"2019"	
+'''
+
+#/****************************************************************************/
+# TocTestCase
+#/****************************************************************************/
+class TocTestCase(unittest.TestCase):
+    """Class of tests for `toc.py`
+    """
+    module = 'toc'
+
+    #/************************************************************************/
+    def test1_string_column(self):
+        strings = ['aact_ali01', '', 'Österreich']
+        column = toc.StringColumn.from_list(strings)
+        self.assertEqual(len(column), 3)
+        self.assertEqual(column[2], 'Österreich')
+        self.assertEqual(column.tolist(), strings)
+
+    #/************************************************************************/
+    def test2_tree(self):
+        tree = toc.TocTree.parse(TOC_XML)
+        self.assertEqual(len(tree), 6)
+        self.assertEqual(tree.roots, [0])
+        self.assertEqual(tree.path('aact_ali01'), ['data', 'agr'])
+        self.assertEqual(tree.children('data'), ['agr', 'pop'])
+        self.assertEqual(tree.parent_of('demo_pjan'), 'pop')
+        self.assertEqual(tree.subtree('data', type='dataset'), ['aact_ali01', 'demo_pjan'])
+        self.assertEqual(tree.subtree('agr'), ['aact_ali01', 'tag00001'])
+        entry = tree.get('aact_ali01')
+        self.assertEqual((entry['type'], entry['start'], entry['end']), ('dataset', '1973', '2019'))
+        self.assertEqual(tree.get('agr')['type'], 'folder')
+        self.assertEqual(tree.title('agr', lang='fr'), 'Agriculture')
+
+    #/************************************************************************/
+    def test3_multilingual(self):
+        sources = {'en': TOC_TXT % ('Agricultural labour input', 'Population on 1 January', 'demo_pjan'),
+                   'fr': TOC_TXT % ('Apport de main-d\'œuvre agricole', 'Taux de fécondité', 'demo_frate')}
+        T = toc.TocTable.parse_many(dict((l, s.encode('utf-8')) for (l, s) in sources.items()))
+        self.assertEqual(T.langs, ['en', 'fr'])
+        self.assertEqual(T.codes, ['aact_ali01', 'demo_pjan', 'demo_frate'])
+        self.assertEqual(T.title('aact_ali01', lang='fr'), 'Apport de main-d\'œuvre agricole')
+        self.assertEqual(T.title('aact_ali01'), 'Agricultural labour input')
+        self.assertEqual(T.title('demo_frate', lang='en'), '')
+        self.assertEqual(T.period('demo_frate'), ['1960', '2019'])
+        self.assertRaises(Exception, T.title, 'aact_ali01', lang='de')
+
+
+#/****************************************************************************/
+# MAIN METHOD AND TESTING AREA
+#/****************************************************************************/
+
+def runtest():
+    baseRuntest(TocTestCase)
+    return
+
+if __name__ == '__main__':
+    unittest.main()